@@ -0,0 +1,105 @@
+import asyncio
+import logging
+import time
+from binance import AsyncClient
+
+logger = logging.getLogger('account_state')
+
+# Error codes meaning the cached position mode is wrong
+POSITION_MODE_CODES = {
+    -4061,  # Order's position side does not match user's setting
+}
+
+
+def _parse_dual(resp: dict) -> bool:
+    dual = resp.get('dualSidePosition')
+    # dualSidePosition may be bool or string
+    return True if dual is True or (isinstance(dual, str) and dual.lower() == 'true') else False
+
+
+class AsyncAccountStateCache:
+    """Position mode, leverage already applied per symbol, and open positions.
+
+    Load it once before launch; after that the order path reads it without REST
+    calls. User-data events keep it current, and only errors that prove the
+    cache wrong (POSITION_MODE_CODES) drop an entry so it is fetched again.
+    """
+
+    def __init__(self, client: AsyncClient):
+        self.client = client
+        self.hedge: bool | None = None
+        self.leverage: dict[str, int] = {}
+        self.positions: dict[tuple[str, str], float] = {}
+        self.loaded_at: float | None = None
+
+    def update_positions(self, pos_list: list[dict]):
+        """Apply a positionRisk response."""
+        for p in pos_list:
+            symbol = p.get('symbol')
+            if not symbol:
+                continue
+            side = p.get('positionSide') or 'BOTH'
+            try:
+                self.positions[(symbol, side)] = float(p.get('positionAmt') or 0.0)
+                if p.get('leverage'):
+                    self.leverage[symbol] = int(p['leverage'])
+            except (TypeError, ValueError):
+                continue
+
+    async def load(self):
+        """Fetch position mode and all positions (with their leverage) together."""
+        mode, positions = await asyncio.gather(
+            self.client.futures_get_position_mode(),
+            self.client.futures_position_information(),
+        )
+        self.hedge = _parse_dual(mode)
+        self.update_positions(positions)
+        self.loaded_at = time.monotonic()
+
+    async def hedge_mode(self) -> bool:
+        if self.hedge is None:
+            try:
+                self.hedge = _parse_dual(await self.client.futures_get_position_mode())
+            except Exception as e:
+                # Not cached: the next call asks again
+                logger.warning('Unable to read position mode (assuming one-way): %s', e)
+                return False
+        return self.hedge
+
+    async def set_leverage(self, symbol: str, leverage: int) -> int:
+        """Apply `leverage` unless it is already known to be set; API errors propagate."""
+        if self.leverage.get(symbol) != leverage:
+            await self.client.futures_change_leverage(symbol=symbol, leverage=leverage)
+            self.leverage[symbol] = leverage
+        return leverage
+
+    def position(self, symbol: str, side: str | None = None) -> float | None:
+        if side is None:
+            side = 'LONG' if self.hedge else 'BOTH'
+        return self.positions.get((symbol, side))
+
+    def on_error(self, code: int | None) -> bool:
+        """Drop state an API error proved wrong; True if anything was invalidated."""
+        if code in POSITION_MODE_CODES and self.hedge is not None:
+            logger.info('Position mode cache invalidated by error %s', code)
+            self.hedge = None
+            return True
+        return False
+
+    def on_user_event(self, msg: dict):
+        """Apply a user-data stream event (ACCOUNT_UPDATE / ACCOUNT_CONFIG_UPDATE)."""
+        event = msg.get('e')
+        if event == 'ACCOUNT_UPDATE':
+            for p in msg.get('a', {}).get('P', []):
+                try:
+                    self.positions[(p['s'], p.get('ps') or 'BOTH')] = float(p.get('pa') or 0.0)
+                except (KeyError, TypeError, ValueError):
+                    continue
+        elif event == 'ACCOUNT_CONFIG_UPDATE':
+            ac = msg.get('ac')
+            if ac and ac.get('s') and ac.get('l') is not None:
+                self.leverage[ac['s']] = int(ac['l'])
+            ai = msg.get('ai')
+            if ai and 'j' in ai:
+                self.hedge = bool(ai['j'])
+
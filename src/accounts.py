@@ -0,0 +1,66 @@
+import os
+from dataclasses import dataclass
+
+from src.config import TradeParams
+from src.jobs import load_entries
+
+
+@dataclass
+class Account:
+    """One set of API credentials taking part in a fan-out launch."""
+    name: str
+    api_key: str
+    api_secret: str
+    usdt: float | None = None
+    leverage: int | None = None
+
+    def params(self, base: TradeParams) -> TradeParams:
+        """`base` with this account's size and leverage overrides."""
+        return TradeParams(
+            usdt=self.usdt if self.usdt is not None else base.usdt,
+            leverage=self.leverage if self.leverage is not None else base.leverage,
+            stop_loss_pct=base.stop_loss_pct,
+            trailing_activation_pct=base.trailing_activation_pct,
+            trailing_callback_pct=base.trailing_callback_pct,
+            max_slippage_pct=base.max_slippage_pct,
+        )
+
+
+def account_from_dict(d: dict, index: int = 0) -> Account:
+    """Build an Account from one accounts-file entry.
+
+    Credentials are given inline (`api_key`, `api_secret`) or as the names of
+    environment variables holding them (`api_key_env`, `api_secret_env`).
+    """
+    def secret(field: str) -> str:
+        if d.get(field):
+            return str(d[field])
+        var = d.get(f'{field}_env')
+        if var and os.getenv(var):
+            return os.environ[var]
+        raise KeyError(f'{field} or {field}_env (set in the environment)')
+
+    return Account(
+        name=str(d.get('name') or f'account{index + 1}'),
+        api_key=secret('api_key'),
+        api_secret=secret('api_secret'),
+        usdt=float(d['usdt']) if d.get('usdt') is not None else None,
+        leverage=int(d['leverage']) if d.get('leverage') is not None else None,
+    )
+
+
+def load_accounts(path: str) -> list[Account]:
+    """Read an accounts file: either a JSON array of entries or one JSON object per line."""
+    accounts = load_entries(path, account_from_dict, 'account')
+    names = [a.name for a in accounts]
+    if len(set(names)) != len(names):
+        raise ValueError(f'Duplicate account names in {path}')
+    return accounts
+
+
+def account_journal_path(path: str, name: str) -> str:
+    """Per-account journal file: 'journal.jsonl' -> 'journal.<name>.jsonl'."""
+    if not path:
+        return ''
+    root, ext = os.path.splitext(path)
+    return f'{root}.{name}{ext}'
@@ -0,0 +1,92 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, TypeVar
+import aiohttp
+from binance.exceptions import BinanceAPIException
+
+from src.rate_limiter import TokenBucket
+
+logger = logging.getLogger('activation')
+
+T = TypeVar('T')
+
+# Error codes Binance returns while a new symbol is not open for trading yet
+INACTIVE_CODES = {
+    -1121,  # Invalid symbol
+    -1122,  # Invalid symbol status
+    -4140,  # Invalid symbol status for opening position
+}
+
+
+class ActivationTimeout(Exception):
+    pass
+
+
+class NotReady(Exception):
+    """Raised by a probe whose inputs are not there yet (e.g. the symbol is not in exchange info); a miss."""
+
+
+class ProbeBudget(TokenBucket):
+    """Token bucket capping how many probes (request weight or orders) may be spent."""
+
+
+class ActivationDetector:
+    """Repeats a probe until the exchange accepts it, i.e. the symbol is live.
+
+    Probes run every `burst_interval` seconds until `burst_window` seconds after
+    launch, then back off geometrically to `max_interval`. Only a probe that
+    raises one of INACTIVE_CODES, NotReady or a transport error is a miss; any
+    other error is permanent and propagates at once. Whatever the probe returns
+    is returned as soon as it arrives. All probes share one ProbeBudget.
+    """
+
+    def __init__(self, launch_at: float | None = None, now: Callable[[], float] = time.time,
+                 burst_interval: float = 0.02, burst_window: float = 2.0, backoff: float = 1.5,
+                 max_interval: float = 1.0, budget: ProbeBudget | None = None, timeout: float = 60.0):
+        self.now = now
+        self.launch_at = launch_at if launch_at is not None else now()
+        self.burst_interval = burst_interval
+        self.burst_window = burst_window
+        self.backoff = backoff
+        self.max_interval = max_interval
+        self.budget = budget or ProbeBudget(capacity=60, refill_per_sec=5)
+        self.timeout = timeout
+        self.probes = 0
+
+    def next_interval(self, last: float | None) -> float:
+        if self.now() <= self.launch_at + self.burst_window or last is None:
+            return self.burst_interval
+        return min(self.max_interval, last * self.backoff)
+
+    async def wait(self, probe: Callable[[], Awaitable[T | None]], label: str = 'probe') -> T:
+        started = time.monotonic()
+        interval: float | None = None
+        misses = 0
+        while True:
+            delay = self.budget.wait_time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self.budget.take()
+            self.probes += 1
+            try:
+                result = await probe()
+            except BinanceAPIException as e:
+                if getattr(e, 'code', None) not in INACTIVE_CODES:
+                    raise
+            except NotReady as e:
+                logger.debug('%s not ready: %s', label, e)
+            except (asyncio.TimeoutError, aiohttp.ClientError) as e:
+                logger.debug('%s transport error, retrying: %s', label, e)
+            else:
+                logger.info(
+                    '%s succeeded after %d misses, %.0f ms after launch',
+                    label, misses, (self.now() - self.launch_at) * 1000.0,
+                )
+                return result
+
+            misses += 1
+            if time.monotonic() - started >= self.timeout:
+                raise ActivationTimeout(f'{label} still failing after {misses} probes')
+            interval = self.next_interval(interval)
+            await asyncio.sleep(interval)
@@ -0,0 +1,597 @@
+import asyncio
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
+import aiohttp
+from binance import AsyncClient
+from binance.exceptions import BinanceAPIException
+
+from src.account_state import POSITION_MODE_CODES, AsyncAccountStateCache
+from src.activation import NotReady
+from src.fixed_point import plain
+from src.metrics import metrics
+from src.order_book import OrderBook
+from src.order_race import RaceResult, race_order
+from src.symbol_rules import AsyncSymbolRulesCache, SymbolRules
+
+logger = logging.getLogger('async_executor')
+
+# The send may or may not have reached the matching engine
+UNKNOWN_STATUS_CODES = {
+    -1007,  # Timeout waiting for response from backend server; send status unknown
+}
+ORDER_NOT_FOUND_CODES = {
+    -2013,  # Order does not exist
+}
+
+
+class EntryStatusUnknown(Exception):
+    """An entry send failed ambiguously and the order could not be looked up; it must not be resent."""
+
+
+def make_client_order_id(prefix: str = 'lb') -> str:
+    # Binance allows up to 36 chars of [.A-Z:/a-z0-9_-]
+    return f'{prefix}-{uuid.uuid4().hex[:24]}'
+
+
+@dataclass
+class ArmedOrder:
+    """A fully sized and validated entry, ready to be sent as a single signed POST."""
+    symbol: str
+    params: dict
+    qty: float
+    ref_price: float
+    leverage: int
+    hedge: bool
+    leverage_set: bool = False
+    armed_at: float = field(default_factory=time.monotonic)
+    notional: float = 0.0  # usdt * leverage, for re-sizing against the live book
+    max_slippage: float = 0.0  # > 0: LIMIT IOC capped this far above the reference
+
+    @property
+    def client_order_id(self) -> str:
+        return self.params['newClientOrderId']
+
+
+class AsyncFuturesExecutor:
+    """Sizes, sends and protects futures entries.
+
+    Every REST call is awaited on the client's pooled session, so independent
+    lookups run concurrently. Each
+    stage is timed as a metrics span (entry.mark_price, entry.order, ...).
+    Position mode and leverage come from a shared AsyncAccountStateCache.
+    """
+
+    def __init__(self, client: AsyncClient, rules: AsyncSymbolRulesCache | None = None,
+                 account: AsyncAccountStateCache | None = None):
+        self.client = client
+        self.rules = rules or AsyncSymbolRulesCache(client)
+        self.account = account or AsyncAccountStateCache(client)
+        self.last_race: RaceResult | None = None
+
+    async def is_hedge_mode(self) -> bool:
+        return await self.account.hedge_mode()
+
+    def _position_mode_rejected(self, params: dict) -> bool:
+        """After -4061, flip positionSide in `params` to the other mode; returns the new hedge flag."""
+        if 'positionSide' in params:
+            params.pop('positionSide')
+            hedge = False
+        else:
+            params['positionSide'] = 'LONG'
+            hedge = True
+        self.account.on_error(-4061)
+        return hedge
+
+    async def lookup_entry(self, symbol: str, client_order_id: str, attempts: int = 5) -> dict | None:
+        """The entry order by client id, or None if the exchange has no such order.
+
+        Raises EntryStatusUnknown when the lookup itself keeps failing.
+        """
+        for attempt in range(attempts):
+            try:
+                with metrics.span('entry.lookup'):
+                    return await self.client.futures_get_order(symbol=symbol, origClientOrderId=client_order_id)
+            except BinanceAPIException as e:
+                if getattr(e, 'code', None) in ORDER_NOT_FOUND_CODES:
+                    return None
+                logger.warning('Entry lookup for %s (%s) failed: %s', symbol, client_order_id, e)
+            except (asyncio.TimeoutError, aiohttp.ClientError) as e:
+                logger.warning('Entry lookup for %s (%s) failed: %s', symbol, client_order_id, e)
+            await asyncio.sleep(0.05 * 2 ** attempt)
+        raise EntryStatusUnknown(f'entry {client_order_id} on {symbol}: send and {attempts} lookups failed')
+
+    async def _send_entry(self, params: dict, copies: int = 1, stagger: float = 0.0, **labels) -> tuple[dict, bool]:
+        """Send the entry (raced over `copies` connections when it has a client id); returns (response, hedge).
+
+        The client id alone does not prevent a second entry (see race_order),
+        so a send that failed without a clear answer (timeout, dropped
+        connection, -1007) is looked up by its client id before the error is
+        passed on: a placed order is returned as the response, and only an
+        order the exchange does not know can be resent.
+        """
+        async def send() -> dict:
+            if 'newClientOrderId' not in params:
+                return await self.client.futures_create_order(**params)
+            try:
+                resp, self.last_race = await race_order(self.client, params, copies, stagger, **labels)
+                return resp
+            except (asyncio.TimeoutError, aiohttp.ClientError, BinanceAPIException) as e:
+                if isinstance(e, BinanceAPIException) and getattr(e, 'code', None) not in UNKNOWN_STATUS_CODES:
+                    raise
+                placed = await self.lookup_entry(params['symbol'], params['newClientOrderId'])
+                if placed is None:
+                    raise
+                logger.warning('Entry %s for %s was placed despite %r', params['newClientOrderId'], params['symbol'], e)
+                return placed
+
+        try:
+            with metrics.span('entry.order', **labels):
+                resp = await send()
+        except BinanceAPIException as e:
+            # Position mode differs from the cached one: retry once with the other mode
+            if getattr(e, 'code', None) not in POSITION_MODE_CODES:
+                raise
+            hedge = self._position_mode_rejected(params)
+            with metrics.span('entry.order', retry='-4061', **labels):
+                resp = await send()
+            self.account.hedge = hedge
+        if resp:
+            metrics.exchange_lag('exchange.entry_update_to_ack', resp.get('updateTime'), self.client.timestamp_offset)
+        return resp, 'positionSide' in params
+
+    @staticmethod
+    def _leg_fill(resp: dict) -> float:
+        """Quantity an accepted copy filled: its executedQty, or the whole order when the response is only an ACK."""
+        try:
+            if resp.get('status') in (None, 'NEW'):
+                return float(resp.get('origQty') or 0.0)
+            return float(resp.get('executedQty') or 0.0)
+        except (TypeError, ValueError):
+            return 0.0
+
+    async def confirm_race(self, symbol: str, qty: float, hedge: bool) -> float | None:
+        """After a raced entry, wait for every copy, close any extra fills and return the resulting position.
+
+        Every copy that gets through after the symbol opens fills (see
+        race_order). Whatever the copies other than the winner filled is closed
+        with one reduce-only MARKET sell. Call it before placing protection, so
+        protection never covers the extra size.
+        """
+        race, self.last_race = self.last_race, None
+        if race is None:
+            return None
+        await race.settled
+        logger.info('Entry race %s (%s): %s', symbol, race.client_order_id, race.format())
+        extra = sum(self._leg_fill(leg.resp) for leg in race.legs
+                    if leg.outcome == 'accepted' and leg.index != race.winner and leg.resp)
+        if extra > 0:
+            logger.error('%d duplicate entries filled %s extra on %s; reducing the position', race.accepted - 1, extra, symbol)
+            params = {'symbol': symbol, 'side': 'SELL', 'type': 'MARKET', 'quantity': self._format_qty(self.rules.peek(symbol), extra)}
+            if hedge:
+                params['positionSide'] = 'LONG'
+            else:
+                params['reduceOnly'] = 'true'
+            try:
+                await self.client.futures_create_order(**params)
+            except Exception as e:
+                logger.exception('Could not reduce duplicate entries for %s: %s', symbol, e)
+        try:
+            self.account.update_positions(await self.client.futures_position_information(symbol=symbol))
+        except Exception as e:
+            logger.warning('Position check after entry race failed for %s: %s', symbol, e)
+            return None
+        position = self.account.position(symbol, 'LONG' if hedge else 'BOTH')
+        logger.info('Position after entry race for %s: %s (expected %s)', symbol, position, qty)
+        return position
+
+    async def set_leverage(self, symbol: str, leverage: int) -> int:
+        try:
+            await self.account.set_leverage(symbol, leverage)
+            logger.info('Leverage set to %dx for %s', leverage, symbol)
+            return leverage
+        except BinanceAPIException as e:
+            logger.error('Failed to set leverage %dx for %s: %s', leverage, symbol, e)
+            raise
+        except Exception as e:
+            logger.exception('Unexpected error setting leverage %dx for %s: %s', leverage, symbol, e)
+            raise
+
+    async def mark_price(self, symbol: str) -> float:
+        try:
+            return float((await self.client.futures_mark_price(symbol=symbol))['markPrice'])
+        except Exception:
+            return float((await self.client.get_symbol_ticker(symbol=symbol))['price'])
+
+    def _build_entry(self, symbol: str, usdt_capital: float, leverage: int, mark: float, rules: SymbolRules | None, hedge: bool) -> dict | None:
+        """Size and validate a MARKET BUY against the symbol filters; None if it would be rejected."""
+        if not rules:
+            logger.error('Symbol info not found for %s', symbol)
+            return None
+
+        notional = usdt_capital * leverage
+        qty_raw = notional / mark
+
+        # Integer fixed point against the precomputed step scale
+        steps = rules.qty_scale.floor(qty_raw)
+        qty = rules.qty_scale.to_float(steps)
+        min_notional = rules.min_notional
+
+        if steps <= 0:
+            logger.error('Computed quantity is zero. Try increasing TRADE_USDT or leverage. qty_raw=%.10f step=%s', qty_raw, rules.step_size)
+            return None
+
+        if steps < rules.min_qty_steps:
+            logger.error('Quantity %.10f below minQty %s for %s. Increase TRADE_USDT.', qty, rules.min_qty, symbol)
+            return None
+
+        if min_notional is not None and (qty * mark) < min_notional:
+            logger.error('Notional %.8f below minNotional %.8f for %s. Increase TRADE_USDT.', qty * mark, min_notional, symbol)
+            return None
+
+        order_params = {
+            'symbol': symbol,
+            'side': 'BUY',
+            'type': 'MARKET',
+            'quantity': rules.qty_scale.format(steps),
+        }
+        if hedge:
+            order_params['positionSide'] = 'LONG'
+        return order_params
+
+    @staticmethod
+    def _cap_entry(params: dict, rules: SymbolRules, notional: float, ref: float, max_slippage: float,
+                   book: OrderBook | None = None) -> tuple[float, float | None] | None:
+        """Turn an entry into a LIMIT IOC at most `max_slippage` above the reference price.
+
+        With a synced `book` the reference is its best ask, and the quantity is
+        re-sized to it and capped at what the asks hold up to the limit price.
+        Returns the limit price and the average fill price the book predicts, or
+        None, leaving `params` untouched, when the capped quantity is below
+        minQty or minNotional and the exchange would reject the order.
+        """
+        best = book.best_ask() if book is not None and book.ready else None
+        ref = best or ref
+        bound = ref * (1.0 + max_slippage)
+        steps = rules.qty_scale.floor(notional / ref)
+        expected = None
+        if best is not None:
+            available, expected = book.fillable(bound)
+            steps = min(steps, rules.qty_scale.floor(available))
+        qty = rules.qty_scale.to_float(steps)
+        if steps <= 0 or steps < rules.min_qty_steps:
+            logger.warning('Only %s %s fillable within %.2f%% of %.8f: below minQty %s; skipping the entry', qty, params['symbol'],
+                           max_slippage * 100.0, ref, rules.min_qty)
+            return None
+        if rules.min_notional is not None and qty * bound < rules.min_notional:
+            logger.warning('Capped entry %s qty=%s at %.8f is below minNotional %.8f; skipping the entry', params['symbol'], qty,
+                           bound, rules.min_notional)
+            return None
+        params.update(
+            type='LIMIT',
+            timeInForce='IOC',
+            price=rules.format_price(bound),
+            quantity=rules.qty_scale.format(steps),
+            # The fill is partial by design; ask for it in the response
+            newOrderRespType='RESULT',
+        )
+        return bound, expected
+
+    async def _fill(self, symbol: str, client_order_id: str | None, resp: dict) -> tuple[float, float]:
+        """(executed qty, average price) from the order response, querying the order once if it has neither."""
+        def fill_of(r: dict) -> tuple[float, float]:
+            try:
+                return float(r.get('executedQty') or 0.0), float(r.get('avgPrice') or 0.0)
+            except (TypeError, ValueError):
+                return 0.0, 0.0
+
+        filled, avg = fill_of(resp)
+        if (filled <= 0.0 or avg <= 0.0) and resp.get('status') not in ('EXPIRED', 'CANCELED') and client_order_id:
+            try:
+                with metrics.span('entry.fill_lookup'):
+                    order = await self.client.futures_get_order(symbol=symbol, origClientOrderId=client_order_id)
+                filled, avg = fill_of(order)
+            except Exception as e:
+                logger.warning('Fill lookup failed for %s (%s): %s', symbol, client_order_id, e)
+        return filled, avg
+
+    async def open_futures_long(self, symbol: str, usdt_capital: float, leverage: int, client_order_id: str | None = None,
+                                copies: int = 1, stagger: float = 0.0, book: OrderBook | None = None,
+                                max_slippage: float = 0.0) -> dict | None:
+        """Size and send a MARKET long at the current mark; with `client_order_id` it may be raced over `copies` connections.
+
+        With `max_slippage` the entry is a LIMIT IOC instead (see `_cap_entry`),
+        sized from `book` when it is synced; the position is what actually filled.
+        Returns None when the order cannot be sized within the filters or filled
+        nothing. API and transport errors propagate, so the caller can tell a
+        symbol that is not trading yet from a rejection; NotReady means the
+        symbol's filters are not known yet.
+        """
+        # Mark price, filters and position mode are independent; fetch them together
+        mark, rules, hedge = await asyncio.gather(
+            metrics.timed('entry.mark_price', self.mark_price(symbol)),
+            metrics.timed('entry.rules', self.rules.get(symbol)),
+            metrics.timed('entry.hedge_mode', self.is_hedge_mode()),
+        )
+        if rules is None:
+            raise NotReady(f'no symbol filters for {symbol}')
+
+        with metrics.span('entry.build'):
+            order_params = self._build_entry(symbol, usdt_capital, leverage, mark, rules, hedge)
+        if order_params is None:
+            return None
+        if max_slippage > 0:
+            with metrics.span('entry.book_walk'):
+                capped = self._cap_entry(order_params, rules, usdt_capital * leverage, mark, max_slippage, book)
+            if capped is None:
+                return None
+            bound, expected = capped
+        qty = float(order_params['quantity'])
+        if client_order_id:
+            order_params['newClientOrderId'] = client_order_id
+
+        resp, hedge = await self._send_entry(order_params, copies, stagger)
+        if max_slippage > 0:
+            filled, avg = await self._fill(symbol, client_order_id, resp)
+            if filled <= 0.0:
+                logger.error('Entry for %s got no fill at or below %s', symbol, order_params['price'])
+                return None
+            logger.info('Opened LONG: %s qty=%s of %s entry=%.8f (limit %s, book expected %s)', symbol, filled, qty, avg,
+                        order_params['price'], f'{expected:.8f}' if expected else '-')
+            return {'qty': filled, 'entry_price': avg or mark, 'raw': resp, 'hedge': hedge}
+        # Use avgPrice if present and > 0, otherwise fall back to current mark
+        entry_price = mark
+        try:
+            ap = resp.get('avgPrice')
+            if ap is not None and float(ap) > 0:
+                entry_price = float(ap)
+        except (TypeError, ValueError):
+            entry_price = mark
+        logger.info('Opened LONG: %s qty=%s entry=%.8f', symbol, qty, entry_price)
+        return {'qty': qty, 'entry_price': entry_price, 'raw': resp, 'hedge': hedge}
+
+    async def arm_futures_long(self, symbol: str, usdt_capital: float, leverage: int, ref_price: float | None = None,
+                               client_order_id: str | None = None, max_slippage: float = 0.0) -> ArmedOrder | None:
+        """Build and validate the entry order ahead of launch.
+
+        Sizes against `ref_price` when given (new listings have no mark price yet),
+        otherwise against the last known mark price. Also tries to set leverage now
+        so the launch path can skip it. With `max_slippage` the entry is armed as
+        a LIMIT IOC capped above the reference; `send_armed` re-prices it from the
+        order book when one is synced.
+        """
+        async def reference() -> float:
+            return ref_price if ref_price else await self.mark_price(symbol)
+
+        try:
+            price, rules, hedge = await asyncio.gather(
+                metrics.timed('arm.reference_price', reference()),
+                metrics.timed('arm.rules', self.rules.get(symbol)),
+                metrics.timed('arm.hedge_mode', self.is_hedge_mode()),
+            )
+            order_params = self._build_entry(symbol, usdt_capital, leverage, price, rules, hedge)
+            if order_params is None:
+                return None
+            if max_slippage > 0 and self._cap_entry(order_params, rules, usdt_capital * leverage, price, max_slippage) is None:
+                return None
+            order_params['newClientOrderId'] = client_order_id or make_client_order_id()
+            # Ask for the fill in the response so the entry price needs no follow-up query
+            order_params['newOrderRespType'] = 'RESULT'
+        except Exception as e:
+            logger.error('Unable to arm entry for %s: %s', symbol, e)
+            return None
+
+        armed = ArmedOrder(
+            symbol=symbol,
+            params=order_params,
+            qty=float(order_params['quantity']),
+            ref_price=price,
+            leverage=leverage,
+            hedge=hedge,
+            notional=usdt_capital * leverage,
+            max_slippage=max_slippage,
+        )
+        try:
+            with metrics.span('arm.set_leverage'):
+                await self.account.set_leverage(symbol, leverage)
+            armed.leverage_set = True
+            logger.info('Leverage set to %dx for %s', leverage, symbol)
+        except Exception:
+            logger.info('Leverage for %s not settable yet; it will be set at launch', symbol)
+        logger.info('Armed entry %s: qty=%s ref=%.8f id=%s', symbol, armed.params['quantity'], price, armed.client_order_id)
+        return armed
+
+    async def send_armed(self, armed: ArmedOrder, copies: int = 1, stagger: float = 0.0,
+                         book: OrderBook | None = None) -> dict | None:
+        """Send the armed entry (raced over `copies` connections) and return the raw response; API errors propagate.
+
+        A slippage-capped entry is first re-priced and re-sized from `book` if it
+        is synced; None (nothing sent) when the book cannot fill minQty or
+        minNotional within the cap.
+        """
+        if armed.max_slippage > 0 and book is not None and book.ready:
+            rules = self.rules.peek(armed.symbol)
+            if rules is not None:
+                with metrics.span('entry.book_walk', armed='1'):
+                    capped = self._cap_entry(armed.params, rules, armed.notional, armed.ref_price, armed.max_slippage, book)
+                if capped is None:
+                    return None
+                armed.qty = float(armed.params['quantity'])
+        resp, armed.hedge = await self._send_entry(armed.params, copies, stagger, armed='1')
+        return resp
+
+    async def reconcile_fill(self, armed: ArmedOrder, resp: dict) -> dict | None:
+        """Derive filled qty and entry price from the order response, querying the order once if needed.
+
+        None when a slippage-capped (IOC) entry filled nothing.
+        """
+        filled, avg = await self._fill(armed.symbol, armed.client_order_id, resp)
+        if armed.max_slippage > 0 and filled <= 0.0:
+            logger.error('Entry for %s got no fill at or below %s', armed.symbol, armed.params.get('price'))
+            return None
+
+        qty = filled if filled > 0.0 else armed.qty
+        entry_price = avg if avg > 0.0 else armed.ref_price
+        logger.info('Opened LONG: %s qty=%s entry=%.8f (ref %.8f)', armed.symbol, qty, entry_price, armed.ref_price)
+        return {'qty': qty, 'entry_price': entry_price, 'raw': resp, 'hedge': armed.hedge}
+
+    @staticmethod
+    def _format_qty(rules: SymbolRules | None, qty: float) -> str:
+        return rules.qty_scale.floor_text(qty) if rules else plain(qty)
+
+    @staticmethod
+    def _format_price(rules: SymbolRules | None, price: float) -> str:
+        return rules.format_price(price) if rules else plain(price)
+
+    @classmethod
+    def _trailing_stop_params(cls, symbol: str, qty: float, callback_rate: float, activation_price: float | None,
+                              rules: SymbolRules | None, hedge: bool) -> dict:
+        params = {
+            'symbol': symbol,
+            'side': 'SELL',
+            'type': 'TRAILING_STOP_MARKET',
+            'quantity': cls._format_qty(rules, qty),
+            'callbackRate': plain(callback_rate),
+            'workingType': 'MARK_PRICE',
+        }
+        if activation_price is not None:
+            params['activationPrice'] = cls._format_price(rules, activation_price)
+        if hedge:
+            params['positionSide'] = 'LONG'
+        return params
+
+    @classmethod
+    def _stop_loss_params(cls, symbol: str, stop_price: float, rules: SymbolRules | None, hedge: bool) -> dict:
+        params = {
+            'symbol': symbol,
+            'side': 'SELL',
+            'type': 'STOP_MARKET',
+            'stopPrice': cls._format_price(rules, stop_price),
+            'closePosition': 'true',
+            'workingType': 'MARK_PRICE',
+        }
+        # When using closePosition=true, quantity is not needed; include positionSide for hedge mode
+        if hedge:
+            params['positionSide'] = 'LONG'
+        return params
+
+    @staticmethod
+    def _fix_rejected_leg(params: dict, code: int | None, msg: str) -> bool:
+        """Adjust a rejected protective order in place for a known error; False if not retryable."""
+        msg = msg.lower()
+        if code == -1106 and 'reduceonly' in msg and 'reduceOnly' not in params:
+            params['reduceOnly'] = 'false'
+            return True
+        if code == -1102 and 'activationprice' in msg and 'activationPrice' in params:
+            # Retry without activation price (activate immediately)
+            params.pop('activationPrice', None)
+            return True
+        if code == -4061 and 'positionSide' not in params:
+            params['positionSide'] = 'LONG'
+            return True
+        return False
+
+    async def place_native_trailing_stop(self, symbol: str, qty: float, callback_rate: float = 1.0, activation_price: float | None = None):
+        try:
+            # tickSize for proper rounding of activationPrice
+            hedge, rules = await asyncio.gather(self.is_hedge_mode(), self.rules.get(symbol))
+            params = self._trailing_stop_params(symbol, qty, callback_rate, activation_price, rules, hedge)
+            try:
+                # Primary attempt
+                resp = await self.client.futures_create_order(**params)
+            except BinanceAPIException as e:
+                if self._fix_rejected_leg(params, getattr(e, 'code', None), str(e)):
+                    resp = await self.client.futures_create_order(**params)
+                else:
+                    raise
+            logger.info('Placed trailing stop: %s', resp)
+            return resp
+        except BinanceAPIException as e:
+            logger.warning('Trailing stop failed: %s', e)
+            return None
+        except Exception as e:
+            logger.exception('Unexpected trailing stop error: %s', e)
+            return None
+
+    async def place_stop_loss(self, symbol: str, qty: float, stop_price: float):
+        """Place a STOP_MARKET order to close the long if price drops to stop_price."""
+        try:
+            # Round stop price to tick size
+            hedge, rules = await asyncio.gather(self.is_hedge_mode(), self.rules.get(symbol))
+            params = self._stop_loss_params(symbol, stop_price, rules, hedge)
+
+            resp = await self.client.futures_create_order(**params)
+            logger.info('Placed stop-loss: %s', resp)
+            return resp
+        except BinanceAPIException as e:
+            logger.warning('Stop-loss failed: %s', e)
+            return None
+        except Exception as e:
+            logger.exception('Unexpected stop-loss error: %s', e)
+            return None
+
+    async def place_protective_orders(self, symbol: str, qty: float, stop_price: float, callback_rate: float = 1.0,
+                                      activation_price: float | None = None, hedge: bool | None = None, max_rounds: int = 2,
+                                      legs: tuple[str, ...] = ('trailing', 'stop_loss')) -> dict:
+        """Place trailing stop and stop-loss in one batchOrders request.
+
+        Legs rejected with a known, fixable error are adjusted and resubmitted on
+        their own; a leg that was accepted is never sent again. `legs` limits
+        the request to some of them (e.g. the ones missing after a restart).
+        Returns {leg: resp | None} for the requested legs.
+        """
+        if hedge is None:
+            hedge, rules = await asyncio.gather(self.is_hedge_mode(), self.rules.get(symbol))
+        else:
+            rules = await self.rules.get(symbol)
+
+        wanted = legs
+        legs = {}
+        if 'trailing' in wanted:
+            legs['trailing'] = self._trailing_stop_params(symbol, qty, callback_rate, activation_price, rules, hedge)
+            # Client ids make a resend after a lost response a harmless duplicate rejection
+            legs['trailing']['newClientOrderId'] = make_client_order_id('ts')
+        if 'stop_loss' in wanted:
+            legs['stop_loss'] = self._stop_loss_params(symbol, stop_price, rules, hedge)
+            legs['stop_loss']['newClientOrderId'] = make_client_order_id('sl')
+        placed: dict[str, dict | None] = {name: None for name in legs}
+        pending = list(legs)
+
+        for _ in range(max_rounds):
+            if not pending:
+                break
+            try:
+                with metrics.span('protection.batch', legs=str(len(pending))):
+                    results = await self.client.futures_place_batch_order(batchOrders=[legs[name] for name in pending])
+            except Exception as e:
+                logger.warning('Batch protective orders failed for %s: %s', symbol, e)
+                break
+
+            retry = []
+            for name, res in zip(pending, results):
+                code = res.get('code') if isinstance(res, dict) else None
+                if code is None or code == 200:
+                    placed[name] = res
+                    metrics.exchange_lag('exchange.protection_update_to_ack', res.get('updateTime'), self.client.timestamp_offset)
+                    logger.info('Placed %s: %s', name.replace('_', '-'), res)
+                elif self._fix_rejected_leg(legs[name], code, str(res.get('msg', ''))):
+                    self.account.on_error(code)
+                    logger.info('Retrying %s after %s: %s', name, code, res.get('msg'))
+                    retry.append(name)
+                else:
+                    logger.warning('%s rejected for %s: %s', name, symbol, res)
+            pending = retry
+
+        if pending:
+            # Batch endpoint unavailable or retries exhausted: fall back to one request per remaining leg
+            async def single(name: str):
+                try:
+                    with metrics.span('protection.single', leg=name):
+                        placed[name] = await self.client.futures_create_order(**legs[name])
+                    logger.info('Placed %s: %s', name.replace('_', '-'), placed[name])
+                except Exception as e:
+                    logger.warning('%s failed for %s: %s', name, symbol, e)
+
+            await asyncio.gather(*(single(name) for name in pending))
+        return placed
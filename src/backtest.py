@@ -0,0 +1,231 @@
+"""Replay past futures listings against the bot's entry and exit rules.
+
+    python -m src.backtest --data listings/ --stop-loss 0.005:0.05:0.005 \\
+        --activation 0.02:0.3:0.02 --callback 0.5,1,2,3,5 --leverage 5,10,20
+
+Each file in --data is one listing: CSV with a header row and columns
+`timestamp` (ms), `mark` (mark price) and optionally `last` (trade price),
+starting when the symbol opened. The file name without extension is the symbol.
+
+The simulation follows what the bot places on the exchange:
+
+- entry: MARKET buy `entry_delay` seconds after the open, filled at the trade
+  price (mark when there is none), sized at usdt * leverage;
+- stop-loss: STOP_MARKET closePosition at entry * (1 - stop_loss) on MARK_PRICE,
+  filled at the mark that triggered it;
+- trailing stop: TRAILING_STOP_MARKET on MARK_PRICE that activates once the mark
+  reaches entry * (1 + activation) and fires when the mark retraces `callback`
+  percent from its high since activation;
+- liquidation if the mark falls to entry * (1 - 1/leverage + maintenance)
+  before either stop, losing the whole margin;
+- otherwise the position is marked at the last price of the file.
+
+Returns are on margin (1.0 = +100%) after taker fees on both sides. Every
+listing is evaluated for the whole parameter grid at once with NumPy, and
+listings are spread over a process pool.
+"""
+import argparse
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+from src.config import config
+
+
+@dataclass
+class Series:
+    symbol: str
+    t_ms: np.ndarray
+    mark: np.ndarray
+    last: np.ndarray
+
+
+@dataclass
+class Grid:
+    """Parameter axes, in Config units: fractions for stop_loss/activation, percent for callback."""
+    stop_loss: np.ndarray
+    activation: np.ndarray
+    callback: np.ndarray
+    leverage: np.ndarray
+
+    @property
+    def shape(self) -> tuple[int, int, int, int]:
+        return len(self.stop_loss), len(self.activation), len(self.callback), len(self.leverage)
+
+    def combos(self):
+        return itertools.product(self.stop_loss, self.activation, self.callback, self.leverage)
+
+
+@dataclass
+class ListingResult:
+    symbol: str
+    opened_ms: int
+    returns: np.ndarray  # grid-shaped return on margin
+    adverse: np.ndarray  # grid-shaped worst mark-to-market return while the position was open
+
+
+def load_series(path: str, hours: float | None = None) -> Series:
+    data = np.loadtxt(path, delimiter=',', skiprows=1, ndmin=2)
+    t_ms, mark = data[:, 0], data[:, 1]
+    last = data[:, 2] if data.shape[1] > 2 else mark
+    if hours:
+        keep = t_ms <= t_ms[0] + hours * 3_600_000
+        t_ms, mark, last = t_ms[keep], mark[keep], last[keep]
+    return Series(os.path.splitext(os.path.basename(path))[0], t_ms, mark, last)
+
+
+def _first_at_or_below(running_min: np.ndarray, levels: np.ndarray) -> np.ndarray:
+    """Index of the first sample whose running minimum is <= each level (len if never)."""
+    return np.searchsorted(-running_min, -levels, side='left')
+
+
+def _first_at_or_above(running_max: np.ndarray, levels: np.ndarray) -> np.ndarray:
+    return np.searchsorted(running_max, levels, side='left')
+
+
+def simulate(series: Series, grid: Grid, entry_delay: float = 0.0, fee: float = 0.0005,
+             maintenance: float = 0.005) -> ListingResult:
+    """Evaluate one listing for every combination in `grid`."""
+    start = int(np.searchsorted(series.t_ms, series.t_ms[0] + entry_delay * 1000.0))
+    mark = series.mark[start:]
+    n = len(mark)
+    if n == 0:
+        raise ValueError(f'{series.symbol}: no data after the entry delay')
+    entry = float(series.last[start])
+    low = np.minimum.accumulate(mark)
+    high = np.maximum.accumulate(mark)
+
+    # Stop-loss and liquidation: first time the mark touches a fixed level
+    sl_idx = _first_at_or_below(low, entry * (1.0 - grid.stop_loss))  # (S,)
+    liq_idx = _first_at_or_below(low, entry * (1.0 - 1.0 / grid.leverage + maintenance))  # (L,)
+
+    # Trailing stop: once activated the tracked high equals the running high, so it fires
+    # at the first sample at or after activation with mark <= high * (1 - callback)
+    act_idx = _first_at_or_above(high, entry * (1.0 + grid.activation))  # (A,)
+    hit = mark[None, :] <= high[None, :] * (1.0 - grid.callback[:, None] / 100.0)  # (C, n)
+    positions = np.where(hit, np.arange(n), n)
+    next_hit = np.minimum.accumulate(positions[:, ::-1], axis=1)[:, ::-1]  # (C, n)
+    next_hit = np.concatenate([next_hit, np.full((len(grid.callback), 1), n)], axis=1)
+    trail_idx = next_hit[:, act_idx].T  # (A, C)
+
+    exit_idx = np.minimum(sl_idx[:, None, None], trail_idx[None, :, :])[..., None]  # (S, A, C, 1)
+    exit_idx = np.broadcast_to(exit_idx, grid.shape)
+    lev = grid.leverage[None, None, None, :]
+    liquidated = liq_idx[None, None, None, :] < exit_idx
+
+    exit_price = mark[np.minimum(exit_idx, n - 1)]
+    move = exit_price / entry - 1.0
+    returns = lev * move - lev * fee * (2.0 + move)
+    returns = np.where(liquidated, -1.0, np.maximum(returns, -1.0))
+
+    closed_at = np.where(liquidated, liq_idx[None, None, None, :], np.minimum(exit_idx, n - 1))
+    adverse = np.maximum(lev * (low[closed_at] / entry - 1.0), -1.0)
+    return ListingResult(series.symbol, int(series.t_ms[0]), returns, adverse)
+
+
+def _run_file(args) -> ListingResult:
+    path, grid, hours, entry_delay, fee, maintenance = args
+    return simulate(load_series(path, hours), grid, entry_delay, fee, maintenance)
+
+
+def run(paths: list[str], grid: Grid, hours: float | None = None, entry_delay: float = 0.0, fee: float = 0.0005,
+        maintenance: float = 0.005, workers: int | None = None) -> list[ListingResult]:
+    """Simulate every listing file, one process per file, ordered by listing time."""
+    jobs = [(p, grid, hours, entry_delay, fee, maintenance) for p in paths]
+    if workers == 1 or len(jobs) == 1:
+        results = [_run_file(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_run_file, jobs))
+    return sorted(results, key=lambda r: r.opened_ms)
+
+
+def summarize(results: list[ListingResult], grid: Grid) -> list[dict]:
+    """Per-combination statistics across listings, taken in listing order."""
+    returns = np.stack([r.returns for r in results])  # (N, S, A, C, L)
+    adverse = np.stack([r.adverse for r in results])
+    equity = np.cumsum(returns, axis=0)
+    peak = np.maximum.accumulate(np.maximum(equity, 0.0), axis=0)
+    stats = {
+        'mean': returns.mean(axis=0),
+        'total': returns.sum(axis=0),
+        'win_rate': (returns > 0).mean(axis=0),
+        'worst': returns.min(axis=0),
+        'worst_adverse': adverse.min(axis=0),
+        'max_drawdown': (peak - equity).max(axis=0),
+    }
+    # itertools.product walks the grid in the same (C) order as reshape
+    flat = {name: values.reshape(-1).tolist() for name, values in stats.items()}
+    rows = []
+    for i, (sl, act, cb, lev) in enumerate(grid.combos()):
+        row = {'stop_loss': float(sl), 'activation': float(act), 'callback': float(cb), 'leverage': int(lev),
+               'listings': len(results)}
+        row.update({name: values[i] for name, values in flat.items()})
+        rows.append(row)
+    return rows
+
+
+def format_table(rows: list[dict], sort: str = 'total', top: int = 20) -> str:
+    ordered = sorted(rows, key=lambda r: r[sort], reverse=sort not in ('max_drawdown',))[:top]
+    header = f'{"SL%":>6} {"ACT%":>6} {"CB%":>5} {"LEV":>4} {"N":>4} {"WIN%":>6} {"MEAN%":>8} {"TOTAL%":>9} {"WORST%":>8} {"MAE%":>8} {"MAXDD%":>8}'
+    lines = [header]
+    for r in ordered:
+        lines.append(
+            f'{r["stop_loss"] * 100:6.2f} {r["activation"] * 100:6.2f} {r["callback"]:5.2f} {r["leverage"]:4d} {r["listings"]:4d} '
+            f'{r["win_rate"] * 100:6.1f} {r["mean"] * 100:8.2f} {r["total"] * 100:9.2f} {r["worst"] * 100:8.2f} '
+            f'{r["worst_adverse"] * 100:8.2f} {r["max_drawdown"] * 100:8.2f}'
+        )
+    return '\n'.join(lines)
+
+
+def write_csv(rows: list[dict], path: str):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(','.join(rows[0]) + '\n')
+        for r in rows:
+            f.write(','.join(str(v) for v in r.values()) + '\n')
+
+
+def parse_axis(text: str) -> np.ndarray:
+    """'0.01,0.02' or 'start:stop:step' (stop inclusive)."""
+    if ':' in text:
+        start, stop, step = (float(x) for x in text.split(':'))
+        return np.round(np.arange(start, stop + step / 2.0, step), 10)
+    return np.array([float(x) for x in text.split(',') if x.strip()])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Replay past listings against entry/exit parameters')
+    parser.add_argument('--data', required=True, help='Directory of <SYMBOL>.csv files (timestamp,mark[,last])')
+    parser.add_argument('--stop-loss', default=str(config.STOP_LOSS_PCT), help='Fractions, e.g. 0.005:0.05:0.005')
+    parser.add_argument('--activation', default=str(config.TRAILING_ACTIVATION_PCT), help='Fractions above entry')
+    parser.add_argument('--callback', default=str(config.TRAILING_CALLBACK_PCT), help='Percent, e.g. 0.5,1,2')
+    parser.add_argument('--leverage', default=str(config.LEVERAGE))
+    parser.add_argument('--hours', type=float, default=4.0, help='Use this many hours after each open; 0 = all')
+    parser.add_argument('--entry-delay', type=float, default=0.0, help='Seconds between open and entry fill')
+    parser.add_argument('--fee', type=float, default=0.0005, help='Taker fee per side')
+    parser.add_argument('--maintenance', type=float, default=0.005, help='Maintenance margin rate for liquidation')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--sort', default='total', choices=['total', 'mean', 'win_rate', 'worst', 'worst_adverse', 'max_drawdown'])
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--out', help='Write every combination to this CSV file')
+    args = parser.parse_args()
+
+    files = sorted(os.path.join(args.data, f) for f in os.listdir(args.data) if f.endswith('.csv'))
+    if not files:
+        raise SystemExit(f'No .csv files in {args.data}')
+    grid = Grid(
+        stop_loss=parse_axis(args.stop_loss),
+        activation=parse_axis(args.activation),
+        callback=parse_axis(args.callback),
+        leverage=parse_axis(args.leverage).astype(int),
+    )
+    results = run(files, grid, hours=args.hours or None, entry_delay=args.entry_delay, fee=args.fee,
+                  maintenance=args.maintenance, workers=args.workers)
+    rows = summarize(results, grid)
+    print(f'{len(results)} listings x {len(rows)} combinations')
+    print(format_table(rows, sort=args.sort, top=args.top))
+    if args.out:
+        write_csv(rows, args.out)
@@ -12,14 +12,80 @@ class Config:
     TRADE_USDT: float = float(os.getenv('TRADE_USDT', '1'))
     LEVERAGE: int = int(os.getenv('LEVERAGE', '10'))
     LOG_LEVEL: str = os.getenv('LOG_LEVEL', 'INFO')
+    LOG_FORMAT: str = os.getenv('LOG_FORMAT', 'text')  # text | json (one object per line with a monotonic timestamp)
+    LOG_COLLAPSE_INTERVAL: float = float(os.getenv('LOG_COLLAPSE_INTERVAL', '10'))  # repeated countdown/monitor lines: one per interval
     POLL_INTERVAL: int = int(os.getenv('POLL_INTERVAL', '20'))
     ANNOUNCE_MAX_AGE_MINUTES: int = int(os.getenv('ANNOUNCE_MAX_AGE_MINUTES', '120'))
     # Risk controls
     STOP_LOSS_PCT: float = float(os.getenv('STOP_LOSS_PCT', '0.01'))  # 1% below entry
     TRAILING_ACTIVATION_PCT: float = float(os.getenv('TRAILING_ACTIVATION_PCT', '0.10'))  # activate at +10%
     TRAILING_CALLBACK_PCT: float = float(os.getenv('TRAILING_CALLBACK_PCT', '1.0'))  # 1% callback
+    # Depth-aware entry: LIMIT IOC at most this far above the best ask (0.02 = 2%), sized from the local book; 0 = MARKET
+    ENTRY_MAX_SLIPPAGE_PCT: float = float(os.getenv('ENTRY_MAX_SLIPPAGE_PCT', '0'))
+    DEPTH_BOOK_LEAD: float = float(os.getenv('DEPTH_BOOK_LEAD', '10'))  # subscribe to the diff-depth stream this many seconds before T-0
+    DEPTH_SNAPSHOT_LIMIT: int = int(os.getenv('DEPTH_SNAPSHOT_LIMIT', '100'))  # levels per side in the REST snapshot
+    # Symbol rules cache (exchange info filters)
+    SYMBOL_RULES_TTL: float = float(os.getenv('SYMBOL_RULES_TTL', '300'))  # seconds
+    SYMBOL_RULES_WARM_LEAD: int = int(os.getenv('SYMBOL_RULES_WARM_LEAD', '10'))  # re-warm this many seconds before T-0
+    # HTTP connection pool (keep-alive TLS to the futures host)
+    HTTP_POOL_SIZE: int = int(os.getenv('HTTP_POOL_SIZE', '10'))
+    HTTP_KEEPALIVE: float = float(os.getenv('HTTP_KEEPALIVE', '60'))  # idle seconds before a pooled connection is closed
+    FUTURES_REST_URL: str = os.getenv('FUTURES_REST_URL', '')  # e.g. http://127.0.0.1:8080/fapi; empty = Binance
+    FUTURES_WS_URL: str = os.getenv('FUTURES_WS_URL', 'wss://fstream.binance.com')
+    # Position monitor: fall back to REST when the mark stream is silent this long (seconds)
+    MONITOR_STALE_AFTER: float = float(os.getenv('MONITOR_STALE_AFTER', '3'))
+    # Launch timing (server-time synchronized)
+    CLOCK_SYNC_SAMPLES: int = int(os.getenv('CLOCK_SYNC_SAMPLES', '5'))
+    CLOCK_RESYNC_INTERVAL: float = float(os.getenv('CLOCK_RESYNC_INTERVAL', '30'))  # seconds
+    LAUNCH_SPIN_WINDOW: float = float(os.getenv('LAUNCH_SPIN_WINDOW', '0.05'))  # final approach on perf_counter, seconds
+    LAUNCH_SPIN_TAIL: float = float(os.getenv('LAUNCH_SPIN_TAIL', '0.002'))  # busy-wait only this last part, seconds
+    # Activation detection (probe schedule around T-0)
+    ACTIVATION_BURST_INTERVAL_MS: float = float(os.getenv('ACTIVATION_BURST_INTERVAL_MS', '20'))
+    ACTIVATION_BURST_WINDOW: float = float(os.getenv('ACTIVATION_BURST_WINDOW', '2'))  # seconds after T-0 at burst rate
+    ACTIVATION_MAX_INTERVAL: float = float(os.getenv('ACTIVATION_MAX_INTERVAL', '1'))  # backoff ceiling, seconds
+    ACTIVATION_PROBE_BURST: int = int(os.getenv('ACTIVATION_PROBE_BURST', '60'))  # probes allowed back to back
+    ACTIVATION_PROBE_RATE: float = float(os.getenv('ACTIVATION_PROBE_RATE', '5'))  # sustained probes per second
+    ACTIVATION_TIMEOUT: float = float(os.getenv('ACTIVATION_TIMEOUT', '60'))
+    ARM_LEAD: float = float(os.getenv('ARM_LEAD', '5'))  # build the armed entry this many seconds before T-0
+    # Warm-up before T-0: DNS, pooled TLS connections, caches, leverage, then keep-alive pings
+    WARMUP_LEAD: float = float(os.getenv('WARMUP_LEAD', '30'))  # seconds before T-0; 0 disables
+    WARMUP_CONNECTIONS: int = int(os.getenv('WARMUP_CONNECTIONS', '4'))  # capped at HTTP_POOL_SIZE
+    WARMUP_PING_INTERVAL: float = float(os.getenv('WARMUP_PING_INTERVAL', '5'))  # seconds between keep-alive pings
+    # Entry racing: send the same entry (one shared client order id) over this many pooled connections
+    ENTRY_RACE_COPIES: int = int(os.getenv('ENTRY_RACE_COPIES', '1'))  # 1 = a single request
+    ENTRY_RACE_STAGGER_MS: float = float(os.getenv('ENTRY_RACE_STAGGER_MS', '2'))  # delay between copies
+    JOB_PREP_LEAD: float = float(os.getenv('JOB_PREP_LEAD', '60'))  # start a job's countdown this many seconds before launch
+    # Rate limits (futures defaults); the model is corrected from response headers
+    RATE_WEIGHT_PER_MIN: int = int(os.getenv('RATE_WEIGHT_PER_MIN', '2400'))
+    RATE_ORDERS_PER_10S: int = int(os.getenv('RATE_ORDERS_PER_10S', '300'))
+    RATE_ORDERS_PER_MIN: int = int(os.getenv('RATE_ORDERS_PER_MIN', '1200'))
+    RATE_INFO_RESERVE: float = float(os.getenv('RATE_INFO_RESERVE', '0.3'))  # weight share informational calls leave for orders
+    RATE_MAX_INFO_DELAY: float = float(os.getenv('RATE_MAX_INFO_DELAY', '2'))  # drop informational calls that would wait longer
+    # Latency metrics: per-run spans/histograms appended as JSON lines to this file (e.g. metrics.jsonl); empty disables
+    METRICS_JSONL: str = os.getenv('METRICS_JSONL', '')
+    METRICS_PORT: int = int(os.getenv('METRICS_PORT', '0'))  # serve /metrics on 127.0.0.1:<port>; 0 disables
+    # Fan-out: credentials for several accounts entering the same listing (JSON array or JSON lines)
+    ACCOUNTS_FILE: str = os.getenv('ACCOUNTS_FILE', '')
+    # Market-data recorder: aggTrade/markPrice/depth of the launched symbol into RECORD_DIR; empty disables
+    RECORD_DIR: str = os.getenv('RECORD_DIR', '')
+    RECORD_LEAD: float = float(os.getenv('RECORD_LEAD', '10'))  # start this many seconds before launch
+    RECORD_MAX_DURATION: float = float(os.getenv('RECORD_MAX_DURATION', '3600'))  # stop after this long even if the position is open
+    RECORD_DEPTH_SPEED: str = os.getenv('RECORD_DEPTH_SPEED', '100ms')  # diff-depth update speed: 100ms, 250ms or 500ms
+    # Trade journal: lifecycle steps appended as JSON lines (e.g. journal.jsonl) and replayed on restart; empty disables
+    JOURNAL_PATH: str = os.getenv('JOURNAL_PATH', '')
 
 
 config = Config()
 
 
+@dataclass
+class TradeParams:
+    """Sizing and exit settings for one trade; defaults come from Config."""
+    usdt: float = config.TRADE_USDT
+    leverage: int = config.LEVERAGE
+    stop_loss_pct: float = config.STOP_LOSS_PCT
+    trailing_activation_pct: float = config.TRAILING_ACTIVATION_PCT
+    trailing_callback_pct: float = config.TRAILING_CALLBACK_PCT
+    max_slippage_pct: float = config.ENTRY_MAX_SLIPPAGE_PCT
+
+
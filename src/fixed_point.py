@@ -0,0 +1,87 @@
+from decimal import Decimal
+
+
+def parse_decimal(text: str) -> tuple[int, int]:
+    """Exact (mantissa, decimals) of a decimal string: '0.00100' -> (1, 3), '25' -> (25, 0), '1e-5' -> (1, 5)."""
+    text = text.strip().lower()
+    exp = 0
+    if 'e' in text:
+        text, _, e = text.partition('e')
+        exp = int(e)
+    whole, _, frac = text.partition('.')
+    frac = frac.rstrip('0')
+    mantissa = int((whole or '0') + frac)
+    decimals = len(frac) - exp
+    if decimals < 0:
+        return mantissa * 10 ** -decimals, 0
+    return mantissa, decimals
+
+
+def _format_units(units: int, decimals: int) -> str:
+    """Render `units` * 10**-decimals as a plain decimal string without trailing zeros."""
+    sign = '-' if units < 0 else ''
+    digits = str(abs(units))
+    if not decimals:
+        return sign + digits
+    digits = digits.rjust(decimals + 1, '0')
+    whole, frac = digits[:-decimals], digits[-decimals:].rstrip('0')
+    return f'{sign}{whole}.{frac}' if frac else sign + whole
+
+
+def plain(value: float) -> str:
+    """Shortest round-trip text of `value` without scientific notation (for fields with no filter)."""
+    text = repr(float(value))
+    if 'e' in text or 'n' in text:
+        text = format(Decimal(text), 'f')
+    return text[:-2] if text.endswith('.0') else text
+
+
+class Scale:
+    """One exchange increment (stepSize or tickSize) in integer fixed point.
+
+    The increment is held as `step` units of 10**-decimals, parsed once from
+    the filter string. `floor` maps a float to the number of whole increments
+    below it using exact integer arithmetic on the float's binary value, then
+    takes one increment more when that boundary is what the float stands for
+    (0.3 is stored as 0.2999..., but means 0.3). The result matches flooring
+    the float's shortest decimal repr with Decimal, without building Decimals
+    or going through strings. `format` renders increments as an exact,
+    exchange-ready string.
+    """
+
+    __slots__ = ('increment', 'step', 'decimals', 'factor')
+
+    def __init__(self, increment: str):
+        step, decimals = parse_decimal(increment)
+        if step <= 0:
+            raise ValueError(f'Increment must be positive: {increment!r}')
+        self.increment = increment
+        self.step = step
+        self.decimals = decimals
+        self.factor = 10 ** decimals
+
+    def __repr__(self) -> str:
+        return f'Scale({self.increment!r})'
+
+    def floor(self, value: float) -> int:
+        """Number of whole increments in `value` (rounded toward -inf)."""
+        num, den = float(value).as_integer_ratio()
+        count = (num * self.factor) // (den * self.step)
+        if ((count + 1) * self.step) / self.factor == value:
+            count += 1
+        return count
+
+    def ceil_text(self, text: str) -> int:
+        """Fewest whole increments reaching the decimal string `text` (e.g. minQty)."""
+        mantissa, decimals = parse_decimal(text)
+        num, den = mantissa * self.factor, 10 ** decimals * self.step
+        return -(-num // den)
+
+    def to_float(self, count: int) -> float:
+        return (count * self.step) / self.factor
+
+    def format(self, count: int) -> str:
+        return _format_units(count * self.step, self.decimals)
+
+    def floor_text(self, value: float) -> str:
+        return self.format(self.floor(value))
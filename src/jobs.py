@@ -0,0 +1,139 @@
+import asyncio
+import heapq
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, TypeVar
+
+from src.config import TradeParams
+
+logger = logging.getLogger('jobs')
+
+T = TypeVar('T')
+
+
+@dataclass
+class Job:
+    symbol: str
+    at: datetime
+    params: TradeParams = field(default_factory=TradeParams)
+    armed: bool = False
+    ref_price: float | None = None
+
+    @property
+    def name(self) -> str:
+        return f'{self.symbol}@{self.at.strftime("%H:%M:%S")}'
+
+
+def _parse_at(value: str) -> datetime:
+    dt = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def job_from_dict(d: dict, parse_at: Callable[[str], datetime] = _parse_at) -> Job:
+    """Build a Job from one job-file entry. Only `symbol` and `at_utc` are required."""
+    defaults = TradeParams()
+    params = TradeParams(
+        usdt=float(d.get('usdt', defaults.usdt)),
+        leverage=int(d.get('leverage', defaults.leverage)),
+        stop_loss_pct=float(d.get('stop_loss_pct', defaults.stop_loss_pct)),
+        trailing_activation_pct=float(d.get('trailing_activation_pct', defaults.trailing_activation_pct)),
+        trailing_callback_pct=float(d.get('trailing_callback_pct', defaults.trailing_callback_pct)),
+        max_slippage_pct=float(d.get('max_slippage_pct', defaults.max_slippage_pct)),
+    )
+    ref_price = d.get('ref_price')
+    return Job(
+        symbol=str(d['symbol']),
+        at=parse_at(str(d['at_utc'])),
+        params=params,
+        armed=bool(d.get('armed', ref_price is not None)),
+        ref_price=float(ref_price) if ref_price is not None else None,
+    )
+
+
+def load_entries(path: str, build: Callable[[dict, int], T], kind: str) -> list[T]:
+    """Read a JSON array of entries, or one JSON object per line ('#' lines skipped), and build each one."""
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    stripped = text.lstrip()
+    if stripped.startswith('['):
+        entries = json.loads(stripped)
+    else:
+        entries = [json.loads(line) for line in text.splitlines() if line.strip() and not line.lstrip().startswith('#')]
+    out = []
+    for i, entry in enumerate(entries):
+        try:
+            out.append(build(entry, i))
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f'Invalid {kind} #{i + 1} in {path}: {e}') from e
+    return out
+
+
+def load_jobs(path: str, parse_at: Callable[[str], datetime] = _parse_at) -> list[Job]:
+    """Read a job file: either a JSON array of entries or one JSON object per line."""
+    jobs = load_entries(path, lambda entry, i: job_from_dict(entry, parse_at), 'job')
+    names = [job.name for job in jobs]
+    if len(set(names)) != len(names):
+        raise ValueError(f'Duplicate jobs (same symbol and second) in {path}')
+    return jobs
+
+
+class JobScheduler:
+    """Runs many launch jobs in one event loop.
+
+    Jobs wait in a heap ordered by launch time and each is started as its own
+    task `prep_lead` seconds before it fires. A job that raises is logged and
+    dropped; it never blocks the queue or another job's countdown. Outcomes are
+    kept in `results` by job name, so two jobs may not share a name.
+    """
+
+    def __init__(self, run_job: Callable[[Job], Awaitable[None]], now: Callable[[], float] = time.time, prep_lead: float = 60.0):
+        self.run_job = run_job
+        self.now = now
+        self.prep_lead = prep_lead
+        self._queue: list[tuple[float, int, Job]] = []
+        self._seq = 0
+        self._names: set[str] = set()
+        self.results: dict[str, str] = {}
+
+    def add(self, job: Job):
+        if job.name in self._names:
+            raise ValueError(f'Duplicate job {job.name}')
+        self._names.add(job.name)
+        heapq.heappush(self._queue, (job.at.timestamp(), self._seq, job))
+        self._seq += 1
+
+    async def _guarded(self, job: Job):
+        try:
+            await self.run_job(job)
+            self.results[job.name] = 'done'
+        except asyncio.CancelledError:
+            self.results[job.name] = 'cancelled'
+            raise
+        except Exception as e:
+            self.results[job.name] = f'failed: {e}'
+            logger.exception('Job %s failed: %s', job.name, e)
+
+    async def run(self):
+        tasks: list[asyncio.Task] = []
+        logger.info('Scheduled %d jobs', len(self._queue))
+        try:
+            while self._queue:
+                at, _, job = self._queue[0]
+                wait = at - self.prep_lead - self.now()
+                if wait > 0:
+                    await asyncio.sleep(min(wait, 1.0))
+                    continue
+                heapq.heappop(self._queue)
+                logger.info('Starting job %s (%.1fs to launch)', job.name, at - self.now())
+                tasks.append(asyncio.create_task(self._guarded(job), name=job.name))
+            await asyncio.gather(*tasks)
+        finally:
+            for t in tasks:
+                t.cancel()
+        for name, outcome in self.results.items():
+            logger.info('Job %s: %s', name, outcome)
@@ -0,0 +1,211 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+
+logger = logging.getLogger('journal')
+
+# Lifecycle steps, in order
+SCHEDULED = 'scheduled'
+LEVERAGE = 'leverage'
+ENTRY = 'entry'
+PROTECTION = 'protection'
+CLOSED = 'closed'
+FAILED = 'failed'
+
+
+@dataclass
+class TradeState:
+    """A trade folded from its journal records."""
+    client_order_id: str
+    symbol: str = ''
+    at: float | None = None
+    params: dict = field(default_factory=dict)
+    steps: list[str] = field(default_factory=list)
+    qty: float | None = None
+    entry_price: float | None = None
+    hedge: bool | None = None
+    legs: dict[str, dict] = field(default_factory=dict)
+    reason: str | None = None
+
+    @property
+    def step(self) -> str | None:
+        return self.steps[-1] if self.steps else None
+
+    @property
+    def finished(self) -> bool:
+        return CLOSED in self.steps or FAILED in self.steps
+
+    @property
+    def entered(self) -> bool:
+        return ENTRY in self.steps
+
+    @property
+    def attempted(self) -> bool:
+        """The entry may have been sent: LEVERAGE is recorded right before the first entry send."""
+        return ENTRY in self.steps or LEVERAGE in self.steps
+
+    def apply(self, rec: dict):
+        step = rec.get('step')
+        if step not in self.steps:
+            self.steps.append(step)
+        for key in ('symbol', 'at', 'params', 'qty', 'entry_price', 'hedge', 'reason'):
+            if rec.get(key) is not None:
+                setattr(self, key, rec[key])
+        if step == PROTECTION and rec.get('leg'):
+            self.legs[rec['leg']] = {k: rec.get(k) for k in ('order_id', 'leg_id')}
+
+
+def replay(path: str) -> dict[str, TradeState]:
+    """Fold every record in `path` into per-trade state, keyed by entry client order id.
+
+    A torn last line (the process died mid-write) is ignored.
+    """
+    trades: dict[str, TradeState] = {}
+    if not path or not os.path.exists(path):
+        return trades
+    with open(path, 'r', encoding='utf-8') as f:
+        for n, line in enumerate(f, 1):
+            try:
+                rec = json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning('Skipping unreadable journal line %d in %s', n, path)
+                continue
+            cid = rec.get('id')
+            if cid:
+                trades.setdefault(cid, TradeState(cid)).apply(rec)
+    return trades
+
+
+class Journal:
+    """Append-only JSON-lines trade journal with batched fsync.
+
+    `record` only enqueues; a writer thread appends whatever has accumulated
+    (waiting up to `batch_interval` seconds for more), then fsyncs once for the
+    whole batch, so the order path never blocks on the disk. `sync` waits until
+    everything recorded so far is durable and `close` drains the queue. Each
+    record carries the entry's client order id, so `replay` can rebuild every
+    trade after a crash. Also keeps the folded state in memory (`trades`).
+    """
+
+    def __init__(self, path: str, batch_interval: float = 0.005):
+        self.path = path
+        self.batch_interval = batch_interval
+        self.trades = replay(path)
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._written = 0
+        self._enqueued = 0
+        self._cond = threading.Condition()
+        self._file = open(path, 'a', encoding='utf-8')
+        self._thread = threading.Thread(target=self._writer, name='journal', daemon=True)
+        self._thread.start()
+
+    def record(self, step: str, client_order_id: str, **fields) -> TradeState:
+        rec = {'t': round(time.time(), 6), 'step': step, 'id': client_order_id, **fields}
+        state = self.trades.setdefault(client_order_id, TradeState(client_order_id))
+        state.apply(rec)
+        with self._cond:
+            self._enqueued += 1
+        self._queue.put(rec)
+        return state
+
+    def open_trades(self) -> list[TradeState]:
+        return [t for t in self.trades.values() if not t.finished and t.symbol]
+
+    def _writer(self):
+        while True:
+            rec = self._queue.get()
+            if rec is None:
+                return
+            batch = [rec]
+            deadline = time.monotonic() + self.batch_interval
+            while True:
+                try:
+                    rec = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if rec is None:
+                    self._write(batch)
+                    return
+                batch.append(rec)
+            self._write(batch)
+
+    def _write(self, batch: list[dict]):
+        try:
+            self._file.write(''.join(json.dumps(rec, separators=(',', ':')) + '\n' for rec in batch))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        except OSError as e:
+            logger.error('Journal write failed (%d records): %s', len(batch), e)
+        with self._cond:
+            self._written += len(batch)
+            self._cond.notify_all()
+
+    def sync(self, timeout: float | None = None) -> bool:
+        """Block until every record so far is on disk; False on timeout."""
+        with self._cond:
+            target = self._enqueued
+            return self._cond.wait_for(lambda: self._written >= target, timeout)
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self._file.close()
+
+
+PROTECTIVE_TYPES = {'TRAILING_STOP_MARKET': 'trailing', 'STOP_MARKET': 'stop_loss'}
+
+
+@dataclass
+class Resume:
+    """What is left to do for an interrupted trade whose position is still open."""
+    trade: TradeState
+    qty: float
+    entry_price: float
+    hedge: bool
+    missing_legs: list[str]
+
+
+def reconcile(trades: list[TradeState], positions: list[dict], open_orders: list[dict],
+              now: float) -> tuple[list[Resume], dict[str, tuple[str, str]]]:
+    """Match unfinished journal trades against one snapshot of positions and open orders.
+
+    Returns the trades to resume (position open: place missing protective legs,
+    then monitor) and {client_order_id: (step, reason)} for trades that can be
+    finished in the journal. Trades whose launch is still ahead are left alone
+    to be launched again. A position is only taken over by a trade whose
+    launch time has passed and whose entry may have been sent; any other long
+    on the symbol (opened by hand, or before the bot) is left untouched.
+    """
+    resumes: list[Resume] = []
+    finished: dict[str, tuple[str, str]] = {}
+    for trade in trades:
+        longs = [p for p in positions if p.get('symbol') == trade.symbol and p.get('positionSide', 'BOTH') in ('BOTH', 'LONG')
+                 and float(p.get('positionAmt') or 0.0) > 0.0]
+        due = trade.at is None or trade.at <= now
+        if longs and not (due and trade.attempted):
+            logger.warning('%s has an open long that %s did not open (%s); leaving it alone', trade.symbol,
+                           trade.client_order_id, 'launch still ahead' if not due else 'entry never sent')
+            if due:
+                finished[trade.client_order_id] = (FAILED, 'entry never sent; existing position not adopted')
+        elif longs:
+            p = longs[0]
+            legs = {PROTECTIVE_TYPES[o['type']] for o in open_orders
+                    if o.get('symbol') == trade.symbol and o.get('type') in PROTECTIVE_TYPES and o.get('side') == 'SELL'}
+            entry_price = float(p.get('entryPrice') or 0.0) or trade.entry_price or float(p.get('markPrice') or 0.0)
+            resumes.append(Resume(
+                trade=trade,
+                qty=float(p['positionAmt']),
+                entry_price=entry_price,
+                hedge=p.get('positionSide') == 'LONG',
+                missing_legs=[leg for leg in ('trailing', 'stop_loss') if leg not in legs],
+            ))
+        elif trade.entered:
+            finished[trade.client_order_id] = (CLOSED, 'flat on restart')
+        elif due:
+            finished[trade.client_order_id] = (FAILED, 'no position after launch time')
+    return resumes, finished
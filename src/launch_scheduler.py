@@ -0,0 +1,173 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Awaitable, Callable
+from binance import AsyncClient
+
+from src.log_pipeline import collapse
+
+logger = logging.getLogger('launch_scheduler')
+
+
+@dataclass
+class ClockSample:
+    offset: float  # server - local, seconds
+    rtt: float  # seconds
+
+
+@dataclass
+class FireReport:
+    target: float  # server epoch seconds the order should arrive at
+    planned_send: float  # server epoch seconds we aimed to send at (target - rtt/2)
+    actual_send: float  # server epoch seconds we actually released
+    offset: float
+    rtt: float
+
+    @property
+    def error_ms(self) -> float:
+        return (self.actual_send - self.planned_send) * 1000.0
+
+
+class ServerClock:
+    """Estimates the offset between the local clock and the futures server clock.
+
+    Each sync takes several samples of futures_time() and keeps the one with the
+    lowest round trip, assuming the server stamped it halfway through.
+    `followers` are further clients (other accounts on the same host) whose
+    signed timestamps follow the same offset without sampling it themselves.
+    """
+
+    def __init__(self, client: AsyncClient, samples: int = 5, followers: list[AsyncClient] | None = None):
+        self.client = client
+        self.samples = samples
+        self.followers = followers or []
+        self.offset = 0.0
+        self.rtt = 0.0
+        self.synced_at: float | None = None
+
+    async def _sample(self) -> ClockSample:
+        t0 = time.perf_counter()
+        wall0 = time.time()
+        server_ms = (await self.client.futures_time())['serverTime']
+        rtt = time.perf_counter() - t0
+        return ClockSample(offset=server_ms / 1000.0 - (wall0 + rtt / 2.0), rtt=rtt)
+
+    async def sync(self) -> ClockSample:
+        best: ClockSample | None = None
+        for _ in range(max(1, self.samples)):
+            try:
+                s = await self._sample()
+            except Exception as e:
+                logger.warning('Server time sample failed: %s', e)
+                continue
+            if best is None or s.rtt < best.rtt:
+                best = s
+        if best is None:
+            raise RuntimeError('Unable to sample server time')
+        self.offset = best.offset
+        self.rtt = best.rtt
+        self.synced_at = time.monotonic()
+        # Keep signed request timestamps on the same clock
+        for client in (self.client, *self.followers):
+            client.timestamp_offset = int(self.offset * 1000)
+        logger.debug('Clock sync: offset=%.2f ms rtt=%.2f ms', self.offset * 1000.0, self.rtt * 1000.0)
+        return best
+
+    def server_now(self) -> float:
+        return time.time() + self.offset
+
+
+class LaunchScheduler:
+    """Waits until a server-time instant, releasing early by half the measured RTT.
+
+    The countdown sleeps coarsely, re-syncs the clock every `resync_interval`
+    seconds (and once more shortly before launch), then for the final
+    `spin_window` seconds sleeps on perf_counter in short steps and busy-spins
+    only the last `spin_tail` seconds, so other jobs sharing the event loop
+    are held up for at most that long.
+    """
+
+    def __init__(self, clock: ServerClock, resync_interval: float = 30.0, final_resync_lead: float = 5.0, spin_window: float = 0.05,
+                 spin_tail: float = 0.002):
+        self.clock = clock
+        self.resync_interval = resync_interval
+        self.final_resync_lead = final_resync_lead
+        self.spin_window = spin_window
+        self.spin_tail = spin_tail
+
+    def _send_at(self, target: float) -> float:
+        """Server epoch second to release the request so it lands at `target`."""
+        return target - self.clock.rtt / 2.0
+
+    async def wait_until(self, at: datetime, label: str = '', hooks: list[tuple[float, Callable[[], Awaitable]]] | None = None) -> FireReport:
+        """Sleep until `at` (server time). `hooks` are (lead_seconds, fn) pairs run once each.
+
+        A hook may take at most the time left before the spin window; one that
+        is still running then is cancelled, so a slow exchange cannot delay T-0.
+        """
+        target = at.timestamp()
+        pending = sorted(hooks or [], key=lambda h: -h[0])
+        if self.clock.synced_at is None:
+            await self.clock.sync()
+        final_synced = False
+        last_logged = None
+
+        while True:
+            remaining = self._send_at(target) - self.clock.server_now()
+            if remaining <= self.spin_window:
+                break
+
+            if pending and remaining <= pending[0][0]:
+                lead, fn = pending.pop(0)
+                budget = remaining - self.spin_window
+                try:
+                    await asyncio.wait_for(fn(), budget)
+                except asyncio.TimeoutError:
+                    logger.warning('Pre-launch hook (T-%.1fs) for %s cancelled after %.3fs to keep the launch on time', lead, label, budget)
+                except Exception as e:
+                    logger.warning('Pre-launch hook failed: %s', e)
+                continue
+            # Sync age is read from the clock itself so schedulers sharing it don't re-sync redundantly
+            if not final_synced and remaining <= self.final_resync_lead:
+                if self._sync_age() > 1.0:
+                    await self._resync()
+                final_synced = True
+                continue
+            if remaining > self.final_resync_lead + 1.0 and self._sync_age() >= self.resync_interval:
+                await self._resync()
+                continue
+
+            whole = int(remaining)
+            if whole != last_logged and whole >= 1:
+                hrs = whole // 3600
+                mins = (whole % 3600) // 60
+                secs = whole % 60
+                logger.info('T-minus %02d:%02d:%02d for %s', hrs, mins, secs, label, extra=collapse(f'countdown:{label}'))
+                last_logged = whole
+
+            # Sleep to the next whole second boundary, but never into the spin window
+            step = remaining - whole if remaining - whole > 1e-3 else 1.0
+            await asyncio.sleep(max(0.0, min(step, remaining - self.spin_window)))
+
+        # Final phase: convert to a perf_counter deadline, yield the loop until the last stretch, then spin
+        planned = self._send_at(target)
+        deadline = time.perf_counter() + (planned - self.clock.server_now())
+        while (left := deadline - time.perf_counter()) > self.spin_tail:
+            await asyncio.sleep(left - self.spin_tail)
+        while time.perf_counter() < deadline:
+            pass
+        actual = self.clock.server_now()
+        return FireReport(target=target, planned_send=planned, actual_send=actual, offset=self.clock.offset, rtt=self.clock.rtt)
+
+    def _sync_age(self) -> float:
+        if self.clock.synced_at is None:
+            return float('inf')
+        return time.monotonic() - self.clock.synced_at
+
+    async def _resync(self):
+        try:
+            await self.clock.sync()
+        except Exception as e:
+            logger.warning('Clock re-sync failed; keeping previous offset: %s', e)
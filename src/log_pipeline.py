@@ -0,0 +1,144 @@
+import atexit
+import json
+import logging
+import queue
+import sys
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import TextIO
+
+TEXT_FORMAT = '%(asctime)s %(levelname)s [%(name)s] %(message)s'
+
+_listener: QueueListener | None = None
+
+
+def collapse(key: str) -> dict:
+    """`extra` for a log call that repeats: at most one such line per key and interval reaches the output."""
+    return {'collapse': key}
+
+
+class HotPathQueueHandler(QueueHandler):
+    """Hands records to the listener thread without formatting them.
+
+    The stock QueueHandler renders the message in the caller so records can be
+    pickled; within one process that is unnecessary, so `%` formatting of large
+    arguments (exchange responses) happens on the writer thread instead. The
+    caller only stamps the record with a monotonic time and enqueues it, which
+    means log arguments must not be mutated after the call.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.mono = time.monotonic()
+        return record
+
+
+class CollapseFilter(logging.Filter):
+    """Drops repeats of records tagged with `collapse(key)` within `interval` seconds.
+
+    The next record let through for a key carries `suppressed`, the number of
+    lines dropped since the previous one.
+    """
+
+    def __init__(self, interval: float = 10.0):
+        super().__init__()
+        self.interval = interval
+        self._last: dict[str, tuple[float, int]] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = getattr(record, 'collapse', None)
+        if key is None or self.interval <= 0:
+            return True
+        now = time.monotonic()
+        last, suppressed = self._last.get(key, (None, 0))
+        if last is not None and now - last < self.interval:
+            self._last[key] = (last, suppressed + 1)
+            return False
+        self._last[key] = (now, 0)
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        suppressed = getattr(record, 'suppressed', 0)
+        return f'{line} (+{suppressed} similar)' if suppressed else line
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: wall-clock `ts`, monotonic `mono` seconds, level, logger and message."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        out = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='microseconds'),
+            'mono': round(getattr(record, 'mono', time.monotonic()), 6),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        suppressed = getattr(record, 'suppressed', 0)
+        if suppressed:
+            out['suppressed'] = suppressed
+        if record.exc_info:
+            out['exc'] = self.formatException(record.exc_info)
+        return json.dumps(out, default=str)
+
+
+def setup_logging(level: str | int = 'INFO', fmt: str = 'text', collapse_interval: float = 10.0,
+                  stream: TextIO | None = None) -> QueueListener:
+    """Route all logging through a queue to a background writer thread.
+
+    Replaces the root handlers. `fmt` is 'text' or 'json'. The writer is
+    drained and flushed by `shutdown_logging`, which runs at exit and after an
+    uncaught exception has been logged.
+    """
+    global _listener
+    shutdown_logging()
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    if fmt == 'json':
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(TextFormatter(TEXT_FORMAT, datefmt='%H:%M:%S'))
+
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    handler = HotPathQueueHandler(records)
+    handler.addFilter(CollapseFilter(collapse_interval))
+
+    root = logging.getLogger()
+    for h in root.handlers[:]:
+        root.removeHandler(h)
+        h.close()
+    root.addHandler(handler)
+    root.setLevel(level)
+
+    _listener = QueueListener(records, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    sys.excepthook = _log_uncaught
+    return _listener
+
+
+def shutdown_logging():
+    """Write out everything still queued and stop the writer thread; safe to call more than once."""
+    global _listener
+    listener, _listener = _listener, None
+    if listener is None:
+        return
+    listener.stop()
+    for h in listener.handlers:
+        try:
+            h.flush()
+        except (OSError, ValueError):
+            # Output already closed (interpreter teardown); nothing left to save
+            pass
+
+
+def _log_uncaught(exc_type, exc, tb):
+    if not issubclass(exc_type, KeyboardInterrupt):
+        logging.getLogger('main').critical('Uncaught exception', exc_info=(exc_type, exc, tb))
+    shutdown_logging()
+    if issubclass(exc_type, KeyboardInterrupt):
+        sys.__excepthook__(exc_type, exc, tb)
@@ -1,186 +1,328 @@
 import asyncio
 import logging
 import argparse
+import signal
 import sys
+import time
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass
 from datetime import datetime, timezone
-from binance.client import Client
+from typing import Awaitable, Callable
+from binance import AsyncClient
 from binance.exceptions import BinanceAPIException
 
-from src.config import config
-from src.executor import FuturesExecutor
+from src.account_state import AsyncAccountStateCache
+from src.accounts import Account, account_journal_path, load_accounts
+from src.activation import ActivationDetector, ActivationTimeout, ProbeBudget
+from src.async_executor import ArmedOrder, AsyncFuturesExecutor, EntryStatusUnknown
+from src.config import TradeParams, config
+from src.jobs import Job, JobScheduler, load_jobs
+from src.journal import CLOSED, ENTRY, FAILED, LEVERAGE, PROTECTION, SCHEDULED, Journal, Resume, reconcile
+from src.launch_scheduler import LaunchScheduler, ServerClock
+from src.log_pipeline import setup_logging
+from src.metrics import metrics
+from src.monitor import PositionMonitor
+from src.order_book import DepthFeed
+from src.order_race import entry_client_order_id
+from src.rate_limiter import Priority, RateLimiter, WeightBudget, request_priority
+from src.recorder import Recorder
+from src.session import PooledAsyncClient
+from src.symbol_rules import AsyncSymbolRulesCache
+from src.warmup import Warmup
+
+
+# Log calls only enqueue; a background thread formats and writes
+setup_logging(config.LOG_LEVEL, fmt=config.LOG_FORMAT, collapse_interval=config.LOG_COLLAPSE_INTERVAL)
+logger = logging.getLogger('main')
 
+# Request weight is counted per IP, so every client in this process draws from one budget
+weight_budget = WeightBudget(config.RATE_WEIGHT_PER_MIN)
+
+
+async def create_client(api_key: str | None = None, api_secret: str | None = None) -> PooledAsyncClient:
+    return await PooledAsyncClient.create(
+        api_key or config.API_KEY,
+        api_secret or config.API_SECRET,
+        testnet=False,
+        pool_size=config.HTTP_POOL_SIZE,
+        keepalive=config.HTTP_KEEPALIVE,
+        futures_url=config.FUTURES_REST_URL or None,
+        limiter=RateLimiter(
+            weight_per_min=config.RATE_WEIGHT_PER_MIN,
+            orders_per_10s=config.RATE_ORDERS_PER_10S,
+            orders_per_min=config.RATE_ORDERS_PER_MIN,
+            info_reserve=config.RATE_INFO_RESERVE,
+            max_info_delay=config.RATE_MAX_INFO_DELAY,
+            weight=weight_budget,
+        ),
+    )
 
-logging.basicConfig(
-    level=getattr(logging, config.LOG_LEVEL),
-    format='%(asctime)s %(levelname)s [%(name)s] %(message)s',
-    datefmt='%H:%M:%S',
-    stream=sys.stdout,
-    force=True,
-)
-logger = logging.getLogger('main')
 
+def create_rules_cache(client: AsyncClient) -> AsyncSymbolRulesCache:
+    return AsyncSymbolRulesCache(client, ttl=config.SYMBOL_RULES_TTL)
 
-def create_client():
-    return Client(config.API_KEY, config.API_SECRET, testnet=False)
 
+def create_account_state(client: AsyncClient) -> AsyncAccountStateCache:
+    return AsyncAccountStateCache(client)
 
-async def on_new_listing(symbol: str):
-    logger.info('New futures listing: %s', symbol)
-    client = create_client()
 
-    ex = FuturesExecutor(client)
+def create_journal(path: str | None = None) -> Journal | None:
+    path = config.JOURNAL_PATH if path is None else path
+    return Journal(path) if path else None
+
+
+def _journal(journal: Journal | None, step: str, client_order_id: str, **fields):
+    if journal is not None:
+        journal.record(step, client_order_id, **fields)
+
+
+def _journal_protection(journal: Journal | None, client_order_id: str, placed: dict):
+    for leg, resp in placed.items():
+        if resp is not None:
+            _journal(journal, PROTECTION, client_order_id, leg=leg, order_id=resp.get('orderId'), leg_id=resp.get('clientOrderId'))
+
+
+async def place_protection(ex: AsyncFuturesExecutor, symbol: str, qty: float, entry: float, hedge: bool | None = None,
+                           params: TradeParams | None = None, legs: tuple[str, ...] = ('trailing', 'stop_loss')) -> dict:
+    """Place the server-side trailing stop and stop-loss in one batch request; returns {leg: resp | None}."""
+    params = params or TradeParams()
+    activation = entry * (1.0 + params.trailing_activation_pct)
+    sl = entry * (1.0 - params.stop_loss_pct)
     try:
-        chosen_lev = ex.set_leverage(symbol, config.LEVERAGE)
+        placed = await ex.place_protective_orders(
+            symbol,
+            qty,
+            stop_price=sl,
+            callback_rate=params.trailing_callback_pct,
+            activation_price=activation,
+            hedge=hedge,
+            legs=legs,
+        )
     except Exception as e:
-        logger.error('Failed to set leverage for %s: %s', symbol, e)
-        return
+        logger.exception('Failed to place protective orders: %s', e)
+        return {}
 
-    res = ex.open_futures_long(symbol, config.TRADE_USDT, leverage=chosen_lev)
-    if not res:
-        logger.error('Open long failed for %s', symbol)
-        return
+    # Trailing stop with server-side activation using env percentages
+    if placed.get('trailing') is not None:
+        logger.info('Placed server-side trailing stop for %s with activation %.8f (callback %.3f%%)', symbol, activation, params.trailing_callback_pct)
+    elif 'trailing' in legs:
+        logger.error('Failed to place server-side trailing stop for %s', symbol)
+
+    # Stop-loss at configured pct below entry (MARK_PRICE, closePosition)
+    if placed.get('stop_loss') is not None:
+        logger.info('Placed stop-loss for %s at %.8f', symbol, sl)
+    elif 'stop_loss' in legs:
+        logger.error('Failed to place stop-loss for %s', symbol)
+    return placed
 
-    qty = res['qty']
-    entry = res['entry_price']
 
-    # Place trailing stop immediately with server-side activation using env percentages
+async def monitor_until_close(client: AsyncClient, symbol: str, entry: float, hedge: bool | None = None,
+                              account: AsyncAccountStateCache | None = None) -> bool:
+    """Follow the position until it is flat; False if monitoring stopped on an error."""
     try:
-        activation = entry * (1.0 + config.TRAILING_ACTIVATION_PCT)
-        ex.place_native_trailing_stop(symbol, qty, callback_rate=config.TRAILING_CALLBACK_PCT, activation_price=activation)
-        logger.info('Placed server-side trailing stop for %s with activation %.8f (callback %.3f%%)', symbol, activation, config.TRAILING_CALLBACK_PCT)
+        account = account or create_account_state(client)
+        if hedge is None:
+            hedge = await account.hedge_mode()
+        monitor = PositionMonitor(
+            client,
+            symbol,
+            entry,
+            hedge,
+            ws_url=config.FUTURES_WS_URL,
+            stale_after=config.MONITOR_STALE_AFTER,
+            account=account,
+        )
+        await monitor.run()
+        return True
     except Exception as e:
-        logger.exception('Failed to place server-side trailing stop: %s', e)
+        logger.exception('Monitor until close error: %s', e)
+        return False
+
 
-    # Place stop-loss at configured pct below entry (MARK_PRICE, closePosition)
+async def on_new_listing(symbol: str):
+    logger.info('New futures listing: %s', symbol)
+    client = await create_client()
     try:
-        sl = entry * (1.0 - config.STOP_LOSS_PCT)
-        ex.place_stop_loss(symbol, qty, stop_price=sl)
-        logger.info('Placed stop-loss for %s at %.8f', symbol, sl)
-    except Exception as e:
-        logger.exception('Failed to place stop-loss: %s', e)
+        ex = AsyncFuturesExecutor(client, create_rules_cache(client))
+        try:
+            chosen_lev = await ex.set_leverage(symbol, config.LEVERAGE)
+        except Exception as e:
+            logger.error('Failed to set leverage for %s: %s', symbol, e)
+            return
 
-    async def monitor_until_close():
         try:
-            hedge = False
-            try:
-                hedge = FuturesExecutor(client).is_hedge_mode()
-            except Exception:
-                hedge = False
-            while True:
-                pos_list = client.futures_position_information(symbol=symbol)
-                remaining = 0.0
-                for p in pos_list:
-                    side = p.get('positionSide') or 'BOTH'
-                    amt = float(p.get('positionAmt') or 0.0)
-                    if hedge:
-                        if side == 'LONG':
-                            remaining = abs(amt)
-                            break
-                    else:
-                        remaining = abs(amt)
-                        break
-                mark = float(client.futures_mark_price(symbol=symbol)['markPrice'])
-                try:
-                    change_pct = ((mark / entry) - 1.0) * 100.0 if entry else 0.0
-                except Exception:
-                    change_pct = 0.0
-                logger.info('Position %s: remaining=%.8f mark=%.8f entry=%.8f (%.2f%%)', symbol, remaining, mark, entry, change_pct)
-                if remaining <= 1e-10:
-                    logger.info('Position closed for %s. Exiting monitor.', symbol)
-                    break
-                await asyncio.sleep(1.0)
+            res = await ex.open_futures_long(symbol, config.TRADE_USDT, leverage=chosen_lev)
         except Exception as e:
-            logger.exception('Monitor until close error: %s', e)
+            logger.error('Futures buy failed for %s: %s', symbol, e)
+            return
+        if not res:
+            logger.error('Open long failed for %s', symbol)
+            return
 
-    await monitor_until_close()
+        await place_protection(ex, symbol, res['qty'], res['entry_price'], hedge=res.get('hedge'))
+        await monitor_until_close(client, symbol, res['entry_price'], hedge=res.get('hedge'))
+    finally:
+        await client.close_connection()
 
 
-async def execute_immediate_trade(client: Client, symbol: str, leverage: int):
-    ex = FuturesExecutor(client)
+def create_warmup(client: PooledAsyncClient, rules: AsyncSymbolRulesCache, account: AsyncAccountStateCache,
+                  clock: ServerClock) -> Warmup:
+    return Warmup(client, rules, account, clock, connections=config.WARMUP_CONNECTIONS, ping_interval=config.WARMUP_PING_INTERVAL)
 
-    # Set leverage with quick retries in case the symbol is not yet active at the exact second
-    lev_set = False
-    for attempt in range(15):  # up to ~15s
-        try:
-            ex.set_leverage(symbol, leverage)
-            lev_set = True
-            break
-        except BinanceAPIException as e:
-            code = getattr(e, 'code', None)
-            if code == -1121:  # Invalid symbol (not active yet)
-                await asyncio.sleep(1.0)
-                continue
-            raise
-        except Exception:
-            await asyncio.sleep(1.0)
-            continue
-    if not lev_set:
-        logger.error('Could not set leverage for %s after retries', symbol)
-        return
 
-    # Open market long with retries if symbol just became active
-    res = None
-    for attempt in range(15):
-        res = ex.open_futures_long(symbol, config.TRADE_USDT, leverage=leverage)
-        if res:
-            break
-        await asyncio.sleep(1.0)
-    if not res:
-        logger.error('Open long failed for %s after retries', symbol)
+@asynccontextmanager
+async def recording(sym: str, hooks: list):
+    """Record `sym`'s market streams from RECORD_LEAD seconds before launch until the block exits.
+
+    Adds the start as a countdown hook; yields the Recorder (None when RECORD_DIR
+    is empty) so a launch without a countdown can start it itself.
+    """
+    if not config.RECORD_DIR:
+        yield None
         return
-    qty = res['qty']
-    entry = res['entry_price']
+    recorder = Recorder(sym, config.RECORD_DIR, config.FUTURES_WS_URL, depth_speed=config.RECORD_DEPTH_SPEED,
+                        max_duration=config.RECORD_MAX_DURATION or None)
+
+    async def start():
+        recorder.start()
 
-    # Place trailing stop immediately with server-side activation using env percentages
+    hooks.append((config.RECORD_LEAD, start))
     try:
-        activation = entry * (1.0 + config.TRAILING_ACTIVATION_PCT)
-        ex.place_native_trailing_stop(symbol, qty, callback_rate=config.TRAILING_CALLBACK_PCT, activation_price=activation)
-        logger.info('Placed server-side trailing stop for %s with activation %.8f (callback %.3f%%)', symbol, activation, config.TRAILING_CALLBACK_PCT)
-    except Exception as e:
-        logger.exception('Failed to place server-side trailing stop: %s', e)
+        yield recorder
+    finally:
+        # Joining the recorder thread must not block the event loop
+        await asyncio.to_thread(recorder.stop)
+
+
+@asynccontextmanager
+async def depth_book(client: AsyncClient, sym: str, params: TradeParams, hooks: list):
+    """Keep a local order book for a slippage-capped entry, subscribed DEPTH_BOOK_LEAD seconds before launch.
+
+    Yields the DepthFeed (None when the trade has no slippage cap). The owner
+    stops it once every entry sized from it is done; leaving the block stops
+    it anyway.
+    """
+    if params.max_slippage_pct <= 0:
+        yield None
+        return
+    feed = DepthFeed(client, sym, config.FUTURES_WS_URL, snapshot_limit=config.DEPTH_SNAPSHOT_LIMIT)
+
+    async def start():
+        feed.start()
 
-    # Place stop-loss at configured pct below entry (MARK_PRICE, closePosition)
+    hooks.append((config.DEPTH_BOOK_LEAD, start))
     try:
-        sl = entry * (1.0 - config.STOP_LOSS_PCT)
-        ex.place_stop_loss(symbol, qty, stop_price=sl)
-        logger.info('Placed stop-loss for %s at %.8f', symbol, sl)
-    except Exception as e:
-        logger.exception('Failed to place stop-loss: %s', e)
+        yield feed
+    finally:
+        await feed.stop()
+
+
+def create_activation_detector(launch_at: float | None = None, clock: ServerClock | None = None) -> ActivationDetector:
+    return ActivationDetector(
+        launch_at=launch_at,
+        now=clock.server_now if clock else time.time,
+        burst_interval=config.ACTIVATION_BURST_INTERVAL_MS / 1000.0,
+        burst_window=config.ACTIVATION_BURST_WINDOW,
+        max_interval=config.ACTIVATION_MAX_INTERVAL,
+        budget=ProbeBudget(capacity=config.ACTIVATION_PROBE_BURST, refill_per_sec=config.ACTIVATION_PROBE_RATE),
+        timeout=config.ACTIVATION_TIMEOUT,
+    )
 
-    async def monitor_until_close():
-        try:
-            hedge = False
+
+async def execute_immediate_trade(client: AsyncClient, symbol: str, leverage: int, rules: AsyncSymbolRulesCache | None = None,
+                                  armed: ArmedOrder | None = None, launch_at: float | None = None, clock: ServerClock | None = None,
+                                  params: TradeParams | None = None, account: AsyncAccountStateCache | None = None,
+                                  journal: Journal | None = None, client_order_id: str | None = None,
+                                  depth: DepthFeed | None = None, entry_done: Callable[[], Awaitable] | None = None):
+    """Enter `symbol` once it accepts orders, protect the position and monitor it until it closes.
+
+    `entry_done` is awaited once the entry and protection are finished (or
+    failed), before monitoring starts.
+    """
+    params = params or TradeParams(leverage=leverage)
+    ex = AsyncFuturesExecutor(client, rules or create_rules_cache(client), account or create_account_state(client))
+    # One client order id per launch, shared by probes and raced copies. It does not stop a second fill by
+    # itself: ambiguous sends are looked up by this id before any resend, and extra race fills are closed
+    # before protection is placed
+    client_order_id = client_order_id or entry_client_order_id(symbol, launch_at if launch_at is not None else time.time())
+    copies, stagger = config.ENTRY_RACE_COPIES, config.ENTRY_RACE_STAGGER_MS / 1000.0
+    # Dense probing right around launch so a symbol that goes live late is caught within milliseconds
+    detector = create_activation_detector(launch_at, clock)
+
+    try:
+        # Entry and protection outrank informational calls for the shared rate budget
+        with request_priority(Priority.ORDER):
+            # Set leverage as soon as the symbol accepts it
+            # (skipped without a request if the account cache already has it, e.g. set while arming)
+            if not (armed is not None and armed.leverage_set):
+                try:
+                    with metrics.span('trade.set_leverage', symbol=symbol):
+                        await detector.wait(lambda: ex.account.set_leverage(symbol, leverage), 'set_leverage')
+                    logger.info('Leverage set to %dx for %s', leverage, symbol)
+                except ActivationTimeout:
+                    logger.error('Could not set leverage for %s after retries', symbol)
+                    _journal(journal, FAILED, client_order_id, reason='leverage timeout')
+                    return
+                except BinanceAPIException as e:
+                    logger.error('Failed to set leverage %dx for %s: %s', leverage, symbol, e)
+                    _journal(journal, FAILED, client_order_id, reason=f'leverage {e.code}')
+                    return
+            _journal(journal, LEVERAGE, client_order_id, leverage=leverage)
+
+            # Open market long; an armed entry is itself the probe, so it fires the moment the symbol opens
             try:
-                hedge = FuturesExecutor(client).is_hedge_mode()
-            except Exception:
-                hedge = False
-            while True:
-                pos_list = client.futures_position_information(symbol=symbol)
-                remaining = 0.0
-                for p in pos_list:
-                    side = p.get('positionSide') or 'BOTH'
-                    amt = float(p.get('positionAmt') or 0.0)
-                    if hedge:
-                        if side == 'LONG':
-                            remaining = abs(amt)
-                            break
+                with metrics.span('trade.entry', symbol=symbol):
+                    book = depth.book if depth is not None else None
+                    if armed is not None:
+                        resp = await detector.wait(lambda: ex.send_armed(armed, copies, stagger, book=book), 'entry')
+                        res = await ex.reconcile_fill(armed, resp) if resp is not None else None
                     else:
-                        remaining = abs(amt)
-                        break
-                mark = float(client.futures_mark_price(symbol=symbol)['markPrice'])
-                try:
-                    change_pct = ((mark / entry) - 1.0) * 100.0 if entry else 0.0
-                except Exception:
-                    change_pct = 0.0
-                logger.info('Position %s: remaining=%.8f mark=%.8f entry=%.8f (%.2f%%)', symbol, remaining, mark, entry, change_pct)
-                if remaining <= 1e-10:
-                    logger.info('Position closed for %s. Exiting monitor.', symbol)
-                    break
-                await asyncio.sleep(1.0)
-        except Exception as e:
-            logger.exception('Monitor until close error: %s', e)
-
-    await monitor_until_close()
+                        res = await detector.wait(lambda: ex.open_futures_long(
+                            symbol, params.usdt, leverage=leverage, client_order_id=client_order_id, copies=copies, stagger=stagger,
+                            book=book, max_slippage=params.max_slippage_pct,
+                        ), 'entry')
+            except ActivationTimeout:
+                logger.error('Open long failed for %s after retries', symbol)
+                _journal(journal, FAILED, client_order_id, reason='entry timeout')
+                return
+            except EntryStatusUnknown as e:
+                # Possibly filled: left unfinished in the journal so a restart reconciles it with the exchange
+                logger.error('Entry for %s may or may not have filled; not resending: %s', symbol, e)
+                return
+            except BinanceAPIException as e:
+                # Not an activation miss (e.g. -2019 margin insufficient): retrying cannot help
+                logger.error('Futures buy failed: %s', e)
+                _journal(journal, FAILED, client_order_id, reason=f'entry {e.code}')
+                return
+            except Exception as e:
+                logger.exception('Unexpected entry error for %s: %s', symbol, e)
+                _journal(journal, FAILED, client_order_id, reason='entry error')
+                return
+            if not res:
+                # Sized below the symbol filters (or, capped by the book, below them), or a capped entry that filled nothing
+                _journal(journal, FAILED, client_order_id, reason='entry not opened')
+                return
+
+            qty = res['qty']
+            entry = res['entry_price']
+            _journal(journal, ENTRY, client_order_id, qty=qty, entry_price=entry, hedge=res.get('hedge'),
+                     order_id=(res.get('raw') or {}).get('orderId'))
+
+            if copies > 1:
+                # Every copy that got through filled: close the extra size before protecting the position
+                with metrics.span('trade.confirm_race', symbol=symbol):
+                    await ex.confirm_race(symbol, qty, bool(res.get('hedge')))
+
+            with metrics.span('trade.protection', symbol=symbol):
+                placed = await place_protection(ex, symbol, qty, entry, hedge=res.get('hedge'), params=params)
+            _journal_protection(journal, client_order_id, placed)
+    finally:
+        if entry_done is not None:
+            # Shared pre-launch resources (the depth book) are released by their owner
+            await entry_done()
+
+    if await monitor_until_close(client, symbol, entry, hedge=res.get('hedge'), account=ex.account):
+        _journal(journal, CLOSED, client_order_id)
 
 
 async def main_loop():
@@ -209,57 +351,417 @@ def _parse_utc_datetime(s: str) -> datetime:
     return dt.astimezone(timezone.utc)
 
 
-async def manual_flow(symbol: str, at_utc: str | None):
-    # Normalize symbol (allow coin like BTC -> BTCUSDT)
+def normalize_symbol(symbol: str) -> str:
+    # Allow coin like BTC -> BTCUSDT
     sym = symbol.upper()
     if not sym.endswith('USDT'):
         sym = sym + 'USDT'
+    return sym
+
+
+async def prepare(client: AsyncClient, rules: AsyncSymbolRulesCache, clock: ServerClock, symbols: list[str],
+                  account: AsyncAccountStateCache | None = None):
+    """Warm shared state once: symbol filters, account state and clock offset, fetched together."""
+    account = account or create_account_state(client)
+    warm_res, account_res, sync_res = await asyncio.gather(
+        metrics.timed('prepare.rules_warm', rules.warm()),
+        metrics.timed('prepare.account_state', account.load()),
+        metrics.timed('prepare.clock_sync', clock.sync()),
+        return_exceptions=True,
+    )
 
-    client = create_client()
-    ex = FuturesExecutor(client)
+    # Warm symbol filters now so the order path never downloads exchange info
+    if isinstance(warm_res, BaseException):
+        logger.warning('Symbol rules warm-up failed; will retry near launch: %s', warm_res)
+    else:
+        for sym in symbols:
+            if not rules.peek(sym):
+                logger.warning('%s not yet in exchange info; will retry near launch', sym)
 
     # Detect and log position mode (Hedge vs One-way)
-    try:
-        hedge = ex.is_hedge_mode()
-        logger.info('Position mode detected: %s', 'Hedge' if hedge else 'One-way')
-    except Exception:
+    if isinstance(account_res, BaseException):
         logger.info('Position mode detection failed; proceeding')
+    else:
+        logger.info('Position mode detected: %s', 'Hedge' if account.hedge else 'One-way')
+        for sym in symbols:
+            if account.leverage.get(sym):
+                logger.info('%s leverage currently %dx', sym, account.leverage[sym])
+
+    if isinstance(sync_res, BaseException):
+        logger.warning('Server time sync failed; using local clock: %s', sync_res)
+    else:
+        logger.info('Server clock offset %.2f ms, rtt %.2f ms', clock.offset * 1000.0, clock.rtt * 1000.0)
+
+
+async def count_down(clock: ServerClock, sym: str, dt: datetime, delay: float, hooks: list):
+    """Wait on server time until `dt`, running `hooks` on the way, and log how precisely it fired."""
+    logger.info('Manual mode: waiting until %s UTC (%.1fs) for %s', dt.isoformat(), delay, sym)
+    scheduler = LaunchScheduler(
+        clock,
+        resync_interval=config.CLOCK_RESYNC_INTERVAL,
+        spin_window=config.LAUNCH_SPIN_WINDOW,
+        spin_tail=config.LAUNCH_SPIN_TAIL,
+    )
+    report = await scheduler.wait_until(dt, sym, hooks=hooks)
+    metrics.observe('launch.fire_error', report.error_ms, symbol=sym)
+    logger.info(
+        'Launch fired for %s: error=%+.3f ms (offset=%.2f ms, rtt=%.2f ms)',
+        sym, report.error_ms, report.offset * 1000.0, report.rtt * 1000.0,
+    )
+
+
+async def launch(client: AsyncClient, rules: AsyncSymbolRulesCache, clock: ServerClock, sym: str, dt: datetime | None,
+                 params: TradeParams, armed_mode: bool = False, ref_price: float | None = None,
+                 account: AsyncAccountStateCache | None = None, journal: Journal | None = None):
+    """Count down to `dt` on server time, then trade `sym`."""
+    account = account or create_account_state(client)
+    ex = AsyncFuturesExecutor(client, rules, account)
+    armed: ArmedOrder | None = None
+    client_order_id = entry_client_order_id(sym, dt.timestamp() if dt else time.time())
+    _journal(journal, SCHEDULED, client_order_id, symbol=sym, at=dt.timestamp() if dt else None, params=asdict(params))
+
+    async def arm():
+        nonlocal armed
+        armed = await ex.arm_futures_long(sym, params.usdt, params.leverage, ref_price=ref_price,
+                                          client_order_id=client_order_id if dt else None, max_slippage=params.max_slippage_pct)
+        if armed is None:
+            logger.warning('Arming failed for %s; will size the order at launch', sym)
+
+    delay = (dt.timestamp() - clock.server_now()) if dt else 0
+    # Refresh filters just before T-0 so the TTL cannot lapse at launch
+    # (jobs sharing the cache skip the download if another job just did it)
+    hooks = [(config.SYMBOL_RULES_WARM_LEAD, lambda: rules.warm(max_age=config.SYMBOL_RULES_WARM_LEAD))]
+    if armed_mode:
+        hooks.append((config.ARM_LEAD, arm))
+    # Connections, caches and leverage hot before T-0; keep-alive pings run until launch fires
+    warmup = create_warmup(client, rules, account, clock)
+    if config.WARMUP_LEAD > 0:
+        hooks.append((config.WARMUP_LEAD, lambda: warmup.run(sym, params.leverage)))
+    async with recording(sym, hooks) as recorder, depth_book(client, sym, params, hooks) as depth:
+        if delay > 0:
+            try:
+                await count_down(clock, sym, dt, delay, hooks)
+            finally:
+                warmup.stop()
+        elif armed_mode:
+            await arm()
+        # No-ops when the countdown hooks already started them
+        if recorder is not None:
+            recorder.start()
+        if depth is not None:
+            depth.start()
+
+        await execute_immediate_trade(
+            client, sym, params.leverage, rules,
+            armed=armed, launch_at=dt.timestamp() if dt else None, clock=clock, params=params, account=account,
+            journal=journal, client_order_id=client_order_id, depth=depth,
+            # The book only sizes the entry
+            entry_done=depth.stop if depth is not None else None,
+        )
+
+
+async def resume_trade(client: AsyncClient, rules: AsyncSymbolRulesCache, account: AsyncAccountStateCache,
+                       journal: Journal, resume: Resume):
+    """Pick up an interrupted trade whose position is open: add missing protective legs, then monitor."""
+    trade = resume.trade
+    cid = trade.client_order_id
+    params = TradeParams(**trade.params) if trade.params else TradeParams()
+    if not trade.entered:
+        # Filled, but the process died before the ack was journaled
+        journal.record(ENTRY, cid, qty=resume.qty, entry_price=resume.entry_price, hedge=resume.hedge)
+    if resume.missing_legs:
+        ex = AsyncFuturesExecutor(client, rules, account)
+        with request_priority(Priority.ORDER):
+            placed = await place_protection(ex, trade.symbol, resume.qty, resume.entry_price, hedge=resume.hedge,
+                                            params=params, legs=tuple(resume.missing_legs))
+        _journal_protection(journal, cid, placed)
+    if await monitor_until_close(client, trade.symbol, resume.entry_price, hedge=resume.hedge, account=account):
+        journal.record(CLOSED, cid)
+
+
+async def recover(client: AsyncClient, rules: AsyncSymbolRulesCache, account: AsyncAccountStateCache,
+                  journal: Journal | None) -> list[asyncio.Task]:
+    """Reconcile unfinished journal trades with the exchange and resume them.
+
+    One bulk query of positions and open orders covers every trade. Trades
+    with an open position are resumed in background tasks (returned to the
+    caller to await); trades that are flat are finished in the journal.
+    """
+    trades = journal.open_trades() if journal is not None else []
+    if not trades:
+        return []
+    start = time.perf_counter()
+    with request_priority(Priority.ORDER):
+        positions, open_orders = await asyncio.gather(client.futures_position_information(), client.futures_get_open_orders())
+    account.update_positions(positions)
+    resumes, finished = reconcile(trades, positions, open_orders, time.time())
+    for cid, (step, reason) in finished.items():
+        journal.record(step, cid, reason=reason)
+        logger.info('Journal: %s %s (%s)', journal.trades[cid].symbol, step, reason)
+    tasks = []
+    for resume in resumes:
+        logger.warning('Journal: resuming %s at %s, position %s, missing legs: %s', resume.trade.symbol,
+                       resume.trade.step, resume.qty, ', '.join(resume.missing_legs) or 'none')
+        tasks.append(asyncio.create_task(resume_trade(client, rules, account, journal, resume)))
+    elapsed_ms = (time.perf_counter() - start) * 1000.0
+    metrics.observe('journal.recovery', elapsed_ms, start=start)
+    logger.info('Journal recovery: %d unfinished trade(s) reconciled in %.1f ms (%d resumed, %d finished)',
+                len(trades), elapsed_ms, len(resumes), len(finished))
+    return tasks
+
+
+def _already_handled(journal: Journal | None, sym: str, dt: datetime | None) -> bool:
+    """True if the journal shows this launch already entered or finished (a restart must not trade it again)."""
+    if journal is None or dt is None:
+        return False
+    trade = journal.trades.get(entry_client_order_id(sym, dt.timestamp()))
+    if trade is not None and (trade.entered or trade.finished):
+        logger.info('Journal: %s at %s already %s; not launching again', sym, dt.isoformat(), trade.step)
+        return True
+    return False
+
+
+async def start_metrics_endpoint():
+    if not config.METRICS_PORT:
+        return None
+    try:
+        return await metrics.serve(config.METRICS_PORT)
+    except OSError as e:
+        logger.warning('Metrics endpoint not started on port %d: %s', config.METRICS_PORT, e)
+        return None
+
 
-    dt = _parse_utc_datetime(at_utc) if at_utc else None
-    now = datetime.now(tz=timezone.utc)
-    delay = (dt - now).total_seconds() if dt else 0
-    if delay > 0:
-        logger.info('Manual mode: waiting until %s UTC (%.1fs) for %s', dt.isoformat(), delay, sym)
-        while True:
-            now = datetime.now(tz=timezone.utc)
-            remaining = int((dt - now).total_seconds())
-            if remaining <= 0:
-                break
-            hrs = remaining // 3600
-            mins = (remaining % 3600) // 60
-            secs = remaining % 60
-            logger.info('T-minus %02d:%02d:%02d for %s', hrs, mins, secs, sym)
-            await asyncio.sleep(1.0)
-
-    await execute_immediate_trade(client, sym, config.LEVERAGE)
+async def finish_metrics(endpoint):
+    """Write this run's spans and histograms, then stop the metrics endpoint."""
+    if config.METRICS_JSONL:
+        try:
+            metrics.write_jsonl(config.METRICS_JSONL)
+        except OSError as e:
+            logger.warning('Could not write metrics to %s: %s', config.METRICS_JSONL, e)
+    if endpoint is not None:
+        await endpoint.cleanup()
+
+
+async def manual_flow(symbol: str, at_utc: str | None, armed_mode: bool = False, ref_price: float | None = None):
+    sym = normalize_symbol(symbol)
+    endpoint = await start_metrics_endpoint()
+    journal = create_journal()
+    with metrics.span('flow.create_client'):
+        client = await create_client()
+    try:
+        rules = create_rules_cache(client)
+        account = create_account_state(client)
+        # Interrupted trades first: an unprotected position cannot wait for the countdown setup
+        resumed = await recover(client, rules, account, journal)
+        clock = ServerClock(client, samples=config.CLOCK_SYNC_SAMPLES)
+        with metrics.span('flow.prepare'):
+            await prepare(client, rules, clock, [sym], account)
+        dt = _parse_utc_datetime(at_utc) if at_utc else None
+        if not _already_handled(journal, sym, dt):
+            await launch(client, rules, clock, sym, dt, TradeParams(), armed_mode=armed_mode, ref_price=ref_price,
+                         account=account, journal=journal)
+        await asyncio.gather(*resumed)
+    finally:
+        await client.close_connection()
+        await finish_metrics(endpoint)
+        if journal is not None:
+            journal.close()
+
+
+async def jobs_flow(path: str):
+    """Run every job in `path` on one client, one symbol-rules cache and one server clock."""
+    jobs = load_jobs(path, parse_at=_parse_utc_datetime)
+    for job in jobs:
+        job.symbol = normalize_symbol(job.symbol)
+    endpoint = await start_metrics_endpoint()
+    journal = create_journal()
+    with metrics.span('flow.create_client'):
+        client = await create_client()
+    try:
+        rules = create_rules_cache(client)
+        account = create_account_state(client)
+        resumed = await recover(client, rules, account, journal)
+        clock = ServerClock(client, samples=config.CLOCK_SYNC_SAMPLES)
+        with metrics.span('flow.prepare'):
+            await prepare(client, rules, clock, sorted({job.symbol for job in jobs}), account)
+
+        async def run_job(job: Job):
+            if _already_handled(journal, job.symbol, job.at):
+                return
+            await launch(client, rules, clock, job.symbol, job.at, job.params, armed_mode=job.armed, ref_price=job.ref_price,
+                         account=account, journal=journal)
+
+        scheduler = JobScheduler(run_job, now=clock.server_now, prep_lead=config.JOB_PREP_LEAD)
+        for job in jobs:
+            scheduler.add(job)
+        await scheduler.run()
+        await asyncio.gather(*resumed)
+    finally:
+        await client.close_connection()
+        await finish_metrics(endpoint)
+        if journal is not None:
+            journal.close()
+
+
+@dataclass
+class AccountSlot:
+    """One account's client, caches and journal in a fan-out launch."""
+    account: Account
+    client: PooledAsyncClient
+    state: AsyncAccountStateCache
+    params: TradeParams
+    journal: Journal | None = None
+    armed: ArmedOrder | None = None
+
+
+async def fanout_launch(slots: list[AccountSlot], rules: AsyncSymbolRulesCache, clock: ServerClock, sym: str,
+                        dt: datetime | None, armed_mode: bool = True, ref_price: float | None = None):
+    """Count down once to `dt`, then enter `sym` on every account at the same instant.
+
+    Symbol rules, the clock offset and the sizing reference price are fetched
+    once, on the first account's client, and shared. Each account arms its own
+    signed entry and sends it at T-0 over its own connection pool, all from one
+    gather. Protection and monitoring then run per account.
+    """
+    lead = slots[0]
+    client_order_id = entry_client_order_id(sym, dt.timestamp() if dt else time.time())
+    for slot in slots:
+        _journal(slot.journal, SCHEDULED, client_order_id, symbol=sym, at=dt.timestamp() if dt else None,
+                 params=asdict(slot.params), account=slot.account.name)
+
+    async def arm_all():
+        try:
+            price = ref_price or await AsyncFuturesExecutor(lead.client, rules, lead.state).mark_price(sym)
+        except Exception as e:
+            logger.warning('No reference price for %s (%s); accounts will size their entries at launch', sym, e)
+            return
+
+        async def arm(slot: AccountSlot):
+            ex = AsyncFuturesExecutor(slot.client, rules, slot.state)
+            slot.armed = await ex.arm_futures_long(sym, slot.params.usdt, slot.params.leverage, ref_price=price,
+                                                   client_order_id=client_order_id, max_slippage=slot.params.max_slippage_pct)
+
+        await asyncio.gather(*(arm(slot) for slot in slots))
+        logger.info('Armed %d/%d accounts for %s at reference %.8f', sum(s.armed is not None for s in slots), len(slots), sym, price)
+
+    warmups = [create_warmup(slot.client, rules, slot.state, clock) for slot in slots]
+
+    async def warm_all():
+        # Rules and clock are shared: only the first account warms them
+        await asyncio.gather(*(w.run(sym, slot.params.leverage, public=i == 0)
+                               for i, (w, slot) in enumerate(zip(warmups, slots))))
+
+    delay = (dt.timestamp() - clock.server_now()) if dt else 0
+    hooks = [(config.SYMBOL_RULES_WARM_LEAD, lambda: rules.warm(max_age=config.SYMBOL_RULES_WARM_LEAD))]
+    if armed_mode:
+        hooks.append((config.ARM_LEAD, arm_all))
+    if config.WARMUP_LEAD > 0:
+        hooks.append((config.WARMUP_LEAD, warm_all))
+    # One book for all accounts, on the first account's client
+    async with recording(sym, hooks) as recorder, depth_book(lead.client, sym, lead.params, hooks) as depth:
+        if delay > 0:
+            try:
+                await count_down(clock, sym, dt, delay, hooks)
+            finally:
+                for w in warmups:
+                    w.stop()
+        elif armed_mode:
+            await arm_all()
+        if recorder is not None:
+            recorder.start()
+        if depth is not None:
+            depth.start()
+
+        entering = len(slots)
+
+        async def entry_done():
+            # Every account sizes from the shared book: stop it after the last entry
+            nonlocal entering
+            entering -= 1
+            if entering == 0 and depth is not None:
+                await depth.stop()
+
+        results = await asyncio.gather(*(
+            execute_immediate_trade(
+                slot.client, sym, slot.params.leverage, rules,
+                armed=slot.armed, launch_at=dt.timestamp() if dt else None, clock=clock, params=slot.params,
+                account=slot.state, journal=slot.journal, client_order_id=client_order_id, depth=depth,
+                entry_done=entry_done,
+            )
+            for slot in slots
+        ), return_exceptions=True)
+    for slot, res in zip(slots, results):
+        if isinstance(res, BaseException):
+            logger.error('Account %s failed on %s: %s', slot.account.name, sym, res)
+
+
+async def fanout_flow(symbol: str, at_utc: str | None, accounts_path: str, armed_mode: bool = True,
+                      ref_price: float | None = None):
+    """Run one listing on every account in `accounts_path`, sharing the public-data work."""
+    sym = normalize_symbol(symbol)
+    accounts = load_accounts(accounts_path)
+    if not accounts:
+        raise SystemExit(f'No accounts in {accounts_path}')
+    endpoint = await start_metrics_endpoint()
+    with metrics.span('flow.create_client', accounts=str(len(accounts))):
+        clients = await asyncio.gather(*(create_client(a.api_key, a.api_secret) for a in accounts), return_exceptions=True)
+    slots: list[AccountSlot] = []
+    try:
+        for account, client in zip(accounts, clients):
+            if isinstance(client, BaseException):
+                raise RuntimeError(f'Could not connect account {account.name}: {client}') from client
+            slots.append(AccountSlot(account, client, create_account_state(client), account.params(TradeParams()),
+                                     create_journal(account_journal_path(config.JOURNAL_PATH, account.name))))
+        lead = slots[0]
+        rules = create_rules_cache(lead.client)
+        resumed = [task for tasks in await asyncio.gather(*(recover(s.client, rules, s.state, s.journal) for s in slots))
+                   for task in tasks]
+        clock = ServerClock(lead.client, samples=config.CLOCK_SYNC_SAMPLES, followers=[s.client for s in slots[1:]])
+        with metrics.span('flow.prepare'):
+            await asyncio.gather(prepare(lead.client, rules, clock, [sym], lead.state), *(s.state.load() for s in slots[1:]))
+        dt = _parse_utc_datetime(at_utc) if at_utc else None
+        pending = [s for s in slots if not _already_handled(s.journal, sym, dt)]
+        if pending:
+            logger.info('Fan-out of %s over %d accounts: %s', sym, len(pending), ', '.join(s.account.name for s in pending))
+            await fanout_launch(pending, rules, clock, sym, dt, armed_mode=armed_mode, ref_price=ref_price)
+        await asyncio.gather(*resumed)
+    finally:
+        for client in clients:
+            if not isinstance(client, BaseException):
+                await client.close_connection()
+        await finish_metrics(endpoint)
+        for slot in slots:
+            if slot.journal is not None:
+                slot.journal.close()
 
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser()
     parser.add_argument('--symbol', help='Manual symbol to trade (e.g., BTCUSDT or BTC)')
     parser.add_argument('--at-utc', help='UTC datetime to execute, e.g., "2025-10-11 08:00" or ISO 8601')
+    parser.add_argument('--armed', action='store_true', help='Pre-build and validate the entry during the countdown; T-0 sends only the order')
+    parser.add_argument('--ref-price', type=float, help='Reference price for sizing an armed entry (implies --armed)')
+    parser.add_argument('--jobs', help='Job file (JSON array or JSON lines) with several symbol/at_utc entries to run in one process')
+    parser.add_argument('--accounts', default=config.ACCOUNTS_FILE or None,
+                        help='Accounts file (JSON array or JSON lines): enter --symbol on every account at once')
     args = parser.parse_args()
     if args.symbol and not args.at_utc:
         parser.error('--at-utc is required when --symbol is provided')
+    # SIGTERM (e.g. a stopped container) exits via SystemExit so queued log lines are still written
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(143))
     logger.info(
         'Starting bot (live). poll_interval=%ss log_level=%s',
         config.POLL_INTERVAL,
         config.LOG_LEVEL,
     )
     try:
-        if args.symbol:
-            asyncio.run(manual_flow(args.symbol, args.at_utc))
+        if args.jobs:
+            asyncio.run(jobs_flow(args.jobs))
+        elif args.symbol and args.accounts:
+            asyncio.run(fanout_flow(args.symbol, args.at_utc, args.accounts, ref_price=args.ref_price))
+        elif args.symbol:
+            asyncio.run(manual_flow(args.symbol, args.at_utc, armed_mode=args.armed or args.ref_price is not None, ref_price=args.ref_price))
         else:
-            raise SystemExit('Manual-only mode: provide --symbol and --at-utc')
+            raise SystemExit('Manual-only mode: provide --symbol and --at-utc, or --jobs')
     except KeyboardInterrupt:
         logger.info('Stopped by user')
@@ -0,0 +1,176 @@
+import bisect
+import json
+import logging
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Awaitable, TypeVar
+from aiohttp import web
+
+logger = logging.getLogger('metrics')
+
+T = TypeVar('T')
+
+
+class Histogram:
+    """Fixed-bucket latency histogram in milliseconds (Prometheus-style upper bounds)."""
+
+    BOUNDS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS_MS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = float('inf')
+        self.max = float('-inf')
+
+    def observe(self, ms: float):
+        self.counts[bisect.bisect_left(self.BOUNDS_MS, ms)] += 1
+        self.count += 1
+        self.sum += ms
+        self.min = min(self.min, ms)
+        self.max = max(self.max, ms)
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th observation, clamped to the observed range."""
+        if not self.count:
+            return 0.0
+        rank = max(1, int(-(-self.count * q // 1)))
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                bound = self.BOUNDS_MS[i] if i < len(self.BOUNDS_MS) else self.max
+                return min(max(bound, self.min), self.max)
+        return self.max
+
+    def to_dict(self) -> dict:
+        return {
+            'count': self.count,
+            'sum_ms': round(self.sum, 4),
+            'min_ms': round(self.min, 4) if self.count else None,
+            'max_ms': round(self.max, 4) if self.count else None,
+            'p50_ms': round(self.quantile(0.5), 4),
+            'p99_ms': round(self.quantile(0.99), 4),
+            'buckets': dict(zip([str(b) for b in self.BOUNDS_MS] + ['+Inf'], self.counts)),
+        }
+
+
+@dataclass
+class SpanEvent:
+    name: str
+    labels: dict
+    start_ms: float  # since the registry was created, monotonic
+    duration_ms: float
+    error: str | None = None
+
+
+def _key(name: str, labels: dict) -> str:
+    if not labels:
+        return name
+    return name + '{' + ','.join(f'{k}={labels[k]}' for k in sorted(labels)) + '}'
+
+
+class Metrics:
+    """Timing spans for the order path, aggregated into per-stage histograms.
+
+    Spans use perf_counter, so they are immune to wall-clock adjustments.
+    Every span is kept as an event until `write_jsonl` flushes the run to disk;
+    histograms accumulate for the life of the process and back the optional
+    local endpoint started by `serve`.
+    """
+
+    def __init__(self, max_events: int = 100_000):
+        self.max_events = max_events
+        self.run_id = uuid.uuid4().hex[:12]
+        self.events: list[SpanEvent] = []
+        self.histograms: dict[str, Histogram] = {}
+        self.started_wall = time.time()
+        self._started = time.perf_counter()
+
+    def observe(self, name: str, ms: float, start: float | None = None, error: str | None = None, **labels):
+        """Record one duration (or lag) in ms; `start` is its perf_counter start, if it has one."""
+        key = _key(name, labels)
+        hist = self.histograms.get(key)
+        if hist is None:
+            hist = self.histograms[key] = Histogram()
+        hist.observe(ms)
+        if len(self.events) < self.max_events:
+            start_ms = ((start if start is not None else time.perf_counter()) - self._started) * 1000.0
+            self.events.append(SpanEvent(name, labels, round(start_ms, 4), round(ms, 4), error))
+
+    @contextmanager
+    def span(self, name: str, **labels):
+        start = time.perf_counter()
+        error = None
+        try:
+            yield
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            self.observe(name, (time.perf_counter() - start) * 1000.0, start=start, error=error, **labels)
+
+    async def timed(self, name: str, aw: Awaitable[T], **labels) -> T:
+        """Await `aw` inside a span; handy for coroutines passed to asyncio.gather."""
+        with self.span(name, **labels):
+            return await aw
+
+    def exchange_lag(self, name: str, event_time_ms, offset_ms: float = 0.0, **labels):
+        """Record how long ago (on server time) the exchange stamped an event, e.g. an order's updateTime."""
+        try:
+            lag = time.time() * 1000.0 + offset_ms - float(event_time_ms)
+        except (TypeError, ValueError):
+            return
+        self.observe(name, lag, **labels)
+
+    def summary(self) -> dict[str, dict]:
+        return {key: hist.to_dict() for key, hist in sorted(self.histograms.items())}
+
+    def write_jsonl(self, path: str):
+        """Append this run's spans and current histograms to `path`, one JSON object per line."""
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'type': 'run', 'run_id': self.run_id, 'started': self.started_wall}) + '\n')
+            for ev in self.events:
+                f.write(json.dumps({'type': 'span', 'run_id': self.run_id, **asdict(ev)}) + '\n')
+            for key, hist in sorted(self.histograms.items()):
+                f.write(json.dumps({'type': 'histogram', 'run_id': self.run_id, 'key': key, **hist.to_dict()}) + '\n')
+        logger.info('Wrote %d spans and %d histograms to %s', len(self.events), len(self.histograms), path)
+        self.events.clear()
+
+    def prometheus(self) -> str:
+        lines = []
+        for key, hist in sorted(self.histograms.items()):
+            name, _, labels = key.partition('{')
+            metric = 'bot_' + name.replace('.', '_').replace('-', '_') + '_ms'
+            label_pairs = [f'{k}="{v}"' for k, v in (p.split('=', 1) for p in labels.rstrip('}').split(',') if p)]
+            cumulative = 0
+            for bound, n in zip([str(b) for b in Histogram.BOUNDS_MS] + ['+Inf'], hist.counts):
+                cumulative += n
+                bucket_labels = ','.join(label_pairs + ['le="%s"' % bound])
+                lines.append(f'{metric}_bucket{{{bucket_labels}}} {cumulative}')
+            suffix = '{' + ','.join(label_pairs) + '}' if label_pairs else ''
+            lines.append(f'{metric}_sum{suffix} {hist.sum}')
+            lines.append(f'{metric}_count{suffix} {hist.count}')
+        return '\n'.join(lines) + '\n'
+
+    async def serve(self, port: int, host: str = '127.0.0.1') -> web.AppRunner:
+        """Expose /metrics (Prometheus text) and /metrics.json on a local port; returns the runner to clean up."""
+        async def prom(request):
+            return web.Response(text=self.prometheus(), content_type='text/plain')
+
+        async def as_json(request):
+            return web.json_response({'run_id': self.run_id, 'histograms': self.summary()})
+
+        app = web.Application()
+        app.router.add_get('/metrics', prom)
+        app.router.add_get('/metrics.json', as_json)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, host, port).start()
+        logger.info('Metrics endpoint on http://%s:%d/metrics', host, port)
+        return runner
+
+
+metrics = Metrics()
@@ -0,0 +1,187 @@
+import asyncio
+import logging
+from binance import AsyncClient
+from binance.exceptions import BinanceAPIException
+
+from src.account_state import AsyncAccountStateCache
+from src.log_pipeline import collapse
+from src.metrics import metrics
+from src.streams import ReconnectingStream
+
+logger = logging.getLogger('monitor')
+
+
+class PositionMonitor:
+    """Follows an open long until it is closed, driven by websocket events.
+
+    Position size comes from the user-data stream (ACCOUNT_UPDATE, with
+    ORDER_TRADE_UPDATE fills logged as they happen) and the mark price from
+    <symbol>@markPrice@1s. REST polling is used only while a stream is down or
+    the mark stream has gone quiet, plus one resync after every user-stream
+    connect (the first included: a fill between the last poll and the
+    subscription going live would otherwise never be seen). User
+    events are also forwarded to the shared account-state cache, if given.
+    """
+
+    LISTEN_KEY_KEEPALIVE = 30 * 60  # Binance expires listen keys after 60 minutes
+
+    def __init__(self, client: AsyncClient, symbol: str, entry: float, hedge: bool, ws_url: str,
+                 report_interval: float = 1.0, stale_after: float = 3.0, account: AsyncAccountStateCache | None = None):
+        self.client = client
+        self.account = account
+        self.symbol = symbol
+        self.entry = entry
+        self.hedge = hedge
+        self.ws_url = ws_url.rstrip('/')
+        self.report_interval = report_interval
+        self.stale_after = stale_after
+        self.remaining: float | None = None
+        self.mark: float | None = None
+        self.rest_polls = 0
+        self._listen_key: str | None = None
+        self._resync = False
+        self._connects = 0
+        self._closed = asyncio.Event()
+        self._wake = asyncio.Event()
+
+        self.user_stream = ReconnectingStream('user-data', self._user_url, self._on_user_event, on_connect=self._on_reconnect)
+        self.mark_stream = ReconnectingStream('markPrice', f'{self.ws_url}/ws/{symbol.lower()}@markPrice@1s', self._on_mark_event)
+
+    async def _user_url(self) -> str:
+        self._listen_key = await self.client.futures_stream_get_listen_key()
+        return f'{self.ws_url}/ws/{self._listen_key}'
+
+    def _on_reconnect(self, connects: int):
+        # Account events may have been missed before this connection was live
+        self._connects = connects
+        self._resync = True
+        self._wake.set()
+
+    def _position_side_matches(self, side: str | None) -> bool:
+        return side == 'LONG' if self.hedge else True
+
+    def _set_remaining(self, amount: float):
+        self.remaining = abs(amount)
+        if self.remaining <= 1e-10:
+            self._closed.set()
+            self._wake.set()
+
+    def _on_user_event(self, msg: dict):
+        if self.account is not None:
+            self.account.on_user_event(msg)
+        event = msg.get('e')
+        if event == 'ACCOUNT_UPDATE':
+            for p in msg.get('a', {}).get('P', []):
+                if p.get('s') == self.symbol and self._position_side_matches(p.get('ps')):
+                    self._set_remaining(float(p.get('pa') or 0.0))
+                    break
+        elif event == 'ORDER_TRADE_UPDATE':
+            o = msg.get('o', {})
+            if o.get('s') == self.symbol:
+                # Exchange event time vs local receipt, on server time
+                metrics.exchange_lag('exchange.user_event_lag', msg.get('E'), self.client.timestamp_offset)
+            if o.get('s') == self.symbol and o.get('X') in ('FILLED', 'PARTIALLY_FILLED'):
+                logger.info('Order update %s: %s %s %s qty=%s avg=%s', self.symbol, o.get('o'), o.get('S'), o.get('X'), o.get('l'), o.get('ap'))
+        elif event == 'listenKeyExpired':
+            logger.warning('Listen key expired; reconnecting user-data stream')
+            asyncio.get_running_loop().create_task(self.user_stream.reconnect())
+
+    def _on_mark_event(self, msg: dict):
+        if msg.get('e') == 'markPriceUpdate' and msg.get('s') == self.symbol:
+            self.mark = float(msg['p'])
+
+    def _gap(self) -> tuple[bool, bool]:
+        """(position may be stale, mark price is stale)."""
+        mark_stale = not self.mark_stream.connected or self.mark_stream.silent_for() > self.stale_after
+        return (not self.user_stream.connected or self._resync), mark_stale
+
+    async def _poll_rest(self, position: bool, mark: bool):
+        self.rest_polls += 1
+        # A connect while this poll is in flight needs a poll of its own
+        connects = self._connects
+        calls = []
+        if position:
+            calls.append(self.client.futures_position_information(symbol=self.symbol))
+        if mark:
+            calls.append(self.client.futures_mark_price(symbol=self.symbol))
+        results = await asyncio.gather(*calls)
+        if position:
+            pos_list = results.pop(0)
+            if self.account is not None:
+                self.account.update_positions(pos_list)
+            remaining = 0.0
+            for p in pos_list:
+                side = p.get('positionSide') or 'BOTH'
+                if self._position_side_matches(side):
+                    remaining = float(p.get('positionAmt') or 0.0)
+                    break
+            self._set_remaining(remaining)
+            if connects == self._connects:
+                self._resync = False
+        if mark:
+            self.mark = float(results.pop(0)['markPrice'])
+
+    async def _keepalive(self):
+        while True:
+            await asyncio.sleep(self.LISTEN_KEY_KEEPALIVE)
+            if not self._listen_key:
+                continue
+            try:
+                await self.client.futures_stream_keepalive(self._listen_key)
+            except BinanceAPIException as e:
+                logger.warning('Listen key keepalive failed (%s); reconnecting user-data stream', e)
+                await self.user_stream.reconnect()
+            except Exception as e:
+                logger.warning('Listen key keepalive error: %s', e)
+
+    def _report(self, final: bool = False):
+        mark = self.mark or 0.0
+        try:
+            change_pct = ((mark / self.entry) - 1.0) * 100.0 if self.entry else 0.0
+        except Exception:
+            change_pct = 0.0
+        logger.info('Position %s: remaining=%.8f mark=%.8f entry=%.8f (%.2f%%)', self.symbol, self.remaining or 0.0, mark, self.entry, change_pct,
+                    extra=None if final else collapse(f'position:{self.symbol}'))
+
+    async def run(self):
+        tasks = [
+            asyncio.create_task(self.user_stream.run()),
+            asyncio.create_task(self.mark_stream.run()),
+            asyncio.create_task(self._keepalive()),
+        ]
+        try:
+            # Seed state once over REST; streams take over from here
+            try:
+                await self._poll_rest(position=True, mark=True)
+            except Exception as e:
+                logger.warning('Initial REST poll failed (%s); waiting for streams', e)
+                self._resync = True
+            while True:
+                self._wake.clear()
+                position_gap, mark_gap = self._gap()
+                if position_gap or mark_gap:
+                    try:
+                        await self._poll_rest(position=position_gap, mark=mark_gap)
+                    except Exception as e:
+                        logger.warning('REST fallback poll failed: %s', e, extra=collapse(f'rest_fallback:{self.symbol}'))
+                if self._closed.is_set():
+                    break
+                self._report()
+                try:
+                    # Woken early by a close or a (re)connect that needs a resync
+                    await asyncio.wait_for(self._wake.wait(), timeout=self.report_interval)
+                except asyncio.TimeoutError:
+                    pass
+            self._report(final=True)
+            logger.info('Position closed for %s. Exiting monitor. (REST polls: %d)', self.symbol, self.rest_polls)
+        finally:
+            await self.user_stream.stop()
+            await self.mark_stream.stop()
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if self._listen_key:
+                try:
+                    await self.client.futures_stream_close(self._listen_key)
+                except Exception:
+                    pass
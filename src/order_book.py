@@ -0,0 +1,174 @@
+import asyncio
+import logging
+from collections import deque
+
+import numpy as np
+from binance import AsyncClient
+
+from src.streams import ReconnectingStream
+
+logger = logging.getLogger('order_book')
+
+
+class OrderBook:
+    """Local copy of one symbol's futures order book, kept from diff-depth events.
+
+    Follows the exchange's procedure: events are buffered until a REST snapshot
+    is applied, events older than the snapshot are dropped, and every later
+    event must continue the previous one (`pu` == last `u`); a break marks the
+    book unsynced until the next snapshot. The ask side is also kept as sorted
+    NumPy arrays of price and cumulative quantity/cost, rebuilt only after a
+    change and only when asked for, so `fillable` is a binary search.
+    """
+
+    def __init__(self, symbol: str, buffer: int = 1000):
+        self.symbol = symbol
+        self.bids: dict[float, float] = {}
+        self.asks: dict[float, float] = {}
+        self.last_update_id: int | None = None
+        self.resyncs = 0
+        self._pending: deque[dict] = deque(maxlen=buffer)
+        self._ladder: tuple[np.ndarray, np.ndarray, np.ndarray] | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self.last_update_id is not None
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def best_ask(self) -> float | None:
+        prices = self._ask_ladder()[0]
+        return float(prices[0]) if len(prices) else None
+
+    def best_bid(self) -> float | None:
+        return max(self.bids) if self.bids else None
+
+    def _apply(self, msg: dict):
+        for side, levels in ((self.bids, msg.get('b', ())), (self.asks, msg.get('a', ()))):
+            for p, q in levels:
+                price, qty = float(p), float(q)
+                if qty == 0.0:
+                    side.pop(price, None)
+                else:
+                    side[price] = qty
+        if msg.get('a'):
+            self._ladder = None
+        self.last_update_id = int(msg['u'])
+
+    def on_event(self, msg: dict) -> bool:
+        """Apply one depthUpdate; False if the book is (now) waiting for a snapshot."""
+        if not self.ready:
+            self._pending.append(msg)
+            return False
+        if int(msg.get('pu', -1)) != self.last_update_id:
+            logger.warning('Depth gap on %s (pu=%s, last u=%s); resyncing', self.symbol, msg.get('pu'), self.last_update_id)
+            self.last_update_id = None
+            self.resyncs += 1
+            self._pending.clear()
+            self._pending.append(msg)
+            return False
+        self._apply(msg)
+        return True
+
+    def apply_snapshot(self, snapshot: dict) -> bool:
+        """Load a REST depth snapshot and replay buffered events on top; False if the events do not connect yet."""
+        last_id = int(snapshot['lastUpdateId'])
+        events = [e for e in self._pending if int(e['u']) >= last_id]
+        if events and int(events[0]['U']) > last_id:
+            # Snapshot is older than the first buffered event: fetch again
+            return False
+        self.bids = {float(p): float(q) for p, q in snapshot.get('bids', ())}
+        self.asks = {float(p): float(q) for p, q in snapshot.get('asks', ())}
+        self._ladder = None
+        self.last_update_id = last_id
+        for i, e in enumerate(events):
+            if i and int(e.get('pu', -1)) != self.last_update_id:
+                self.last_update_id = None
+                return False
+            self._apply(e)
+        self._pending.clear()
+        return True
+
+    def _ask_ladder(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        if self._ladder is None:
+            prices = np.fromiter(self.asks.keys(), dtype=np.float64, count=len(self.asks))
+            qtys = np.fromiter(self.asks.values(), dtype=np.float64, count=len(self.asks))
+            order = np.argsort(prices)
+            prices, qtys = prices[order], qtys[order]
+            self._ladder = (prices, np.cumsum(qtys), np.cumsum(prices * qtys))
+        return self._ladder
+
+    def fillable(self, max_price: float) -> tuple[float, float | None]:
+        """Quantity a buy can take from the asks at or below `max_price`, and its average price."""
+        prices, cum_qty, cum_cost = self._ask_ladder()
+        n = int(np.searchsorted(prices, max_price, side='right'))
+        if n == 0:
+            return 0.0, None
+        return float(cum_qty[n - 1]), float(cum_cost[n - 1] / cum_qty[n - 1])
+
+
+class DepthFeed:
+    """Keeps an OrderBook in sync: diff-depth stream plus a REST snapshot once events flow.
+
+    For a new listing the stream is silent until the symbol opens; the first
+    events trigger the snapshot, so the book is usable a round trip after
+    activation. Runs on the caller's event loop (updates are small dict writes).
+    """
+
+    def __init__(self, client: AsyncClient, symbol: str, ws_url: str, speed: str = '100ms', snapshot_limit: int = 100,
+                 snapshot_retries: int = 5):
+        self.client = client
+        self.symbol = symbol
+        self.snapshot_limit = snapshot_limit
+        self.snapshot_retries = snapshot_retries
+        self.book = OrderBook(symbol)
+        self.stream = ReconnectingStream('depth', f'{ws_url.rstrip("/")}/ws/{symbol.lower()}@depth@{speed}', self._on_event,
+                                         on_connect=self._on_connect)
+        self._task: asyncio.Task | None = None
+        self._snapshot: asyncio.Task | None = None
+        self.synced = asyncio.Event()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.stream.run(), name=f'depth-{self.symbol}')
+
+    async def stop(self):
+        await self.stream.stop()
+        for task in (self._task, self._snapshot):
+            if task is not None:
+                task.cancel()
+        await asyncio.gather(*(t for t in (self._task, self._snapshot) if t is not None), return_exceptions=True)
+        self._task = self._snapshot = None
+
+    def _on_connect(self, connects: int):
+        if connects > 1:
+            # Events may have been missed while disconnected
+            self.book.last_update_id = None
+            self.synced.clear()
+
+    def _on_event(self, msg: dict):
+        if msg.get('e', 'depthUpdate') != 'depthUpdate':
+            return
+        if self.book.on_event(msg):
+            return
+        self.synced.clear()
+        if self._snapshot is None or self._snapshot.done():
+            self._snapshot = asyncio.create_task(self._load_snapshot())
+
+    async def _load_snapshot(self):
+        for attempt in range(self.snapshot_retries):
+            try:
+                snapshot = await self.client.futures_order_book(symbol=self.symbol, limit=self.snapshot_limit)
+            except Exception as e:
+                logger.warning('Depth snapshot for %s failed: %s', self.symbol, e)
+                await asyncio.sleep(0.05 * (attempt + 1))
+                continue
+            if self.book.apply_snapshot(snapshot):
+                self.synced.set()
+                logger.info('Order book for %s synced at update %s (%d asks, %d bids)', self.symbol,
+                            self.book.last_update_id, len(self.book.asks), len(self.book.bids))
+                return
+            await asyncio.sleep(0.05 * (attempt + 1))
+        logger.warning('Order book for %s not synced after %d snapshots', self.symbol, self.snapshot_retries)
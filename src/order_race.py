@@ -0,0 +1,110 @@
+import asyncio
+import hashlib
+import logging
+import time
+from dataclasses import dataclass, field
+from binance import AsyncClient
+from binance.exceptions import BinanceAPIException
+
+from src.metrics import metrics
+
+logger = logging.getLogger('order_race')
+
+# The exchange already has an order with this newClientOrderId
+DUPLICATE_ID_CODES = {
+    -4116,  # ClientOrderId is duplicated
+}
+
+
+def entry_client_order_id(symbol: str, launch_at: float, prefix: str = 'lb') -> str:
+    """Deterministic newClientOrderId for one launch: every copy and every retry of the entry shares it."""
+    digest = hashlib.sha256(f'{symbol}:{int(launch_at * 1000)}'.encode('utf-8')).hexdigest()
+    return f'{prefix}-{digest[:24]}'
+
+
+@dataclass
+class RaceLeg:
+    index: int
+    delay_ms: float
+    outcome: str = 'pending'  # accepted | duplicate | error
+    latency_ms: float | None = None
+    code: int | None = None
+    resp: dict | None = None
+
+
+@dataclass
+class RaceResult:
+    client_order_id: str
+    legs: list[RaceLeg]
+    winner: int | None = None
+    settled: asyncio.Future | None = field(default=None, repr=False)  # resolves once every leg has answered
+
+    @property
+    def accepted(self) -> int:
+        return sum(leg.outcome == 'accepted' for leg in self.legs)
+
+    def format(self) -> str:
+        parts = []
+        for leg in self.legs:
+            latency = f'{leg.latency_ms:.1f} ms' if leg.latency_ms is not None else '-'
+            code = f' {leg.code}' if leg.code is not None else ''
+            parts.append(f'#{leg.index} {leg.outcome}{code} {latency}{" (won)" if leg.index == self.winner else ""}')
+        return ', '.join(parts)
+
+
+async def race_order(client: AsyncClient, params: dict, copies: int = 1, stagger: float = 0.0,
+                     **labels) -> tuple[dict, RaceResult]:
+    """Send the same order `copies` times, `stagger` seconds apart, and return the first acceptance.
+
+    All copies carry the same newClientOrderId, but the exchange only rejects
+    a repeat while the first order is still open: an entry that filled at once
+    does not stop later copies, which fill as well (see
+    AsyncFuturesExecutor.confirm_race). A duplicate-id rejection means an
+    earlier copy (or an earlier attempt) is resting and counts as success.
+    Concurrent requests each take their own pooled connection. The
+    first accepted response is returned as soon as it arrives; if the only
+    successes are duplicates the response is `{}` and the caller looks the order
+    up by id. When every copy fails, the first exchange error is raised.
+    The remaining copies finish in the background; await `result.settled`.
+    """
+    client_id = params['newClientOrderId']
+    legs = [RaceLeg(i, i * stagger * 1000.0) for i in range(max(1, copies))]
+    result = RaceResult(client_id, legs)
+    won: asyncio.Future = asyncio.get_running_loop().create_future()
+    errors: list[BaseException] = []
+
+    async def send(leg: RaceLeg):
+        if leg.delay_ms:
+            await asyncio.sleep(leg.delay_ms / 1000.0)
+        start = time.perf_counter()
+        try:
+            leg.resp = await client.futures_create_order(**params)
+            leg.outcome = 'accepted'
+        except BinanceAPIException as e:
+            leg.code = getattr(e, 'code', None)
+            leg.outcome = 'duplicate' if leg.code in DUPLICATE_ID_CODES else 'error'
+            if leg.outcome == 'error':
+                errors.append(e)
+        except Exception as e:
+            leg.outcome = 'error'
+            errors.append(e)
+        leg.latency_ms = (time.perf_counter() - start) * 1000.0
+        metrics.observe('entry.race_leg', leg.latency_ms, start=start, leg=leg.index, outcome=leg.outcome, **labels)
+        if leg.outcome == 'accepted' and not won.done():
+            result.winner = leg.index
+            metrics.observe('entry.race_win', leg.latency_ms, leg=leg.index, **labels)
+            won.set_result(leg.resp)
+
+    async def settle():
+        await asyncio.gather(*(send(leg) for leg in legs))
+        if won.done():
+            return
+        if any(leg.outcome == 'duplicate' for leg in legs):
+            # Placed by an earlier copy or attempt whose response was lost
+            won.set_result({})
+        else:
+            won.set_exception(next((e for e in errors if isinstance(e, BinanceAPIException)), errors[0]))
+
+    result.settled = asyncio.ensure_future(settle())
+    resp = await won
+    return resp, result
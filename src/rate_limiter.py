@@ -0,0 +1,207 @@
+import asyncio
+import contextvars
+import logging
+import time
+from contextlib import contextmanager
+from enum import IntEnum
+from typing import Mapping
+
+from src.log_pipeline import collapse
+from src.metrics import metrics
+
+logger = logging.getLogger('rate_limiter')
+
+
+class Priority(IntEnum):
+    ORDER = 0  # placing/cancelling orders and anything on the entry path
+    ACCOUNT = 1  # order queries, listen keys
+    INFO = 2  # market data, exchange info, position polling
+
+
+class RateLimitExceeded(Exception):
+    """A low-priority request was dropped instead of waiting for budget."""
+
+
+class TokenBucket:
+    """Token bucket: `capacity` tokens, refilled continuously at `refill_per_sec`."""
+
+    def __init__(self, capacity: float, refill_per_sec: float):
+        self.capacity = capacity
+        self.refill_per_sec = refill_per_sec
+        self.tokens = capacity
+        self._stamp = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._stamp) * self.refill_per_sec)
+        self._stamp = now
+
+    def wait_time(self, cost: float = 1.0, keep: float = 0.0) -> float:
+        """Seconds until `cost` tokens can be taken while leaving `keep` in the bucket."""
+        self._refill()
+        missing = cost + keep - self.tokens
+        if missing <= 0:
+            return 0.0
+        return missing / self.refill_per_sec if self.refill_per_sec > 0 else float('inf')
+
+    def take(self, cost: float = 1.0):
+        self._refill()
+        self.tokens -= cost
+
+    def observe_used(self, used: float):
+        """Align with a server-reported usage; only ever lowers the local estimate."""
+        self._refill()
+        self.tokens = min(self.tokens, self.capacity - used)
+
+
+class WeightBudget(TokenBucket):
+    """Request-weight bucket for one IP, plus the IP-wide Retry-After pause.
+
+    The exchange counts REQUEST_WEIGHT per IP, not per key, so every client of
+    one process should share a single budget.
+    """
+
+    def __init__(self, weight_per_min: float):
+        super().__init__(weight_per_min, weight_per_min / 60.0)
+        self.blocked_until = 0.0
+        self.used: int | None = None
+
+
+# Request weight of futures endpoints the bot calls (default 1); see request_weight for parameter-dependent ones
+ENDPOINT_WEIGHTS = {
+    'exchangeInfo': 1,
+    'positionRisk': 5,
+    'dual': 30,
+    'batchOrders': 5,
+    'order': 1,
+    'openOrders': 1,
+    'allOpenOrders': 1,
+}
+
+# Order book weight by `limit` (the exchange default is 500)
+DEPTH_WEIGHTS = ((50, 2), (100, 5), (500, 10), (1000, 20))
+
+
+def request_weight(endpoint: str, params: Mapping | None = None) -> int:
+    params = params or {}
+    if endpoint == 'openOrders' and not params.get('symbol'):
+        return 40
+    if endpoint == 'depth':
+        limit = int(params.get('limit', 500))
+        return next((w for top, w in DEPTH_WEIGHTS if limit <= top), DEPTH_WEIGHTS[-1][1])
+    return ENDPOINT_WEIGHTS.get(endpoint, 1)
+
+
+ORDER_ENDPOINTS = {'order', 'batchOrders', 'allOpenOrders', 'leverage'}
+
+_priority: contextvars.ContextVar[Priority | None] = contextvars.ContextVar('request_priority', default=None)
+
+
+@contextmanager
+def request_priority(priority: Priority):
+    """Run every request made inside the block (including gathered tasks) at `priority`."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def classify(endpoint: str, method: str) -> Priority:
+    method = method.upper()
+    if endpoint in ORDER_ENDPOINTS and method in ('POST', 'DELETE'):
+        return Priority.ORDER
+    if endpoint in ('order', 'listenKey'):
+        return Priority.ACCOUNT
+    return Priority.INFO
+
+
+class RateLimiter:
+    """Client-side model of the futures request-weight and order-count limits.
+
+    Three token buckets (weight per minute, orders per 10 s and per minute)
+    are debited before each request and re-aligned from the X-MBX-USED-WEIGHT-1M
+    and X-MBX-ORDER-COUNT-* response headers. Lower priorities must leave a
+    share of the weight budget untouched, so informational calls back off
+    first; an INFO call that would wait longer than `max_info_delay` is dropped
+    with RateLimitExceeded. After a 429/418 every request waits out Retry-After.
+    Pass one `weight` budget to the limiters of every client on the same IP;
+    the order-count buckets stay per limiter, as they are counted per account.
+    """
+
+    # Fraction of the weight budget each priority must leave for higher ones
+    RESERVE = {Priority.ORDER: 0.0, Priority.ACCOUNT: 0.1, Priority.INFO: 0.3}
+
+    def __init__(self, weight_per_min: int = 2400, orders_per_10s: int = 300, orders_per_min: int = 1200,
+                 info_reserve: float | None = None, max_info_delay: float = 2.0, weight: WeightBudget | None = None):
+        self.weight = weight or WeightBudget(weight_per_min)
+        self.orders_10s = TokenBucket(orders_per_10s, orders_per_10s / 10.0)
+        self.orders_1m = TokenBucket(orders_per_min, orders_per_min / 60.0)
+        self.reserve = dict(self.RESERVE)
+        if info_reserve is not None:
+            self.reserve[Priority.INFO] = info_reserve
+        self.max_info_delay = max_info_delay
+        self.dropped = 0
+
+    @property
+    def blocked_until(self) -> float:
+        return self.weight.blocked_until
+
+    @property
+    def used_weight(self) -> int | None:
+        return self.weight.used
+
+    def _wait_time(self, weight: float, orders: int, priority: Priority) -> float:
+        wait = max(0.0, self.blocked_until - time.monotonic())
+        keep = self.weight.capacity * self.reserve[priority]
+        wait = max(wait, self.weight.wait_time(weight, keep))
+        if orders:
+            wait = max(wait, self.orders_10s.wait_time(orders), self.orders_1m.wait_time(orders))
+        return wait
+
+    async def acquire(self, endpoint: str, method: str, orders: int | None = None, priority: Priority | None = None,
+                      params: Mapping | None = None):
+        if priority is None:
+            # A request_priority block can raise a call's priority, never lower it
+            priority = classify(endpoint, method)
+            scoped = _priority.get()
+            if scoped is not None:
+                priority = min(priority, scoped)
+        weight = request_weight(endpoint, params)
+        if orders is None:
+            orders = 1 if endpoint == 'order' and method.upper() == 'POST' else 0
+        wait = self._wait_time(weight, orders, priority)
+        if wait > 0:
+            if priority == Priority.INFO and wait > self.max_info_delay:
+                self.dropped += 1
+                raise RateLimitExceeded(f'{endpoint} dropped: rate budget exhausted for {wait:.1f}s')
+            logger.warning('Throttling %s %s (%s) for %.0f ms', method.upper(), endpoint, priority.name, wait * 1000.0,
+                           extra=collapse(f'throttle:{endpoint}'))
+            with metrics.span('ratelimit.wait', priority=priority.name):
+                while wait > 0:
+                    await asyncio.sleep(wait)
+                    wait = self._wait_time(weight, orders, priority)
+        self.weight.take(weight)
+        if orders:
+            self.orders_10s.take(orders)
+            self.orders_1m.take(orders)
+
+    def update(self, status: int, headers: Mapping[str, str]):
+        """Re-align the model from one response's status and rate-limit headers."""
+        used = headers.get('X-MBX-USED-WEIGHT-1M')
+        if used is not None:
+            self.weight.used = int(used)
+            self.weight.observe_used(self.weight.used)
+        count_10s = headers.get('X-MBX-ORDER-COUNT-10S')
+        if count_10s is not None:
+            self.orders_10s.observe_used(int(count_10s))
+        count_1m = headers.get('X-MBX-ORDER-COUNT-1M')
+        if count_1m is not None:
+            self.orders_1m.observe_used(int(count_1m))
+        if status in (418, 429):
+            try:
+                retry_after = float(headers.get('Retry-After', ''))
+            except ValueError:
+                retry_after = 60.0 if status == 418 else 1.0
+            self.weight.blocked_until = max(self.weight.blocked_until, time.monotonic() + retry_after)
+            logger.error('Rate limit hit (HTTP %d); pausing all requests for %.0fs', status, retry_after)
@@ -0,0 +1,219 @@
+"""Record the launch window's market data into fixed-width binary files.
+
+Every stream kind goes to its own append-only file of packed records
+(`aggTrade.bin`, `markPrice.bin`, `depth.bin`) next to a `meta.json` holding
+the NumPy dtype of each, so a recording opens as memory-mapped structured
+arrays without parsing:
+
+    data = load_recording('recordings/XUSDT-20251011T075950')
+    data['aggTrade']['price'], data['depth'][data['depth']['side'] == 1]
+
+The recorder runs its websockets and file writes on its own thread and event
+loop, so it never competes with the order path's coroutines; a slow disk or a
+burst of messages only delays the recorder's own sockets. Rows are buffered
+per kind and written every `batch_rows` rows or `flush_interval` seconds,
+which bounds memory.
+
+    python -m src.recorder recordings/XUSDT-20251011T075950
+"""
+import asyncio
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from src.streams import ReconnectingStream
+
+logger = logging.getLogger('recorder')
+
+DTYPES = {
+    'aggTrade': np.dtype([
+        ('recv_ns', '<i8'),  # local wall clock at receipt
+        ('event_ms', '<i8'),
+        ('trade_ms', '<i8'),
+        ('agg_id', '<i8'),
+        ('price', '<f8'),
+        ('qty', '<f8'),
+        ('buyer_maker', 'u1'),
+    ]),
+    'markPrice': np.dtype([
+        ('recv_ns', '<i8'),
+        ('event_ms', '<i8'),
+        ('mark', '<f8'),
+        ('index', '<f8'),
+        ('funding_rate', '<f8'),
+    ]),
+    # One row per changed price level of a diff-depth event
+    'depth': np.dtype([
+        ('recv_ns', '<i8'),
+        ('event_ms', '<i8'),
+        ('first_id', '<i8'),
+        ('final_id', '<i8'),
+        ('side', 'u1'),  # 0 bid, 1 ask
+        ('price', '<f8'),
+        ('qty', '<f8'),  # 0 removes the level
+    ]),
+}
+
+
+def _agg_trade_rows(msg: dict, recv_ns: int) -> list[tuple]:
+    return [(recv_ns, int(msg.get('E', 0)), int(msg.get('T', 0)), int(msg.get('a', 0)),
+             float(msg['p']), float(msg['q']), 1 if msg.get('m') else 0)]
+
+
+def _mark_price_rows(msg: dict, recv_ns: int) -> list[tuple]:
+    return [(recv_ns, int(msg.get('E', 0)), float(msg['p']), float(msg.get('i') or 0.0), float(msg.get('r') or 0.0))]
+
+
+def _depth_rows(msg: dict, recv_ns: int) -> list[tuple]:
+    head = (recv_ns, int(msg.get('E', 0)), int(msg.get('U', 0)), int(msg.get('u', 0)))
+    rows = [head + (0, float(p), float(q)) for p, q in msg.get('b', ())]
+    rows += [head + (1, float(p), float(q)) for p, q in msg.get('a', ())]
+    return rows
+
+
+PARSERS = {'aggTrade': _agg_trade_rows, 'markPrice': _mark_price_rows, 'depth': _depth_rows}
+
+
+def recording_dir(directory: str, symbol: str, started: float) -> str:
+    stamp = datetime.fromtimestamp(started, timezone.utc).strftime('%Y%m%dT%H%M%S')
+    return os.path.join(directory, f'{symbol}-{stamp}')
+
+
+def load_recording(path: str) -> dict[str, np.ndarray]:
+    """Memory-map every stream of a recording; a partly written last record is left out."""
+    with open(os.path.join(path, 'meta.json'), 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+    out = {}
+    for kind, descr in meta['dtypes'].items():
+        dtype = np.dtype([tuple(field) for field in descr])
+        file = os.path.join(path, f'{kind}.bin')
+        rows = os.path.getsize(file) // dtype.itemsize if os.path.exists(file) else 0
+        out[kind] = np.memmap(file, dtype=dtype, mode='r', shape=(rows,)) if rows else np.empty(0, dtype=dtype)
+    return out
+
+
+class Recorder:
+    """Records one symbol's aggTrade, markPrice and diff-depth streams to disk.
+
+    `start` returns at once; recording stops on `stop` or after
+    `max_duration` seconds, whichever comes first.
+    """
+
+    def __init__(self, symbol: str, directory: str, ws_url: str, depth_speed: str = '100ms', batch_rows: int = 4096,
+                 flush_interval: float = 1.0, max_duration: float | None = None):
+        self.symbol = symbol
+        self.directory = directory
+        self.ws_url = ws_url.rstrip('/')
+        self.depth_speed = depth_speed
+        self.batch_rows = batch_rows
+        self.flush_interval = flush_interval
+        self.max_duration = max_duration
+        self.path: str | None = None
+        self.rows = {kind: 0 for kind in DTYPES}
+        self._buffers: dict[str, list[tuple]] = {kind: [] for kind in DTYPES}
+        self._files = {}
+        self._started = 0.0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _stream_urls(self) -> dict[str, str]:
+        base = f'{self.ws_url}/ws/{self.symbol.lower()}'
+        return {
+            'aggTrade': f'{base}@aggTrade',
+            'markPrice': f'{base}@markPrice@1s',
+            'depth': f'{base}@depth@{self.depth_speed}',
+        }
+
+    def start(self):
+        """Begin recording on the recorder thread; cheap enough to call on the order path."""
+        if self._thread is not None:
+            return
+        self._started = time.time()
+        self.path = recording_dir(self.directory, self.symbol, self._started)
+        self._thread = threading.Thread(target=asyncio.run, args=(self._main(),), name=f'recorder-{self.symbol}', daemon=True)
+        self._thread.start()
+
+    def _open(self):
+        os.makedirs(self.path, exist_ok=True)
+        with open(os.path.join(self.path, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump({'symbol': self.symbol, 'started': self._started, 'streams': self._stream_urls(),
+                       'dtypes': {kind: dtype.descr for kind, dtype in DTYPES.items()}}, f)
+        self._files = {kind: open(os.path.join(self.path, f'{kind}.bin'), 'ab') for kind in DTYPES}
+        logger.info('Recording %s market data to %s', self.symbol, self.path)
+
+    def stop(self, timeout: float = 5.0):
+        """Stop recording and write out what is buffered (blocks up to `timeout`)."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.warning('Recorder for %s did not stop within %.1fs', self.symbol, timeout)
+            return
+        self._thread = None
+        logger.info('Recorded %s: %s', self.symbol, ', '.join(f'{kind} {n} rows' for kind, n in self.rows.items()))
+
+    def _handler(self, kind: str):
+        parse = PARSERS[kind]
+
+        def on_message(msg: dict):
+            # Combined-stream payloads wrap the event in 'data'
+            rows = parse(msg.get('data', msg), time.time_ns())
+            buf = self._buffers[kind]
+            buf.extend(rows)
+            if len(buf) >= self.batch_rows:
+                self._flush(kind)
+        return on_message
+
+    def _flush(self, kind: str):
+        buf = self._buffers[kind]
+        if not buf:
+            return
+        self._buffers[kind] = []
+        try:
+            self._files[kind].write(np.array(buf, dtype=DTYPES[kind]).tobytes())
+            self._files[kind].flush()
+            self.rows[kind] += len(buf)
+        except (OSError, ValueError) as e:
+            logger.error('Recorder write failed for %s %s (%d rows dropped): %s', self.symbol, kind, len(buf), e)
+
+    async def _main(self):
+        try:
+            self._open()
+        except OSError as e:
+            logger.error('Cannot record %s to %s: %s', self.symbol, self.path, e)
+            return
+        streams = [ReconnectingStream(f'record-{kind}', url, self._handler(kind)) for kind, url in self._stream_urls().items()]
+        tasks = [asyncio.create_task(s.run()) for s in streams]
+        deadline = time.monotonic() + self.max_duration if self.max_duration else None
+        flushed = time.monotonic()
+        try:
+            while not self._stop.is_set() and (deadline is None or time.monotonic() < deadline):
+                await asyncio.sleep(0.05)
+                if time.monotonic() - flushed >= self.flush_interval:
+                    for kind in DTYPES:
+                        self._flush(kind)
+                    flushed = time.monotonic()
+        finally:
+            for s in streams:
+                await s.stop()
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for kind, f in self._files.items():
+                self._flush(kind)
+                f.close()
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 2:
+        raise SystemExit('usage: python -m src.recorder RECORDING_DIR')
+    for kind, arr in load_recording(sys.argv[1]).items():
+        span = f', {(arr["recv_ns"][-1] - arr["recv_ns"][0]) / 1e9:.1f}s' if len(arr) else ''
+        print(f'{kind:<10} {len(arr):>9} rows{span}')
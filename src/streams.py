@@ -0,0 +1,95 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Awaitable, Callable
+import websockets
+
+from src.log_pipeline import collapse
+
+logger = logging.getLogger('streams')
+
+
+class ReconnectingStream:
+    """A websocket reader that reconnects with backoff until stopped.
+
+    `url` is either a fixed URL or a coroutine function returning one (user-data
+    streams need a fresh listen key per connect). Every decoded JSON message is
+    handed to `on_message`; `connected`, `last_message` and `gaps` let callers
+    detect periods where messages may have been missed.
+    """
+
+    def __init__(self, name: str, url: str | Callable[[], Awaitable[str]], on_message: Callable[[dict], None],
+                 on_connect: Callable[[int], None] | None = None, ping_interval: float = 20.0,
+                 min_backoff: float = 0.1, max_backoff: float = 5.0):
+        self.name = name
+        self._url = url
+        self.on_message = on_message
+        self.on_connect = on_connect
+        self.ping_interval = ping_interval
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.connected = False
+        self.connects = 0
+        self.gaps = 0
+        self.last_message: float | None = None
+        self._ws = None
+        self._stopped = False
+
+    async def _resolve_url(self) -> str:
+        if isinstance(self._url, str):
+            return self._url
+        return await self._url()
+
+    async def run(self):
+        backoff = self.min_backoff
+        while not self._stopped:
+            try:
+                url = await self._resolve_url()
+                async with websockets.connect(url, ping_interval=self.ping_interval, close_timeout=1) as ws:
+                    self._ws = ws
+                    self.connected = True
+                    self.connects += 1
+                    backoff = self.min_backoff
+                    logger.debug('%s stream connected (#%d)', self.name, self.connects)
+                    if self.on_connect:
+                        self.on_connect(self.connects)
+                    async for raw in ws:
+                        self.last_message = time.monotonic()
+                        try:
+                            msg = json.loads(raw)
+                        except ValueError:
+                            continue
+                        try:
+                            self.on_message(msg)
+                        except Exception as e:
+                            logger.exception('%s stream handler error: %s', self.name, e)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if not self._stopped:
+                    logger.warning('%s stream error: %s', self.name, e)
+            finally:
+                self.connected = False
+                self._ws = None
+            if self._stopped:
+                break
+            self.gaps += 1
+            logger.info('%s stream disconnected; reconnecting in %.1fs', self.name, backoff, extra=collapse(f'reconnect:{self.name}'))
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2.0, self.max_backoff)
+
+    async def reconnect(self):
+        """Drop the current connection; run() reconnects (re-resolving the URL)."""
+        if self._ws is not None:
+            await self._ws.close()
+
+    async def stop(self):
+        self._stopped = True
+        if self._ws is not None:
+            await self._ws.close()
+
+    def silent_for(self) -> float:
+        if self.last_message is None:
+            return float('inf')
+        return time.monotonic() - self.last_message
@@ -0,0 +1,140 @@
+import logging
+import time
+from dataclasses import dataclass, field
+from binance import AsyncClient
+
+from src.fixed_point import Scale, plain
+
+logger = logging.getLogger('symbol_rules')
+
+
+@dataclass(frozen=True)
+class SymbolRules:
+    """Trading filters for one futures symbol, parsed once from exchange info.
+
+    The step and tick sizes are also precomputed as fixed-point scales
+    (`qty_scale`, `price_scale`) so the order path rounds and formats with
+    integer arithmetic only.
+    """
+    symbol: str
+    status: str
+    step_size: str
+    min_qty: str
+    tick_size: str | None
+    min_notional: float | None
+    qty_scale: Scale = field(init=False, repr=False, compare=False)
+    price_scale: Scale | None = field(init=False, repr=False, compare=False)
+    min_qty_steps: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        qty_scale = Scale(self.step_size)
+        object.__setattr__(self, 'qty_scale', qty_scale)
+        object.__setattr__(self, 'price_scale', Scale(self.tick_size) if self.tick_size else None)
+        object.__setattr__(self, 'min_qty_steps', qty_scale.ceil_text(self.min_qty))
+
+    def format_price(self, price: float) -> str:
+        """Floor `price` to the tick size and render it exchange-ready."""
+        return self.price_scale.floor_text(price) if self.price_scale else plain(price)
+
+    @classmethod
+    def from_exchange_symbol(cls, sym_info: dict) -> 'SymbolRules':
+        filters = {f.get('filterType'): f for f in sym_info.get('filters', [])}
+
+        # Prefer MARKET_LOT_SIZE; fallback to LOT_SIZE
+        qty_filter = filters.get('MARKET_LOT_SIZE') or filters.get('LOT_SIZE') or {}
+        step_size = qty_filter.get('stepSize') or '0.001'
+        min_qty = qty_filter.get('minQty') or '0.0'
+
+        pf = filters.get('PRICE_FILTER') or {}
+        tick_size = pf.get('tickSize') or None
+
+        # Some futures symbols also enforce notional minimum
+        min_notional = None
+        notional_filter = filters.get('MIN_NOTIONAL') or filters.get('NOTIONAL')
+        if notional_filter:
+            min_notional = float(notional_filter.get('minNotional') or notional_filter.get('notional', 0.0))
+
+        return cls(
+            symbol=sym_info.get('symbol', ''),
+            status=sym_info.get('status', ''),
+            step_size=step_size,
+            min_qty=min_qty,
+            tick_size=tick_size,
+            min_notional=min_notional,
+        )
+
+
+class AsyncSymbolRulesCache:
+    """Symbol -> SymbolRules map with a TTL, refreshed from futures_exchange_info.
+
+    Warm it before T-0 so the order path only does dictionary lookups. A miss on
+    an unknown symbol triggers at most one download per `miss_interval` seconds.
+    """
+
+    def __init__(self, client: AsyncClient, ttl: float = 300.0, miss_interval: float = 1.0):
+        self.client = client
+        self.ttl = ttl
+        self.miss_interval = miss_interval
+        self._rules: dict[str, SymbolRules] = {}
+        self._loaded_at: dict[str, float] = {}
+        self._last_fetch = 0.0
+
+    def load(self, info: dict) -> int:
+        now = time.monotonic()
+        count = 0
+        for sym_info in info.get('symbols', []):
+            symbol = sym_info.get('symbol')
+            if not symbol:
+                continue
+            try:
+                self._rules[symbol] = SymbolRules.from_exchange_symbol(sym_info)
+            except Exception as e:
+                logger.warning('Skipping unparsable filters for %s: %s', symbol, e)
+                continue
+            self._loaded_at[symbol] = now
+            count += 1
+        return count
+
+    def _recently_fetched(self, max_age: float | None) -> bool:
+        return max_age is not None and (time.monotonic() - self._last_fetch) < max_age
+
+    async def warm(self, max_age: float | None = None) -> int:
+        """Download exchange info and (re)load rules for every symbol.
+
+        With `max_age`, skip the download if one finished less than that many seconds ago.
+        """
+        if self._recently_fetched(max_age):
+            return 0
+        t0 = time.monotonic()
+        info = await self.client.futures_exchange_info()
+        self._last_fetch = time.monotonic()
+        count = self.load(info)
+        logger.info('Symbol rules warmed: %d symbols in %.0f ms', count, (self._last_fetch - t0) * 1000.0)
+        return count
+
+    async def refresh(self, symbol: str) -> SymbolRules | None:
+        """Force a fresh download and return the rules for `symbol` (None if unlisted)."""
+        try:
+            await self.warm()
+        except Exception as e:
+            logger.warning('Symbol rules refresh failed for %s: %s', symbol, e)
+        return self._rules.get(symbol)
+
+    def is_fresh(self, symbol: str) -> bool:
+        loaded = self._loaded_at.get(symbol)
+        return loaded is not None and (time.monotonic() - loaded) < self.ttl
+
+    def peek(self, symbol: str) -> SymbolRules | None:
+        """Return cached rules without any network call, even if stale."""
+        return self._rules.get(symbol)
+
+    def _needs_fetch(self, symbol: str) -> bool:
+        if self.is_fresh(symbol):
+            return False
+        # Unknown symbol was just looked up; don't hammer exchangeInfo in retry loops
+        return symbol in self._rules or (time.monotonic() - self._last_fetch) >= self.miss_interval
+
+    async def get(self, symbol: str) -> SymbolRules | None:
+        if not self._needs_fetch(symbol):
+            return self._rules.get(symbol)
+        return await self.refresh(symbol)
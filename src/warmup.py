@@ -0,0 +1,147 @@
+import asyncio
+import logging
+import socket
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable
+from yarl import URL
+
+from src.account_state import AsyncAccountStateCache
+from src.launch_scheduler import ServerClock
+from src.metrics import metrics
+from src.session import PooledAsyncClient
+from src.symbol_rules import AsyncSymbolRulesCache
+
+logger = logging.getLogger('warmup')
+
+
+@dataclass
+class WarmupStep:
+    name: str
+    ok: bool
+    ms: float
+    detail: str = ''
+    optional: bool = False  # a failure is expected at times and retried later
+
+    @property
+    def status(self) -> str:
+        return 'ok' if self.ok else 'deferred' if self.optional else 'FAILED'
+
+
+@dataclass
+class WarmupReport:
+    symbol: str
+    steps: list[WarmupStep] = field(default_factory=list)
+    total_ms: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return all(s.ok or s.optional for s in self.steps)
+
+    def step(self, name: str) -> WarmupStep | None:
+        return next((s for s in self.steps if s.name == name), None)
+
+    def format(self) -> str:
+        parts = [f'{s.name} {s.status} ({s.ms:.1f} ms{", " + s.detail if s.detail else ""})' for s in self.steps]
+        return f'Warm-up for {self.symbol} took {self.total_ms:.1f} ms: ' + '; '.join(parts)
+
+
+class Warmup:
+    """Pre-launch stage that leaves nothing cold for the T-0 request.
+
+    `run` resolves the futures host, opens `connections` pooled TLS connections
+    (one concurrent ping each), primes the symbol-rules and account-state
+    caches, re-syncs the clock and applies leverage early. Each part is timed
+    and reported; a failed part is logged and the launch goes ahead. Leverage
+    is optional: listings often reject it until they open, and T-0 retries it.
+    Afterwards a background task pings over every pooled connection each
+    `ping_interval` seconds until `stop`, so neither side closes them as idle.
+    """
+
+    def __init__(self, client: PooledAsyncClient, rules: AsyncSymbolRulesCache, account: AsyncAccountStateCache,
+                 clock: ServerClock, connections: int = 4, ping_interval: float = 5.0):
+        self.client = client
+        self.rules = rules
+        self.account = account
+        self.clock = clock
+        self.connections = max(1, min(connections, client.pool_size))
+        self.ping_interval = ping_interval
+        self._pinger: asyncio.Task | None = None
+
+    async def _step(self, report: WarmupReport, name: str, aw: Awaitable, optional: bool = False) -> WarmupStep:
+        start = time.perf_counter()
+        try:
+            detail = await metrics.timed(f'warmup.{name}', aw, symbol=report.symbol)
+            step = WarmupStep(name, True, 0.0, detail or '', optional)
+        except Exception as e:
+            step = WarmupStep(name, False, 0.0, str(e), optional)
+        step.ms = (time.perf_counter() - start) * 1000.0
+        report.steps.append(step)
+        return step
+
+    async def _resolve(self) -> str:
+        url = URL(self.client.FUTURES_URL)
+        infos = await asyncio.get_running_loop().getaddrinfo(url.host, url.port, type=socket.SOCK_STREAM)
+        return f'{url.host} -> {len({info[4][0] for info in infos})} addresses'
+
+    async def _ping_all(self):
+        # Concurrent requests each take their own pooled connection
+        await asyncio.gather(*(self.client.futures_ping() for _ in range(self.connections)))
+
+    async def _open_connections(self) -> str:
+        await self._ping_all()
+        return f'{self.connections} connections'
+
+    async def _prime_rules(self, symbol: str) -> str:
+        await self.rules.warm()
+        if not self.rules.peek(symbol):
+            raise LookupError(f'{symbol} not yet in exchange info')
+        return ''
+
+    async def _prime_account(self) -> str:
+        await self.account.load()
+        return 'hedge' if self.account.hedge else 'one-way'
+
+    async def _sync_clock(self) -> str:
+        await self.clock.sync()
+        return f'offset {self.clock.offset * 1000.0:.2f} ms, rtt {self.clock.rtt * 1000.0:.2f} ms'
+
+    async def _set_leverage(self, symbol: str, leverage: int) -> str:
+        await self.account.set_leverage(symbol, leverage)
+        return f'{leverage}x'
+
+    async def run(self, symbol: str, leverage: int | None = None, public: bool = True) -> WarmupReport:
+        """Warm everything for `symbol`; `public=False` skips rules and clock when another Warmup shares them."""
+        report = WarmupReport(symbol)
+        start = time.perf_counter()
+        # DNS and connections first: every later step reuses the hot pool
+        await self._step(report, 'dns', self._resolve())
+        await self._step(report, 'connections', self._open_connections())
+        steps = [self._step(report, 'account', self._prime_account())]
+        if public:
+            steps += [self._step(report, 'rules', self._prime_rules(symbol)), self._step(report, 'clock', self._sync_clock())]
+        await asyncio.gather(*steps)
+        if leverage:
+            # Listings often reject leverage until they open; T-0 retries it then
+            await self._step(report, 'leverage', self._set_leverage(symbol, leverage), optional=True)
+        report.total_ms = (time.perf_counter() - start) * 1000.0
+        (logger.info if report.ok else logger.warning)('%s', report.format())
+        self.start_keepalive()
+        return report
+
+    def start_keepalive(self):
+        if self._pinger is None and self.ping_interval > 0:
+            self._pinger = asyncio.create_task(self._keepalive(), name='warmup-keepalive')
+
+    async def _keepalive(self):
+        while True:
+            await asyncio.sleep(self.ping_interval)
+            try:
+                await self._ping_all()
+            except Exception as e:
+                logger.debug('Keep-alive ping failed: %s', e)
+
+    def stop(self):
+        if self._pinger is not None:
+            self._pinger.cancel()
+            self._pinger = None
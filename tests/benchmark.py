@@ -0,0 +1,172 @@
+"""End-to-end T-0 latency benchmark against the local mock exchange.
+
+    python -m tests.benchmark --runs 50 --latency-ms 5 --jitter-ms 2 [--armed] [--race 3]
+
+Each run schedules a launch `lead` seconds ahead with the symbol opening at
+T-0 (plus --activation-delay-ms) and drives the real launch path from
+src.main.launch: countdown, activation probing, entry, protective batch and
+the position monitor (the mock closes the position once both stops are in).
+Both figures come from the mock's server-side timestamps:
+
+    scheduled -> entry ack        entry order acked_at - scheduled launch time
+    entry ack -> protected        last protective order acked_at - entry acked_at
+
+The mock shares the bot's event loop, so absolute numbers include its own
+overhead; compare runs made with the same settings. With --race N the entry
+is raced over N connections and the wins per copy are printed as well.
+"""
+import argparse
+import asyncio
+import logging
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from src.account_state import AsyncAccountStateCache
+from src.config import TradeParams, config
+from src.launch_scheduler import ServerClock
+from src.main import launch, prepare
+from src.metrics import metrics
+from src.session import PooledAsyncClient
+from src.symbol_rules import AsyncSymbolRulesCache
+from tests.mock_exchange import MockExchange, MockSymbol
+
+PROTECTIVE_TYPES = ('TRAILING_STOP_MARKET', 'STOP_MARKET')
+
+
+@dataclass
+class Sample:
+    scheduled: float
+    entry_ack: float
+    protected: float
+
+    @property
+    def to_entry_ms(self) -> float:
+        return (self.entry_ack - self.scheduled) * 1000.0
+
+    @property
+    def to_protected_ms(self) -> float:
+        return (self.protected - self.entry_ack) * 1000.0
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def summarize(samples: list[Sample]) -> dict[str, dict[str, float]]:
+    series = {
+        'scheduled -> entry ack': [s.to_entry_ms for s in samples],
+        'entry ack -> protected': [s.to_protected_ms for s in samples],
+    }
+    return {
+        name: {'n': len(v), 'p50': percentile(v, 50), 'p99': percentile(v, 99), 'max': max(v)}
+        for name, v in series.items()
+    }
+
+
+def format_summary(summary: dict[str, dict[str, float]]) -> str:
+    return '\n'.join(
+        f'{name:<24} n={s["n"]:<4} p50={s["p50"]:8.2f} ms  p99={s["p99"]:8.2f} ms  max={s["max"]:8.2f} ms'
+        for name, s in summary.items()
+    )
+
+
+def race_wins() -> dict[str, int]:
+    """Entry race wins per copy, from the process-wide metrics."""
+    return {key: hist.count for key, hist in sorted(metrics.histograms.items()) if key.startswith('entry.race_win')}
+
+
+@contextmanager
+def _config_overrides(**values):
+    saved = {k: getattr(config, k) for k in values}
+    for k, v in values.items():
+        setattr(config, k, v)
+    try:
+        yield
+    finally:
+        for k, v in saved.items():
+            setattr(config, k, v)
+
+
+async def _close_when_protected(exchange: MockExchange, symbol: str, since: int):
+    """Stop out the position once both protective orders rest and the monitor is listening."""
+    while True:
+        orders = exchange.accepted_orders(symbol, since)
+        if sum(o['type'] in PROTECTIVE_TYPES for o in orders) >= 2 and exchange.user_streams():
+            await exchange.close_position(symbol)
+            return
+        await asyncio.sleep(0.005)
+
+
+def _sample(exchange: MockExchange, symbol: str, since: int, scheduled: float) -> Sample:
+    orders = exchange.accepted_orders(symbol, since)
+    entries = [o for o in orders if o['type'] == 'MARKET' and o['side'] == 'BUY']
+    protective = [o for o in orders if o['type'] in PROTECTIVE_TYPES]
+    if not entries or len(protective) < 2:
+        raise RuntimeError(f'Run at {scheduled:.3f} placed {len(entries)} entries and {len(protective)} protective orders')
+    return Sample(
+        scheduled=scheduled,
+        entry_ack=entries[0]['request']['acked_at'],
+        protected=max(o['request']['acked_at'] for o in protective),
+    )
+
+
+async def run_benchmark(runs: int = 20, latency: float = 0.002, jitter: float = 0.0, armed: bool = False,
+                        activation_delay: float = 0.0, lead: float = 0.3, symbol: str = 'XUSDT') -> list[Sample]:
+    samples: list[Sample] = []
+    params = TradeParams(usdt=1.0, leverage=10)
+    async with MockExchange([MockSymbol(symbol, price=1.0)], latency=latency, jitter=jitter) as exchange:
+        client = await PooledAsyncClient.create('key', 'secret', futures_url=exchange.rest_url)
+        try:
+            with _config_overrides(FUTURES_WS_URL=exchange.ws_url):
+                rules = AsyncSymbolRulesCache(client, ttl=config.SYMBOL_RULES_TTL)
+                account = AsyncAccountStateCache(client)
+                clock = ServerClock(client, samples=config.CLOCK_SYNC_SAMPLES)
+                await prepare(client, rules, clock, [symbol], account)
+                for _ in range(runs):
+                    since = len(exchange.orders)
+                    scheduled = exchange.now() + lead
+                    exchange.symbols[symbol].activate_at = scheduled + activation_delay
+                    closer = asyncio.create_task(_close_when_protected(exchange, symbol, since))
+                    try:
+                        await asyncio.wait_for(
+                            launch(client, rules, clock, symbol, datetime.fromtimestamp(scheduled, timezone.utc), params,
+                                   armed_mode=armed, ref_price=1.0 if armed else None, account=account),
+                            timeout=lead + activation_delay + 10.0,
+                        )
+                    finally:
+                        closer.cancel()
+                    samples.append(_sample(exchange, symbol, since, scheduled))
+        finally:
+            await client.close_connection()
+    return samples
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='T-0 latency benchmark against the local mock exchange')
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--latency-ms', type=float, default=2.0, help='One-way network latency of the mock')
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help='Extra random one-way latency, 0..jitter')
+    parser.add_argument('--activation-delay-ms', type=float, default=0.0, help='Symbol opens this long after the scheduled time')
+    parser.add_argument('--lead', type=float, default=0.3, help='Seconds between scheduling and launch for each run')
+    parser.add_argument('--armed', action='store_true', help='Use the armed entry path')
+    parser.add_argument('--race', type=int, default=1, help='Race the entry over this many connections')
+    parser.add_argument('--stagger-ms', type=float, default=2.0, help='Delay between raced copies')
+    parser.add_argument('--log-level', default='WARNING')
+    args = parser.parse_args()
+    logging.getLogger().setLevel(args.log_level)
+    with _config_overrides(ENTRY_RACE_COPIES=args.race, ENTRY_RACE_STAGGER_MS=args.stagger_ms):
+        result = asyncio.run(run_benchmark(
+            runs=args.runs,
+            latency=args.latency_ms / 1000.0,
+            jitter=args.jitter_ms / 1000.0,
+            armed=args.armed,
+            activation_delay=args.activation_delay_ms / 1000.0,
+            lead=args.lead,
+        ))
+    print(format_summary(summarize(result)))
+    if args.race > 1:
+        print('race wins: ' + ', '.join(f'{key}={n}' for key, n in race_wins().items()))
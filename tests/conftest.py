@@ -0,0 +1,25 @@
+import pytest
+
+from src.session import PooledAsyncClient
+from src.symbol_rules import AsyncSymbolRulesCache
+from tests.mock_exchange import MockExchange, MockSymbol
+
+SYMBOL = 'XUSDT'
+
+
+@pytest.fixture
+async def exchange():
+    async with MockExchange([MockSymbol(SYMBOL, price=1.0)]) as ex:
+        yield ex
+
+
+@pytest.fixture
+async def client(exchange):
+    client = await PooledAsyncClient.create('key', 'secret', futures_url=exchange.rest_url)
+    yield client
+    await client.close_connection()
+
+
+@pytest.fixture
+def rules(client):
+    return AsyncSymbolRulesCache(client)
@@ -0,0 +1,509 @@
+"""Local stand-in for the Binance USD-M futures REST and websocket endpoints the bot uses.
+
+Runs in-process on aiohttp so tests and benchmarks exercise the real client,
+signing, connection pool and stream code without touching the exchange:
+
+    async with MockExchange([MockSymbol('XUSDT', price=1.0, activate_at=t0)], latency=0.005) as ex:
+        client = await PooledAsyncClient.create('key', 'secret', futures_url=ex.rest_url)
+
+Symbols reject orders and leverage changes with -1121 until `activate_at`.
+Position-mode mismatches return -4061 as the real exchange does; any other
+error can be queued with `inject`. Every request and order is recorded with
+server-side timestamps (`received_at` after inbound latency, `acked_at` just
+before the response is written); an order's `request` is the record of the
+call that placed it.
+"""
+import asyncio
+import json
+import random
+import time
+from dataclasses import dataclass, field
+from aiohttp import WSMsgType, web
+
+ERROR_MESSAGES = {
+    -1000: 'An unknown error occurred while processing the request.',
+    -1102: "Mandatory parameter 'activationprice' was not sent, was empty/null, or malformed.",
+    -1106: "Parameter 'reduceonly' sent when not required.",
+    -1003: 'Too many requests; current limit is %d request weight per minute.',
+    -1121: 'Invalid symbol.',
+    -2013: 'Order does not exist.',
+    -4061: "Order's position side does not match user's setting.",
+    -4116: 'ClientOrderId is duplicated.',
+}
+
+
+@dataclass
+class MockSymbol:
+    symbol: str
+    price: float = 1.0
+    step_size: str = '1'
+    min_qty: str = '1'
+    tick_size: str = '0.0001'
+    min_notional: str = '5'
+    activate_at: float = 0.0  # server time (epoch seconds) the symbol opens for trading
+
+    def exchange_info(self, active: bool) -> dict:
+        return {
+            'symbol': self.symbol,
+            'status': 'TRADING' if active else 'PENDING_TRADING',
+            'filters': [
+                {'filterType': 'PRICE_FILTER', 'tickSize': self.tick_size},
+                {'filterType': 'LOT_SIZE', 'stepSize': self.step_size, 'minQty': self.min_qty},
+                {'filterType': 'MARKET_LOT_SIZE', 'stepSize': self.step_size, 'minQty': self.min_qty},
+                {'filterType': 'MIN_NOTIONAL', 'notional': self.min_notional},
+            ],
+        }
+
+
+@dataclass
+class Injection:
+    code: int
+    msg: str
+    times: int = 1
+    match: dict = field(default_factory=dict)
+
+    def matches(self, params: dict) -> bool:
+        return all(str(params.get(k)) == str(v) for k, v in self.match.items())
+
+
+# Request weight per endpoint, as the exchange counts it (default 1)
+WEIGHTS = {'positionRisk': 5, 'positionSide': 30, 'batchOrders': 5}
+DEPTH_WEIGHTS = ((50, 2), (100, 5), (500, 10), (1000, 20))
+
+
+def _weight(endpoint: str, params: dict) -> int:
+    if endpoint == 'openOrders' and not params.get('symbol'):
+        return 40
+    if endpoint == 'depth':
+        limit = int(params.get('limit', 500))
+        return next((w for top, w in DEPTH_WEIGHTS if limit <= top), DEPTH_WEIGHTS[-1][1])
+    return WEIGHTS.get(endpoint, 1)
+
+
+class MockError(Exception):
+    def __init__(self, code: int, msg: str | None = None):
+        super().__init__(code, msg)
+        self.code = code
+        self.msg = msg or ERROR_MESSAGES.get(code, 'Mock error.')
+        self.status = 429 if code == -1003 else 400
+
+    def payload(self) -> dict:
+        return {'code': self.code, 'msg': self.msg}
+
+
+class MockExchange:
+    """In-process futures exchange with configurable latency, activation times and error injection."""
+
+    def __init__(self, symbols: list[MockSymbol] | None = None, latency: float = 0.0, jitter: float = 0.0,
+                 clock_offset: float = 0.0, hedge: bool = False, mark_interval: float = 1.0, seed: int = 0,
+                 weight_limit: int | None = None):
+        self.symbols = {s.symbol: s for s in symbols or []}
+        self.latency = latency  # one-way seconds, applied to request and response
+        self.jitter = jitter  # extra uniform 0..jitter seconds each way
+        self.clock_offset = clock_offset  # server clock minus local clock, seconds
+        self.hedge = hedge
+        self.mark_interval = mark_interval
+        self.unique_ids_among_open_only = True  # like the exchange: a filled order frees its client id; False rejects any reuse
+        self.weight_limit = weight_limit  # per clock minute; exceeding it returns 429 / -1003
+        self.used_weight = 0
+        self.order_count = 0
+        self._weight_minute = 0
+        self.positions: dict[tuple[str, str], float] = {}
+        self.leverage: dict[str, int] = {}
+        self.entry_prices: dict[tuple[str, str], float] = {}
+        self.orders: list[dict] = []
+        self.requests: list[dict] = []
+        self.listen_keys: set[str] = set()
+        self.rest_url = ''
+        self.ws_url = ''
+        self._injections: dict[str, list[Injection]] = {}
+        self._user_sockets: dict[web.WebSocketResponse, str] = {}
+        self._market_sockets: dict[str, set[web.WebSocketResponse]] = {}
+        # symbol -> {'lastUpdateId', 'bids': {price: qty}, 'asks': {price: qty}}; LIMIT IOC orders fill against it
+        self.books: dict[str, dict] = {}
+        self._sockets: set[web.WebSocketResponse] = set()
+        self._rng = random.Random(seed)
+        self._runner: web.AppRunner | None = None
+
+    # -- lifecycle ---------------------------------------------------------
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> 'MockExchange':
+        app = web.Application()
+        routes = [
+            ('GET', '/fapi/v1/ping', 'ping', self._ping),
+            ('GET', '/fapi/v1/time', 'time', self._time),
+            ('GET', '/fapi/v1/exchangeInfo', 'exchangeInfo', self._exchange_info),
+            ('GET', '/fapi/v1/positionSide/dual', 'positionSide', self._position_mode),
+            ('POST', '/fapi/v1/leverage', 'leverage', self._leverage),
+            ('GET', '/fapi/v1/premiumIndex', 'premiumIndex', self._premium_index),
+            ('POST', '/fapi/v1/order', 'order', self._new_order),
+            ('GET', '/fapi/v1/order', 'getOrder', self._get_order),
+            ('GET', '/fapi/v1/openOrders', 'openOrders', self._open_orders),
+            ('GET', '/fapi/v1/depth', 'depth', self._depth),
+            ('POST', '/fapi/v1/batchOrders', 'batchOrders', self._batch_orders),
+            ('GET', '/fapi/v1/positionRisk', 'positionRisk', self._position_risk),
+            ('GET', '/fapi/v2/positionRisk', 'positionRisk', self._position_risk),
+            ('POST', '/fapi/v1/listenKey', 'listenKey', self._listen_key),
+            ('PUT', '/fapi/v1/listenKey', 'listenKey', self._listen_key),
+            ('DELETE', '/fapi/v1/listenKey', 'listenKey', self._listen_key),
+        ]
+        for method, path, endpoint, handler in routes:
+            app.router.add_route(method, path, self._wrap(endpoint, handler))
+        app.router.add_get('/ws/{stream}', self._stream)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        host, port = self._runner.addresses[0][:2]
+        self.rest_url = f'http://{host}:{port}/fapi'
+        self.ws_url = f'ws://{host}:{port}'
+        return self
+
+    async def stop(self):
+        await self.disconnect_streams()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> 'MockExchange':
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    # -- test controls -----------------------------------------------------
+
+    def now(self) -> float:
+        return time.time() + self.clock_offset
+
+    def is_active(self, symbol: str) -> bool:
+        s = self.symbols.get(symbol)
+        return s is not None and self.now() >= s.activate_at
+
+    def inject(self, endpoint: str, code: int, msg: str | None = None, times: int = 1, match: dict | None = None):
+        """Fail the next `times` requests to `endpoint` (e.g. 'order', 'batchOrders', 'leverage') with `code`.
+
+        `match` restricts the error to requests whose params equal the given
+        values. Batch legs are checked against 'order' injections one by one,
+        so a leg can be rejected while the rest of the batch succeeds.
+        """
+        inj = Injection(code, msg or ERROR_MESSAGES.get(code, 'Mock error.'), times, match or {})
+        self._injections.setdefault(endpoint, []).append(inj)
+
+    def position(self, symbol: str, side: str | None = None) -> float:
+        return self.positions.get((symbol, side or ('LONG' if self.hedge else 'BOTH')), 0.0)
+
+    def accepted_orders(self, symbol: str | None = None, since: int = 0) -> list[dict]:
+        return [o for o in self.orders[since:] if symbol is None or o['symbol'] == symbol]
+
+    def market_streams(self, stream: str) -> int:
+        return len(self._market_sockets.get(stream, ()))
+
+    async def publish(self, stream: str, msg: dict):
+        """Send `msg` to every client subscribed to the market stream `stream` (e.g. 'xusdt@aggTrade')."""
+        for ws in list(self._market_sockets.get(stream, ())):
+            await ws.send_json(msg)
+
+    def user_streams(self) -> int:
+        """Connected user-data streams whose listen key is still open."""
+        return sum(1 for key in self._user_sockets.values() if key in self.listen_keys)
+
+    def open_orders(self, symbol: str) -> list[dict]:
+        return [o for o in self.orders if o['symbol'] == symbol and o['status'] == 'NEW']
+
+    async def close_position(self, symbol: str, price: float | None = None):
+        """Fill the stop for an open position (as if the mark crossed it) and push the user-data events."""
+        price = price if price is not None else self.symbols[symbol].price
+        for (sym, side), amt in list(self.positions.items()):
+            if sym != symbol or amt == 0.0:
+                continue
+            self.positions[(sym, side)] = 0.0
+            for o in self.orders:
+                if o['symbol'] == symbol and o['status'] == 'NEW':
+                    o['status'] = 'EXPIRED'
+            await self._push_user({
+                'e': 'ORDER_TRADE_UPDATE', 'E': self._ms(),
+                'o': {'s': symbol, 'S': 'SELL', 'o': 'STOP_MARKET', 'X': 'FILLED', 'l': str(amt), 'ap': str(price), 'ps': side},
+            })
+            await self._push_position(symbol, side)
+
+    async def disconnect_streams(self):
+        for ws in list(self._sockets):
+            await ws.close()
+
+    # -- plumbing ----------------------------------------------------------
+
+    def _ms(self) -> int:
+        return int(self.now() * 1000)
+
+    async def _delay(self):
+        d = self.latency + (self._rng.uniform(0.0, self.jitter) if self.jitter else 0.0)
+        if d > 0:
+            await asyncio.sleep(d)
+
+    def _take_injection(self, endpoint: str, params: dict) -> MockError | None:
+        for inj in self._injections.get(endpoint, []):
+            if inj.times > 0 and inj.matches(params):
+                inj.times -= 1
+                return MockError(inj.code, inj.msg)
+        return None
+
+    def _wrap(self, endpoint: str, handler):
+        async def wrapped(request: web.Request):
+            await self._delay()
+            params = dict(request.query)
+            if request.can_read_body:
+                params.update(await request.post())
+            record = {'endpoint': endpoint, 'method': request.method, 'params': params, 'received_at': self.now(),
+                      'peer': request.transport.get_extra_info('peername') if request.transport else None,
+                      'key': request.headers.get('X-MBX-APIKEY')}
+            self.requests.append(record)
+            headers = {}
+            try:
+                self._count_weight(endpoint, params)
+                # Orders are checked one by one in _place so batch legs can fail individually
+                err = self._take_injection(endpoint, params) if endpoint != 'order' else None
+                if err:
+                    raise err
+                body, status = await handler(params, record), 200
+            except MockError as e:
+                body, status = e.payload(), e.status
+                if status == 429:
+                    headers['Retry-After'] = str(60 - int(self.now()) % 60)
+            headers['X-MBX-USED-WEIGHT-1M'] = str(self.used_weight)
+            if endpoint in ('order', 'batchOrders') and record['method'] == 'POST':
+                headers['X-MBX-ORDER-COUNT-1M'] = str(self.order_count)
+            await self._delay()
+            record['acked_at'] = self.now()
+            record['status'] = status
+            return web.json_response(_public(body), status=status, headers=headers)
+        return wrapped
+
+    def _count_weight(self, endpoint: str, params: dict):
+        minute = int(self.now() // 60)
+        if minute != self._weight_minute:
+            self._weight_minute, self.used_weight, self.order_count = minute, 0, 0
+        self.used_weight += _weight(endpoint, params)
+        if self.weight_limit is not None and self.used_weight > self.weight_limit:
+            raise MockError(-1003, ERROR_MESSAGES[-1003] % self.weight_limit)
+
+    def _symbol(self, params: dict) -> MockSymbol:
+        s = self.symbols.get(params.get('symbol', ''))
+        if s is None or self.now() < s.activate_at:
+            raise MockError(-1121)
+        return s
+
+    def _check_position_side(self, params: dict):
+        side = params.get('positionSide')
+        if self.hedge and side not in ('LONG', 'SHORT'):
+            raise MockError(-4061)
+        if not self.hedge and side not in (None, 'BOTH'):
+            raise MockError(-4061)
+
+    def _place(self, params: dict, record: dict) -> dict:
+        """Validate and book one order; raises MockError on rejection."""
+        err = self._take_injection('order', params)
+        if err:
+            raise err
+        s = self._symbol(params)
+        self._check_position_side(params)
+        client_id = params.get('newClientOrderId') or f'mock-{len(self.orders) + 1}'
+        # Client order ids are unique per account (API key)
+        if any(o['clientOrderId'] == client_id and o['request'].get('key') == record.get('key')
+               and (o['status'] == 'NEW' or not self.unique_ids_among_open_only)
+               for o in self.orders):
+            raise MockError(-4116)
+        self.order_count += 1
+        order = {
+            'orderId': len(self.orders) + 1,
+            'symbol': s.symbol,
+            'clientOrderId': client_id,
+            'side': params.get('side'),
+            'type': params.get('type'),
+            'positionSide': params.get('positionSide', 'BOTH'),
+            'origQty': params.get('quantity', '0'),
+            'executedQty': '0',
+            'avgPrice': '0.00',
+            'status': 'NEW',
+            'updateTime': self._ms(),
+            'params': dict(params),
+            'request': record,
+        }
+        if order['type'] == 'LIMIT' and params.get('timeInForce') == 'IOC':
+            self._fill_ioc(s, order, float(params['price']))
+        elif order['type'] == 'MARKET':
+            qty = float(order['origQty'])
+            sign = 1.0 if order['side'] == 'BUY' else -1.0
+            key = (s.symbol, order['positionSide'])
+            if sign > 0:
+                held = max(self.positions.get(key, 0.0), 0.0)
+                self.entry_prices[key] = (self.entry_prices.get(key, 0.0) * held + s.price * qty) / (held + qty)
+            self.positions[key] = self.positions.get(key, 0.0) + sign * qty
+            order.update(executedQty=order['origQty'], avgPrice=f'{s.price:.8f}', status='FILLED')
+            asyncio.get_running_loop().create_task(self._push_position(s.symbol, order['positionSide']))
+        self.orders.append(order)
+        resp = dict(order)
+        if order['type'] in ('MARKET', 'LIMIT') and params.get('newOrderRespType', 'ACK') == 'ACK':
+            # ACK responses do not carry the fill
+            resp.update(executedQty='0', avgPrice='0.00', status='NEW')
+        return resp
+
+    def _fill_ioc(self, s: MockSymbol, order: dict, limit: float):
+        """Fill a buy IOC from the symbol's book (or at the last price without one); the rest expires."""
+        want = float(order['origQty'])
+        book = self.books.get(s.symbol)
+        asks = sorted((book or {}).get('asks', {}).items()) if book else [(s.price, want)]
+        filled = cost = 0.0
+        for price, qty in asks:
+            if price > limit or filled >= want:
+                break
+            take = min(qty, want - filled)
+            filled += take
+            cost += take * price
+            if book:
+                book['asks'][price] = qty - take
+                if book['asks'][price] <= 0:
+                    del book['asks'][price]
+        order.update(executedQty=f'{filled:g}', avgPrice=f'{cost / filled:.8f}' if filled else '0.00',
+                     status='FILLED' if filled >= want else 'EXPIRED')
+        if filled:
+            key = (s.symbol, order['positionSide'])
+            held = max(self.positions.get(key, 0.0), 0.0)
+            self.entry_prices[key] = (self.entry_prices.get(key, 0.0) * held + cost) / (held + filled)
+            self.positions[key] = self.positions.get(key, 0.0) + filled
+            asyncio.get_running_loop().create_task(self._push_position(s.symbol, order['positionSide']))
+
+    async def _push_position(self, symbol: str, side: str):
+        await self._push_user({
+            'e': 'ACCOUNT_UPDATE', 'E': self._ms(),
+            'a': {'m': 'ORDER', 'P': [{'s': symbol, 'pa': str(self.positions.get((symbol, side), 0.0)), 'ps': side}]},
+        })
+
+    async def _push_user(self, event: dict):
+        for ws in list(self._user_sockets):
+            try:
+                await ws.send_json(event)
+            except ConnectionError:
+                self._user_sockets.pop(ws, None)
+
+    # -- REST handlers -----------------------------------------------------
+
+    async def _ping(self, params: dict, record: dict):
+        return {}
+
+    async def _time(self, params: dict, record: dict):
+        return {'serverTime': self._ms()}
+
+    async def _exchange_info(self, params: dict, record: dict):
+        return {'serverTime': self._ms(), 'symbols': [s.exchange_info(self.is_active(s.symbol)) for s in self.symbols.values()]}
+
+    async def _position_mode(self, params: dict, record: dict):
+        return {'dualSidePosition': self.hedge}
+
+    async def _leverage(self, params: dict, record: dict):
+        s = self._symbol(params)
+        leverage = int(params.get('leverage', 1))
+        if self.leverage.get(s.symbol) != leverage:
+            self.leverage[s.symbol] = leverage
+            await self._push_user({'e': 'ACCOUNT_CONFIG_UPDATE', 'E': self._ms(), 'ac': {'s': s.symbol, 'l': leverage}})
+        return {'symbol': s.symbol, 'leverage': leverage, 'maxNotionalValue': '1000000'}
+
+    async def _premium_index(self, params: dict, record: dict):
+        s = self.symbols.get(params.get('symbol', ''))
+        if s is None:
+            raise MockError(-1121)
+        return {'symbol': s.symbol, 'markPrice': f'{s.price:.8f}', 'time': self._ms()}
+
+    async def _new_order(self, params: dict, record: dict):
+        return self._place(params, record)
+
+    async def _get_order(self, params: dict, record: dict):
+        for o in self.orders:
+            if o['symbol'] == params.get('symbol') and o['request'].get('key') == record.get('key') and (
+                    o['clientOrderId'] == params.get('origClientOrderId') or str(o['orderId']) == params.get('orderId')):
+                return o
+        raise MockError(-2013)
+
+    async def _batch_orders(self, params: dict, record: dict):
+        out = []
+        for leg in json.loads(params['batchOrders']):
+            try:
+                out.append(self._place({k: str(v) for k, v in leg.items()}, record))
+            except MockError as e:
+                out.append(e.payload())
+        return out
+
+    async def _position_risk(self, params: dict, record: dict):
+        sides = ('LONG', 'SHORT') if self.hedge else ('BOTH',)
+        symbols = [params['symbol']] if params.get('symbol') else list(self.symbols)
+        return [
+            {'symbol': sym, 'positionSide': side, 'positionAmt': str(self.positions.get((sym, side), 0.0)),
+             'leverage': str(self.leverage.get(sym, 20)),
+             'entryPrice': f'{self.entry_prices.get((sym, side), 0.0):.8f}' if self.positions.get((sym, side)) else '0.0',
+             'markPrice': f'{self.symbols[sym].price:.8f}' if sym in self.symbols else '0'}
+            for sym in symbols for side in sides
+        ]
+
+    async def _depth(self, params: dict, record: dict):
+        self._symbol(params)
+        book = self.books.get(params['symbol'], {'lastUpdateId': 0, 'bids': {}, 'asks': {}})
+        limit = int(params.get('limit', 500))
+        return {
+            'lastUpdateId': book['lastUpdateId'], 'E': self._ms(), 'T': self._ms(),
+            'bids': [[f'{p:g}', f'{q:g}'] for p, q in sorted(book['bids'].items(), reverse=True)[:limit]],
+            'asks': [[f'{p:g}', f'{q:g}'] for p, q in sorted(book['asks'].items())[:limit]],
+        }
+
+    async def _open_orders(self, params: dict, record: dict):
+        return [_public(o) for o in self.orders if o['status'] == 'NEW' and params.get('symbol') in (None, o['symbol'])]
+
+    async def _listen_key(self, params: dict, record: dict):
+        if record['method'] == 'POST':
+            key = f'mock-listen-key-{len(self.listen_keys) + 1}'
+            self.listen_keys.add(key)
+            return {'listenKey': key}
+        if record['method'] == 'DELETE':
+            self.listen_keys.discard(params.get('listenKey'))
+        return {}
+
+    # -- websocket streams -------------------------------------------------
+
+    async def _stream(self, request):
+        name = request.match_info['stream']
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self._sockets.add(ws)
+        try:
+            if name in self.listen_keys:
+                self._user_sockets[ws] = name
+                async for msg in ws:
+                    if msg.type in (WSMsgType.CLOSE, WSMsgType.ERROR):
+                        break
+            elif '@aggtrade' in name.lower() or '@depth' in name:
+                # Market streams fed by publish()
+                self._market_sockets.setdefault(name, set()).add(ws)
+                async for msg in ws:
+                    if msg.type in (WSMsgType.CLOSE, WSMsgType.ERROR):
+                        break
+            elif name.endswith('@markprice@1s') or name.endswith('@markPrice@1s'):
+                symbol = name.split('@', 1)[0].upper()
+                reader = asyncio.ensure_future(ws.receive())
+                while not ws.closed and not reader.done():
+                    s = self.symbols.get(symbol)
+                    if s is not None:
+                        await ws.send_json({'e': 'markPriceUpdate', 'E': self._ms(), 's': symbol, 'p': f'{s.price:.8f}'})
+                    await asyncio.wait([reader], timeout=self.mark_interval)
+                reader.cancel()
+        finally:
+            self._user_sockets.pop(ws, None)
+            for sockets in self._market_sockets.values():
+                sockets.discard(ws)
+            self._sockets.discard(ws)
+        return ws
+
+
+def _public(body):
+    """Drop the mock's bookkeeping fields from a response."""
+    hidden = ('params', 'request')
+    if isinstance(body, list):
+        return [_public(b) for b in body]
+    return {k: v for k, v in body.items() if k not in hidden}
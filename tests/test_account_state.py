@@ -0,0 +1,53 @@
+from src.account_state import AsyncAccountStateCache
+from src.async_executor import AsyncFuturesExecutor
+from tests.conftest import SYMBOL
+
+
+def _calls(exchange, endpoint: str) -> int:
+    return sum(1 for r in exchange.requests if r['endpoint'] == endpoint)
+
+
+async def test_load_then_order_path_makes_no_mode_calls(exchange, client, rules):
+    account = AsyncAccountStateCache(client)
+    await account.load()
+    assert account.hedge is False
+    assert account.leverage[SYMBOL] == 20
+    ex = AsyncFuturesExecutor(client, rules, account)
+
+    res = await ex.open_futures_long(SYMBOL, 1.0, 10)
+    await ex.place_protective_orders(SYMBOL, res['qty'], stop_price=0.99, activation_price=1.1)
+    assert _calls(exchange, 'positionSide') == 1
+
+
+async def test_leverage_already_set_is_not_sent_again(exchange, client):
+    account = AsyncAccountStateCache(client)
+    await account.set_leverage(SYMBOL, 10)
+    await account.set_leverage(SYMBOL, 10)
+    assert _calls(exchange, 'leverage') == 1
+    await account.set_leverage(SYMBOL, 5)
+    assert _calls(exchange, 'leverage') == 2
+
+
+async def test_position_mode_error_invalidates_and_corrects(exchange, client, rules):
+    account = AsyncAccountStateCache(client)
+    await account.load()
+    exchange.hedge = True  # switched outside the bot
+    ex = AsyncFuturesExecutor(client, rules, account)
+
+    res = await ex.open_futures_long(SYMBOL, 1.0, 10)
+    assert res['hedge'] is True
+    assert account.hedge is True
+    assert exchange.position(SYMBOL, 'LONG') == 10.0
+    assert _calls(exchange, 'positionSide') == 1
+
+
+def test_user_events_update_positions_leverage_and_mode(client):
+    account = AsyncAccountStateCache(client)
+    account.on_user_event({'e': 'ACCOUNT_UPDATE', 'a': {'P': [{'s': SYMBOL, 'pa': '12', 'ps': 'BOTH'}]}})
+    account.on_user_event({'e': 'ACCOUNT_CONFIG_UPDATE', 'ac': {'s': SYMBOL, 'l': 7}})
+    account.on_user_event({'e': 'ACCOUNT_CONFIG_UPDATE', 'ai': {'j': False}})
+    assert account.position(SYMBOL) == 12.0
+    assert account.leverage[SYMBOL] == 7
+    assert account.hedge is False
+    assert not account.on_error(-1121)
+    assert account.on_error(-4061) and account.hedge is None
@@ -0,0 +1,25 @@
+import pytest
+
+from tests.benchmark import Sample, percentile, run_benchmark, summarize
+
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([3.0], 99) == 3.0
+
+
+@pytest.mark.parametrize('armed', [False, True])
+async def test_launch_path_latencies(armed):
+    samples = await run_benchmark(runs=3, latency=0.002, armed=armed, lead=0.2)
+    summary = summarize(samples)
+    for name in ('scheduled -> entry ack', 'entry ack -> protected'):
+        stats = summary[name]
+        assert stats['n'] == 3
+        assert 0.0 < stats['p50'] <= stats['p99'] < 1000.0
+
+
+async def test_activation_delay_is_visible_in_entry_latency():
+    samples = await run_benchmark(runs=2, latency=0.001, armed=True, activation_delay=0.1, lead=0.2)
+    assert all(isinstance(s, Sample) and s.to_entry_ms >= 100.0 for s in samples)
@@ -0,0 +1,55 @@
+import asyncio
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from src.accounts import account_journal_path, load_accounts
+from src.config import config
+from src.main import fanout_flow
+from tests.conftest import SYMBOL
+
+
+def test_accounts_file_with_env_credentials(tmp_path, monkeypatch):
+    monkeypatch.setenv('SUB2_KEY', 'k2')
+    monkeypatch.setenv('SUB2_SECRET', 's2')
+    path = tmp_path / 'accounts.jsonl'
+    path.write_text('{"name": "sub1", "api_key": "k1", "api_secret": "s1", "usdt": 2}\n'
+                    '# second account keeps its keys in the environment\n'
+                    '{"name": "sub2", "api_key_env": "SUB2_KEY", "api_secret_env": "SUB2_SECRET", "leverage": 5}\n')
+    sub1, sub2 = load_accounts(str(path))
+    assert (sub1.api_key, sub1.usdt, sub2.api_secret, sub2.leverage) == ('k1', 2.0, 's2', 5)
+    assert account_journal_path('journal.jsonl', 'sub2') == 'journal.sub2.jsonl'
+
+    path.write_text('[{"name": "sub3", "api_key_env": "MISSING_KEY", "api_secret": "s"}]')
+    with pytest.raises(ValueError, match='account #1'):
+        load_accounts(str(path))
+
+
+async def test_fanout_enters_every_account_with_shared_public_data(exchange, tmp_path, monkeypatch):
+    keys = ['key-a', 'key-b', 'key-c']
+    accounts = tmp_path / 'accounts.json'
+    accounts.write_text(json.dumps([{'name': k, 'api_key': k, 'api_secret': 'secret', 'usdt': 1, 'leverage': 10} for k in keys]))
+    for name, value in {'FUTURES_REST_URL': exchange.rest_url, 'FUTURES_WS_URL': exchange.ws_url, 'WARMUP_LEAD': 1.1,
+                        'ARM_LEAD': 1.05, 'JOURNAL_PATH': str(tmp_path / 'journal.jsonl'), 'METRICS_JSONL': ''}.items():
+        monkeypatch.setattr(config, name, value)
+    at = datetime.fromtimestamp(exchange.now() + 1.3, timezone.utc)
+
+    async def close_when_protected():
+        while sum(o['type'] == 'STOP_MARKET' for o in exchange.open_orders(SYMBOL)) < 3 or exchange.user_streams() < 3:
+            await asyncio.sleep(0.01)
+        await exchange.close_position(SYMBOL)
+
+    closer = asyncio.create_task(close_when_protected())
+    await asyncio.wait_for(fanout_flow(SYMBOL, at.isoformat(), str(accounts), ref_price=1.0), 10)
+    await closer
+
+    entries = [r for r in exchange.requests if r['endpoint'] == 'order' and r['method'] == 'POST' and r['status'] == 200]
+    assert sorted(r['key'] for r in entries) == keys
+    assert len({r['params']['newClientOrderId'] for r in entries}) == 1
+    assert all(r['received_at'] >= at.timestamp() - 0.05 for r in entries)
+    # Up to T-0 exchange info and the mark price come from one client only
+    before = [r for r in exchange.requests if r['received_at'] < at.timestamp() - 0.05]
+    public = [r for r in before if r['endpoint'] in ('exchangeInfo', 'premiumIndex')]
+    assert public and {r['key'] for r in public} == {'key-a'}
+    assert {r['key'] for r in before if r['endpoint'] == 'leverage'} == set(keys)
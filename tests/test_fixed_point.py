@@ -0,0 +1,78 @@
+from decimal import Decimal, ROUND_CEILING
+
+from hypothesis import given, strategies as st
+
+from src.async_executor import AsyncFuturesExecutor
+from src.fixed_point import Scale, parse_decimal, plain
+from src.symbol_rules import SymbolRules
+
+# Exchange-style increments: 1, 2, 5 or 25 times a power of ten, written out in full
+increments = st.builds(
+    lambda m, e, pad: format(Decimal(m).scaleb(e), 'f') + ('0' * pad if e < 0 else ''),
+    st.sampled_from([1, 2, 5, 25]), st.integers(-8, 2), st.integers(0, 3),
+)
+values = st.floats(min_value=0.0, max_value=1e6, allow_nan=False, allow_infinity=False)
+
+
+def ref_floor(value: float, increment: str) -> int:
+    return int(Decimal(repr(value)) // Decimal(increment))
+
+
+def ref_text(count: int, increment: str) -> str:
+    return format((count * Decimal(increment)).normalize(), 'f')
+
+
+@given(values, increments)
+def test_floor_matches_decimal_reference(value, increment):
+    scale = Scale(increment)
+    count = scale.floor(value)
+    assert count == ref_floor(value, increment)
+    assert scale.format(count) == ref_text(count, increment)
+
+
+@given(st.integers(0, 10 ** 8), increments)
+def test_exact_multiples_are_kept(count, increment):
+    # Multiples that are inexact in binary (0.3, 1.1, ...) must not lose an increment
+    value = float(count * Decimal(increment))
+    assert Scale(increment).floor(value) == ref_floor(value, increment)
+
+
+@given(values, increments)
+def test_formatted_text_is_plain_and_on_the_grid(value, increment):
+    text = Scale(increment).floor_text(value)
+    assert 'e' not in text.lower()
+    assert Decimal(text) % Decimal(increment) == 0
+    assert Decimal(text) <= Decimal(repr(value))
+
+
+@given(st.integers(0, 10 ** 6), st.integers(0, 8), increments)
+def test_ceil_text_matches_reference(mantissa, decimals, increment):
+    text = format(Decimal(mantissa).scaleb(-decimals), 'f')
+    expected = int((Decimal(text) / Decimal(increment)).to_integral_value(ROUND_CEILING))
+    assert Scale(increment).ceil_text(text) == expected
+
+
+@given(st.floats(allow_nan=False, allow_infinity=False))
+def test_plain_round_trips_without_exponent(value):
+    text = plain(value)
+    assert 'e' not in text
+    assert float(text) == value
+
+
+def test_parse_decimal():
+    assert parse_decimal('0.00100000') == (1, 3)
+    assert parse_decimal('25') == (25, 0)
+    assert parse_decimal('1e-5') == (1, 5)
+    assert parse_decimal('1E+2') == (100, 0)
+
+
+def test_entry_and_protection_strings_are_exchange_ready():
+    rules = SymbolRules('XUSDT', 'TRADING', step_size='0.00001', min_qty='0.00001', tick_size='0.0000001', min_notional=None)
+    ex = AsyncFuturesExecutor(client=None, rules=None)
+    params = ex._build_entry('XUSDT', 1.0, 1, 100000.0, rules, hedge=False)
+    assert params['quantity'] == '0.00001'  # str(1e-05) would be '1e-05'
+    stop = ex._stop_loss_params('XUSDT', 0.000012345678, rules, hedge=False)
+    assert stop['stopPrice'] == '0.0000123'
+    trailing = ex._trailing_stop_params('XUSDT', 0.3, 1.0, 0.1 + 0.2, rules, hedge=False)
+    assert trailing['quantity'] == '0.3'
+    assert trailing['activationPrice'] == '0.3'
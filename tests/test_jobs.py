@@ -0,0 +1,67 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from src.jobs import Job, JobScheduler, load_jobs
+from src.launch_scheduler import LaunchScheduler, ServerClock
+from tests.mock_exchange import MockSymbol
+
+
+async def test_overlapping_jobs_fire_on_time_and_fail_alone(exchange, client):
+    exchange.symbols['YUSDT'] = MockSymbol('YUSDT')
+    clock = ServerClock(client, samples=1)
+    await clock.sync()
+    t0 = clock.server_now() + 1.5
+    # The failing job fires after the window below, so its traceback logging is not counted as a stall
+    at = {'XUSDT': t0, 'YUSDT': t0 + 0.02, 'BADUSDT': t0 + 0.06}
+
+    async def run_job(job: Job):
+        await LaunchScheduler(clock).wait_until(job.at, job.symbol)
+        if job.symbol == 'BADUSDT':
+            raise RuntimeError('lost connection')
+        await client.futures_create_order(symbol=job.symbol, side='BUY', type='MARKET', quantity='5')
+
+    stalls = []
+
+    async def ticker():
+        # Any other coroutine on the loop: monitor pings, depth feed, another job's countdown
+        last = time.perf_counter()
+        while True:
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            if t0 - 0.1 <= clock.server_now() <= t0 + 0.05:
+                stalls.append(now - last)
+            last = now
+
+    scheduler = JobScheduler(run_job, now=clock.server_now, prep_lead=60.0)
+    jobs = {sym: Job(sym, datetime.fromtimestamp(ts, timezone.utc)) for sym, ts in at.items()}
+    for job in jobs.values():
+        scheduler.add(job)
+    tick = asyncio.create_task(ticker())
+    try:
+        await scheduler.run()
+    finally:
+        tick.cancel()
+
+    assert scheduler.results[jobs['BADUSDT'].name].startswith('failed: lost connection')
+    assert sorted(v for v in scheduler.results.values() if v == 'done') == ['done', 'done']
+    for order in exchange.accepted_orders():
+        assert abs(order['request']['received_at'] - at[order['symbol']]) < 0.02
+    # Around T-0 each countdown busy-waits only its last couple of milliseconds, never the whole
+    # spin window; the bound leaves room for scheduler jitter on a loaded machine
+    assert stalls and max(stalls) < LaunchScheduler(clock).spin_window / 2
+
+
+def test_duplicate_jobs_are_rejected(tmp_path):
+    path = tmp_path / 'jobs.jsonl'
+    path.write_text('{"symbol": "XUSDT", "at_utc": "2030-01-01T12:00:00Z"}\n'
+                    '{"symbol": "XUSDT", "at_utc": "2030-01-01T12:00:00.500Z", "usdt": 2}\n')
+    with pytest.raises(ValueError, match='Duplicate'):
+        load_jobs(str(path))
+    job = Job('XUSDT', datetime(2030, 1, 1, 12, tzinfo=timezone.utc))
+    scheduler = JobScheduler(lambda job: None)
+    scheduler.add(job)
+    with pytest.raises(ValueError, match='Duplicate'):
+        scheduler.add(Job('XUSDT', job.at))
@@ -0,0 +1,71 @@
+import asyncio
+
+from src.account_state import AsyncAccountStateCache
+from src.config import config
+from src.journal import CLOSED, ENTRY, FAILED, LEVERAGE, PROTECTION, SCHEDULED, Journal, TradeState, reconcile, replay
+from src.main import recover
+from tests.conftest import SYMBOL
+
+CID = 'lb-0123456789abcdef01234567'
+
+
+def test_replay_survives_torn_last_line(tmp_path):
+    path = str(tmp_path / 'journal.jsonl')
+    journal = Journal(path, batch_interval=0.001)
+    journal.record(SCHEDULED, CID, symbol=SYMBOL, at=1_700_000_000.0, params={'usdt': 1.0, 'leverage': 10})
+    journal.record(ENTRY, CID, qty=10.0, entry_price=1.0, hedge=False)
+    assert journal.sync(timeout=1.0)
+    journal.close()
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"t":1,"step":"protection","id":"lb-')  # died mid-write
+
+    trade = replay(path)[CID]
+    assert trade.steps == [SCHEDULED, ENTRY]
+    assert (trade.symbol, trade.qty, trade.entry_price, trade.hedge) == (SYMBOL, 10.0, 1.0, False)
+    assert trade.entered and not trade.finished
+
+
+def test_reconcile_decides_per_trade():
+    trades = [TradeState('open', 'AUSDT', 100.0, steps=[SCHEDULED, LEVERAGE]), TradeState('flat', 'BUSDT', 100.0, steps=[ENTRY]),
+              TradeState('missed', 'CUSDT', 100.0), TradeState('later', 'DUSDT', 500.0),
+              TradeState('manual', 'EUSDT', 100.0, steps=[SCHEDULED]), TradeState('early', 'FUSDT', 500.0, steps=[SCHEDULED])]
+    positions = [{'symbol': 'AUSDT', 'positionSide': 'BOTH', 'positionAmt': '5', 'entryPrice': '2.0'},
+                 {'symbol': 'BUSDT', 'positionSide': 'BOTH', 'positionAmt': '0', 'entryPrice': '0.0'},
+                 {'symbol': 'EUSDT', 'positionSide': 'BOTH', 'positionAmt': '3', 'entryPrice': '1.0'},
+                 {'symbol': 'FUSDT', 'positionSide': 'BOTH', 'positionAmt': '3', 'entryPrice': '1.0'}]
+    orders = [{'symbol': 'AUSDT', 'type': 'TRAILING_STOP_MARKET', 'side': 'SELL'}]
+
+    resumes, finished = reconcile(trades, positions, orders, now=200.0)
+    assert [(r.trade.client_order_id, r.qty, r.entry_price, r.missing_legs) for r in resumes] == [('open', 5.0, 2.0, ['stop_loss'])]
+    # Longs the trade never sent an entry for are not adopted; a launch still ahead is left to run
+    assert finished == {'flat': (CLOSED, 'flat on restart'), 'missed': (FAILED, 'no position after launch time'),
+                        'manual': (FAILED, 'entry never sent; existing position not adopted')}
+
+
+async def test_warm_restart_places_missing_leg_and_monitors(exchange, client, rules, tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'FUTURES_WS_URL', exchange.ws_url)
+    path = str(tmp_path / 'journal.jsonl')
+    # Previous run: entry filled, trailing stop placed, then the process died
+    await client.futures_create_order(symbol=SYMBOL, side='BUY', type='MARKET', quantity='10')
+    trailing = await client.futures_create_order(symbol=SYMBOL, side='SELL', type='TRAILING_STOP_MARKET', quantity='10',
+                                                 callbackRate='1', reduceOnly='true', workingType='MARK_PRICE')
+    before = Journal(path)
+    before.record(SCHEDULED, CID, symbol=SYMBOL, at=exchange.now() - 5.0, params={'usdt': 1.0, 'leverage': 10})
+    before.record(ENTRY, CID, qty=10.0, entry_price=1.0, hedge=False)
+    before.record(PROTECTION, CID, leg='trailing', order_id=trailing['orderId'])
+    before.close()
+
+    journal = Journal(path)
+    tasks = await recover(client, rules, AsyncAccountStateCache(client), journal)
+    assert len(tasks) == 1
+    while not (exchange.user_streams() and any(o['type'] == 'STOP_MARKET' for o in exchange.open_orders(SYMBOL))):
+        await asyncio.sleep(0.005)
+    await exchange.close_position(SYMBOL)
+    await asyncio.wait_for(asyncio.gather(*tasks), 5)
+    journal.close()
+
+    trade = replay(path)[CID]
+    assert trade.finished and trade.step == CLOSED
+    assert set(trade.legs) == {'trailing', 'stop_loss'}
+    placed = [r for r in exchange.requests if r['endpoint'] in ('order', 'batchOrders') and r['method'] == 'POST']
+    assert len(placed) == 3  # entry, trailing, and only the missing stop-loss
@@ -0,0 +1,80 @@
+import io
+import json
+import logging
+import threading
+import time
+
+import pytest
+
+from src.log_pipeline import collapse, setup_logging, shutdown_logging
+
+logger = logging.getLogger('test_log_pipeline')
+
+
+@pytest.fixture
+def output():
+    root = logging.getLogger()
+    saved = root.handlers[:], root.level
+    stream = io.StringIO()
+    yield stream
+    shutdown_logging()
+    root.handlers[:], level = saved
+    root.setLevel(level)
+
+
+def _lines(stream: io.StringIO) -> list[dict]:
+    shutdown_logging()
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_json_lines_with_monotonic_stamps(output):
+    setup_logging('INFO', fmt='json', stream=output)
+    logger.info('first %d', 1)
+    logger.debug('hidden')
+    try:
+        raise ValueError('boom')
+    except ValueError:
+        logger.exception('second')
+    lines = _lines(output)
+
+    assert [line['msg'] for line in lines] == ['first 1', 'second']
+    assert lines[0]['logger'] == 'test_log_pipeline' and lines[0]['level'] == 'INFO'
+    assert lines[0]['mono'] <= lines[1]['mono'] <= time.monotonic()
+    assert 'ValueError: boom' in lines[1]['exc']
+
+
+def test_messages_are_formatted_on_the_writer_thread(output):
+    class Probe:
+        thread = None
+
+        def __str__(self):
+            Probe.thread = threading.current_thread()
+            return 'probe'
+
+    setup_logging('INFO', fmt='json', stream=output)
+    logger.info('response: %s', Probe())
+    assert _lines(output)[0]['msg'] == 'response: probe'
+    assert Probe.thread is not threading.main_thread()
+
+
+def test_repeated_lines_collapse(output):
+    setup_logging('INFO', fmt='json', collapse_interval=0.05, stream=output)
+    for i in range(5):
+        logger.info('T-minus %d', i, extra=collapse('countdown'))
+    logger.info('other')
+    time.sleep(0.06)
+    logger.info('T-minus %d', 9, extra=collapse('countdown'))
+    lines = _lines(output)
+
+    assert [line['msg'] for line in lines] == ['T-minus 0', 'other', 'T-minus 9']
+    assert lines[2]['suppressed'] == 4
+
+
+def test_text_format_and_shutdown_flush(output):
+    setup_logging('INFO', fmt='text', stream=output)
+    for i in range(1000):
+        logger.info('line %d', i)
+    shutdown_logging()
+    text = output.getvalue().splitlines()
+    assert len(text) == 1000
+    assert text[-1].endswith('INFO [test_log_pipeline] line 999')
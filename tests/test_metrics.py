@@ -0,0 +1,71 @@
+import json
+
+import aiohttp
+import pytest
+
+from src.async_executor import AsyncFuturesExecutor
+from src.metrics import Histogram, Metrics, metrics
+from tests.conftest import SYMBOL
+
+
+def test_histogram_quantiles_use_bucket_bounds():
+    hist = Histogram()
+    for ms in [0.3, 0.4, 3.0, 4.0, 40.0]:
+        hist.observe(ms)
+    assert hist.count == 5
+    assert hist.quantile(0.5) == 5.0
+    assert hist.quantile(0.99) == 40.0  # clamped to the max seen
+    assert hist.to_dict()['buckets']['0.5'] == 2
+
+
+def test_span_records_duration_and_error():
+    m = Metrics()
+    with m.span('stage', symbol='X'):
+        pass
+    with pytest.raises(ValueError):
+        with m.span('stage', symbol='X'):
+            raise ValueError('boom')
+    assert m.histograms['stage{symbol=X}'].count == 2
+    assert [e.error for e in m.events] == [None, 'ValueError']
+    assert all(e.duration_ms >= 0.0 for e in m.events)
+
+
+def test_write_jsonl_flushes_run(tmp_path):
+    m = Metrics()
+    m.observe('entry.order', 3.5)
+    path = tmp_path / 'metrics.jsonl'
+    m.write_jsonl(str(path))
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line['type'] for line in lines] == ['run', 'span', 'histogram']
+    assert lines[2]['key'] == 'entry.order' and lines[2]['count'] == 1
+    assert m.events == []
+
+
+def test_prometheus_text_has_cumulative_buckets():
+    m = Metrics()
+    m.observe('http', 2.0, endpoint='order')
+    text = m.prometheus()
+    assert 'bot_http_ms_bucket{endpoint="order",le="2.5"} 1' in text
+    assert 'bot_http_ms_count{endpoint="order"} 1' in text
+
+
+async def test_serve_exposes_metrics(unused_tcp_port):
+    m = Metrics()
+    m.observe('entry.order', 1.0)
+    runner = await m.serve(unused_tcp_port)
+    try:
+        async with aiohttp.ClientSession() as session:
+            async with session.get(f'http://127.0.0.1:{unused_tcp_port}/metrics.json') as resp:
+                body = await resp.json()
+    finally:
+        await runner.cleanup()
+    assert body['histograms']['entry.order']['count'] == 1
+
+
+async def test_order_path_is_instrumented(exchange, client, rules):
+    before = {k: h.count for k, h in metrics.histograms.items()}
+    res = await AsyncFuturesExecutor(client, rules).open_futures_long(SYMBOL, 1.0, 10)
+    assert res is not None
+    for key in ('entry.mark_price', 'entry.rules', 'entry.hedge_mode', 'entry.order',
+                'http.sign{endpoint=order}', 'http{endpoint=order}', 'exchange.entry_update_to_ack'):
+        assert metrics.histograms[key].count > before.get(key, 0), key
@@ -0,0 +1,63 @@
+import asyncio
+
+from src.monitor import PositionMonitor
+from tests.conftest import SYMBOL
+
+
+async def _open(exchange, client) -> PositionMonitor:
+    await client.futures_create_order(symbol=SYMBOL, side='BUY', type='MARKET', quantity='10')
+    return PositionMonitor(client, SYMBOL, 1.0, False, exchange.ws_url, report_interval=5.0, stale_after=60.0)
+
+
+def _close_silently(exchange):
+    """Flatten the position without any user-data event reaching the bot (the fill was missed)."""
+    exchange.positions[(SYMBOL, 'BOTH')] = 0.0
+
+
+async def test_close_before_user_stream_connects_is_seen(exchange, client, monkeypatch):
+    monitor = await _open(exchange, client)
+    get_key = client.futures_stream_get_listen_key
+    gate = asyncio.Event()
+
+    async def slow_listen_key():
+        await gate.wait()
+        return await get_key()
+
+    monkeypatch.setattr(client, 'futures_stream_get_listen_key', slow_listen_key)
+    task = asyncio.create_task(monitor.run())
+    while monitor.remaining != 10.0:
+        await asyncio.sleep(0.005)
+    # Stop-loss fills after the REST seed, before the subscription is live
+    await exchange.close_position(SYMBOL)
+    gate.set()
+    await asyncio.wait_for(task, 2)
+    assert monitor.remaining == 0.0
+
+
+async def test_rest_fallback_while_user_stream_is_down(exchange, client, monkeypatch):
+    monitor = await _open(exchange, client)
+    monitor.report_interval = 0.02
+
+    async def no_listen_key():
+        raise ConnectionError('user stream unavailable')
+
+    monkeypatch.setattr(client, 'futures_stream_get_listen_key', no_listen_key)
+    task = asyncio.create_task(monitor.run())
+    await asyncio.sleep(0.1)
+    assert not task.done() and monitor.rest_polls >= 3
+    _close_silently(exchange)
+    await asyncio.wait_for(task, 2)
+    assert monitor.remaining == 0.0
+
+
+async def test_reconnect_resyncs_over_rest(exchange, client):
+    monitor = await _open(exchange, client)
+    task = asyncio.create_task(monitor.run())
+    while not (exchange.user_streams() and monitor.user_stream.connected and not monitor._resync):
+        await asyncio.sleep(0.005)
+    polls = monitor.rest_polls
+    _close_silently(exchange)
+    await monitor.user_stream.reconnect()
+    await asyncio.wait_for(task, 2)
+    assert monitor.user_stream.connects == 2
+    assert monitor.rest_polls > polls
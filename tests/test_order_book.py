@@ -0,0 +1,103 @@
+import asyncio
+import random
+
+from src.async_executor import AsyncFuturesExecutor
+from src.order_book import DepthFeed, OrderBook
+from tests.conftest import SYMBOL
+
+STREAM = f'{SYMBOL.lower()}@depth@100ms'
+
+
+def _event(first: int, last: int, prev: int, bids=(), asks=()) -> dict:
+    return {'e': 'depthUpdate', 'U': first, 'u': last, 'pu': prev,
+            'b': [[str(p), str(q)] for p, q in bids], 'a': [[str(p), str(q)] for p, q in asks]}
+
+
+def test_book_syncs_from_snapshot_and_buffered_events():
+    book = OrderBook(SYMBOL)
+    book.on_event(_event(95, 98, 94, asks=[(1.5, 1)]))  # older than the snapshot: dropped
+    book.on_event(_event(99, 102, 98, asks=[(1.0, 0), (1.2, 2)]))
+    assert not book.ready
+    assert book.apply_snapshot({'lastUpdateId': 100, 'bids': [['0.9', '5']], 'asks': [['1.0', '3'], ['1.1', '4']]})
+    assert book.ready and book.last_update_id == 102
+    assert book.best_ask() == 1.1 and book.best_bid() == 0.9
+    assert book.fillable(1.15) == (4.0, 1.1)
+
+    assert book.on_event(_event(103, 104, 102, asks=[(1.05, 1)]))
+    assert book.best_ask() == 1.05
+    # A missed event breaks the chain: unsynced until the next snapshot
+    assert not book.on_event(_event(107, 108, 106, asks=[(1.0, 1)]))
+    assert not book.ready and book.resyncs == 1
+
+
+def test_walk_matches_level_by_level_reference():
+    rng = random.Random(7)
+    book = OrderBook(SYMBOL)
+    asks = {round(1.0 + rng.random(), 4): round(rng.uniform(0.1, 50), 3) for _ in range(500)}
+    book.apply_snapshot({'lastUpdateId': 1, 'bids': [], 'asks': [[str(p), str(q)] for p, q in asks.items()]})
+    for limit in (0.5, 1.01, 1.3, 1.77, 3.0):
+        qty = cost = 0.0
+        for p, q in sorted(asks.items()):
+            if p <= limit:
+                qty, cost = qty + q, cost + p * q
+        got_qty, got_avg = book.fillable(limit)
+        assert abs(got_qty - qty) < 1e-9
+        assert got_avg is None if qty == 0 else abs(got_avg - cost / qty) < 1e-9
+
+
+async def test_entry_below_filters_within_cap_is_skipped(exchange, client, rules):
+    book = OrderBook(SYMBOL)
+    book.apply_snapshot({'lastUpdateId': 1, 'bids': [], 'asks': [['1.0', '0.5'], ['1.01', '3'], ['1.5', '100']]})
+    ex = AsyncFuturesExecutor(client, rules)
+    # 3 within 1%: at least minQty, but 3 * 1.01 is under the 5 USDT minNotional
+    assert await ex.open_futures_long(SYMBOL, 1.0, 10, book=book, max_slippage=0.01) is None
+    # Half a lot within 0.5%: below minQty
+    armed = await ex.arm_futures_long(SYMBOL, 1.0, 10, ref_price=1.0, max_slippage=0.005)
+    assert await ex.send_armed(armed, book=book) is None
+    assert not [r for r in exchange.requests if r['endpoint'] == 'order']
+
+
+async def _synced_feed(exchange, client) -> DepthFeed:
+    exchange.books[SYMBOL] = {'lastUpdateId': 100, 'bids': {0.99: 50.0}, 'asks': {1.0: 3.0, 1.01: 4.0, 1.05: 100.0}}
+    feed = DepthFeed(client, SYMBOL, exchange.ws_url)
+    feed.start()
+    while not exchange.market_streams(STREAM):
+        await asyncio.sleep(0.005)
+    # The snapshot must cover the first event it is joined to
+    exchange.books[SYMBOL].update(lastUpdateId=101, asks={**exchange.books[SYMBOL]['asks'], 1.02: 5.0})
+    await exchange.publish(STREAM, _event(101, 101, 100, asks=[(1.02, 5)]))
+    await asyncio.wait_for(feed.synced.wait(), 2)
+    return feed
+
+
+async def test_entry_is_limit_ioc_sized_from_the_book(exchange, client, rules):
+    feed = await _synced_feed(exchange, client)
+    ex = AsyncFuturesExecutor(client, rules)
+    try:
+        # 10 USDT of notional; within 2% of the best ask the book holds 3 + 4 + 5
+        res = await ex.open_futures_long(SYMBOL, 1.0, 10, book=feed.book, max_slippage=0.02)
+        assert res['qty'] == 10.0
+        assert abs(res['entry_price'] - (3 * 1.0 + 4 * 1.01 + 3 * 1.02) / 10) < 1e-9
+        order = exchange.accepted_orders(SYMBOL)[-1]
+        assert (order['type'], order['params']['timeInForce'], order['params']['price']) == ('LIMIT', 'IOC', '1.02')
+
+        # One percent reaches two levels: the order is cut to what the local book shows
+        # there, and since the exchange side is gone it expires unfilled
+        res = await ex.open_futures_long(SYMBOL, 1.0, 10, book=feed.book, max_slippage=0.01)
+        assert exchange.accepted_orders(SYMBOL)[-1]['params']['quantity'] == '7'
+        assert res is None and exchange.position(SYMBOL) == 10.0
+    finally:
+        await feed.stop()
+
+
+async def test_armed_entry_is_resized_at_fire_time(exchange, client, rules):
+    ex = AsyncFuturesExecutor(client, rules)
+    armed = await ex.arm_futures_long(SYMBOL, 1.0, 10, ref_price=0.5, max_slippage=0.01)
+    assert armed.params['type'] == 'LIMIT' and armed.params['price'] == '0.505' and armed.qty == 20.0
+    feed = await _synced_feed(exchange, client)
+    try:
+        res = await ex.reconcile_fill(armed, await ex.send_armed(armed, book=feed.book))
+    finally:
+        await feed.stop()
+    assert armed.params['price'] == '1.01' and armed.qty == 7.0
+    assert res['qty'] == 7.0 and exchange.position(SYMBOL) == 7.0
@@ -0,0 +1,74 @@
+import aiohttp
+import pytest
+from binance.exceptions import BinanceAPIException
+
+from src.async_executor import AsyncFuturesExecutor
+from src.order_race import entry_client_order_id, race_order
+from tests.conftest import SYMBOL
+
+CID = entry_client_order_id(SYMBOL, 1_700_000_000.0)
+
+
+def _entries(exchange) -> list[dict]:
+    return [r for r in exchange.requests if r['endpoint'] == 'order' and r['method'] == 'POST']
+
+
+def test_client_order_id_is_deterministic_and_valid():
+    assert CID == entry_client_order_id(SYMBOL, 1_700_000_000.0)
+    assert CID != entry_client_order_id(SYMBOL, 1_700_000_001.0)
+    assert len(CID) <= 36
+
+
+async def test_raced_copies_all_fill_and_extras_are_closed(exchange, client, rules):
+    ex = AsyncFuturesExecutor(client, rules)
+    res = await ex.open_futures_long(SYMBOL, 1.0, 10, client_order_id=CID, copies=3, stagger=0.001)
+    race = ex.last_race
+    position = await ex.confirm_race(SYMBOL, res['qty'], res['hedge'])
+
+    sent = _entries(exchange)
+    assert len({r['peer'] for r in sent[:3]}) == 3
+    # A filled MARKET order frees its client id, so the shared id stops none of the copies
+    assert race.accepted == 3
+    assert position == res['qty'] == exchange.position(SYMBOL) == 10.0
+    reduce = exchange.accepted_orders(SYMBOL)[-1]
+    assert (reduce['side'], reduce['origQty'], reduce['params']['reduceOnly']) == ('SELL', '20', 'true')
+
+
+async def test_ambiguous_send_is_looked_up_not_resent(exchange, client, rules, monkeypatch):
+    ex = AsyncFuturesExecutor(client, rules)
+    create = client.futures_create_order
+
+    async def lost_response(**params):
+        await create(**params)
+        raise aiohttp.ServerDisconnectedError()
+
+    monkeypatch.setattr(client, 'futures_create_order', lost_response)
+    res = await ex.open_futures_long(SYMBOL, 1.0, 10, client_order_id=CID)
+    assert res['qty'] == 10.0 and res['raw']['clientOrderId'] == CID
+    assert len(_entries(exchange)) == 1 and exchange.position(SYMBOL) == 10.0
+
+    # Never reached the exchange: the lookup finds nothing and the error is passed on, so a resend is safe
+    async def dropped(**params):
+        raise aiohttp.ServerDisconnectedError()
+
+    monkeypatch.setattr(client, 'futures_create_order', dropped)
+    with pytest.raises(aiohttp.ClientError):
+        await ex.open_futures_long(SYMBOL, 1.0, 10, client_order_id='lb-never-sent')
+
+
+async def test_duplicate_only_counts_as_placed(exchange, client):
+    params = {'symbol': SYMBOL, 'side': 'BUY', 'type': 'LIMIT', 'timeInForce': 'GTC', 'price': '0.9', 'quantity': '10',
+              'newClientOrderId': CID}
+    await client.futures_create_order(**params)  # an earlier attempt, still resting, whose response was lost
+    resp, race = await race_order(client, params, copies=2)
+    await race.settled
+    assert resp == {}
+    assert [leg.outcome for leg in race.legs] == ['duplicate', 'duplicate']
+    assert len(exchange.open_orders(SYMBOL)) == 1
+
+
+async def test_all_copies_rejected_raises_exchange_error(exchange, client):
+    params = {'symbol': 'NOPEUSDT', 'side': 'BUY', 'type': 'MARKET', 'quantity': '1', 'newClientOrderId': CID}
+    with pytest.raises(BinanceAPIException) as info:
+        await race_order(client, params, copies=2)
+    assert info.value.code == -1121
@@ -0,0 +1,94 @@
+import time
+
+import pytest
+
+from src.rate_limiter import Priority, RateLimiter, RateLimitExceeded, WeightBudget, classify, request_priority, request_weight
+from src.session import PooledAsyncClient
+from tests.conftest import SYMBOL
+
+
+def test_classify_order_path_first():
+    assert classify('order', 'POST') == Priority.ORDER
+    assert classify('batchOrders', 'post') == Priority.ORDER
+    assert classify('order', 'GET') == Priority.ACCOUNT
+    assert classify('exchangeInfo', 'GET') == Priority.INFO
+
+
+def test_weight_depends_on_params():
+    assert request_weight('openOrders', {'symbol': SYMBOL}) == 1
+    assert request_weight('openOrders', {}) == 40
+    assert request_weight('depth', {'symbol': SYMBOL, 'limit': 100}) == 5
+    assert request_weight('depth', {'symbol': SYMBOL}) == 10
+
+
+async def test_info_is_dropped_while_orders_use_the_reserve():
+    limiter = RateLimiter(weight_per_min=100, max_info_delay=0.0)
+    limiter.weight.observe_used(75)  # 25 left, below the 30% INFO reserve
+    with pytest.raises(RateLimitExceeded):
+        await limiter.acquire('exchangeInfo', 'GET')
+    assert limiter.dropped == 1
+    start = time.monotonic()
+    await limiter.acquire('order', 'POST')
+    assert time.monotonic() - start < 0.05
+
+
+async def test_request_priority_raises_but_never_lowers():
+    limiter = RateLimiter(weight_per_min=100, max_info_delay=0.0)
+    limiter.weight.observe_used(75)
+    with request_priority(Priority.ORDER):
+        await limiter.acquire('exchangeInfo', 'GET')
+    with request_priority(Priority.INFO):
+        await limiter.acquire('order', 'POST')
+
+
+def test_headers_align_model_and_retry_after_blocks():
+    limiter = RateLimiter(weight_per_min=2400)
+    limiter.update(200, {'X-MBX-USED-WEIGHT-1M': '2000', 'X-MBX-ORDER-COUNT-1M': '1100'})
+    assert limiter.used_weight == 2000
+    assert limiter.weight.tokens <= 401
+    assert limiter.orders_1m.tokens <= 101
+    limiter.update(429, {'Retry-After': '3'})
+    assert limiter.blocked_until - time.monotonic() > 2.5
+
+
+async def test_client_reads_mock_headers_and_backs_off_on_429(exchange):
+    limiter = RateLimiter(weight_per_min=2400, max_info_delay=0.0)
+    client = await PooledAsyncClient.create('key', 'secret', futures_url=exchange.rest_url, limiter=limiter)
+    try:
+        before = exchange.used_weight
+        await client.futures_position_information()
+        assert exchange.used_weight == before + 5
+        assert limiter.used_weight == exchange.used_weight
+
+        exchange.weight_limit = exchange.used_weight
+        with pytest.raises(Exception) as info:
+            await client.futures_mark_price(symbol=SYMBOL)
+        assert getattr(info.value, 'code', None) == -1003
+        assert limiter.blocked_until > time.monotonic()
+        # Informational calls are now dropped locally instead of hitting the exchange again
+        sent = len(exchange.requests)
+        with pytest.raises(RateLimitExceeded):
+            await client.futures_mark_price(symbol=SYMBOL)
+        assert len(exchange.requests) == sent
+    finally:
+        await client.close_connection()
+
+
+async def test_clients_on_one_ip_share_the_weight_budget(exchange):
+    budget = WeightBudget(2400)
+    clients = [await PooledAsyncClient.create(key, 'secret', futures_url=exchange.rest_url,
+                                              limiter=RateLimiter(weight=budget)) for key in ('a', 'b')]
+    try:
+        await clients[0].futures_get_open_orders()
+        await clients[1].futures_order_book(symbol=SYMBOL, limit=100)
+        # Both clients' calls come out of one budget that matches the exchange's count for the IP
+        assert budget.used == exchange.used_weight
+        assert budget.tokens <= 2400 - exchange.used_weight + 1
+        assert clients[0].limiter.used_weight == clients[1].limiter.used_weight
+        exchange.weight_limit = exchange.used_weight
+        with pytest.raises(Exception):
+            await clients[0].futures_mark_price(symbol=SYMBOL)
+        assert clients[1].limiter.blocked_until > time.monotonic()
+    finally:
+        for client in clients:
+            await client.close_connection()
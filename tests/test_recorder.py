@@ -0,0 +1,50 @@
+import asyncio
+import os
+
+from src.recorder import Recorder, load_recording
+from tests.conftest import SYMBOL
+
+STREAM = SYMBOL.lower()
+
+
+async def _subscribed(exchange):
+    while not (exchange.market_streams(f'{STREAM}@aggTrade') and exchange.market_streams(f'{STREAM}@depth@100ms')):
+        await asyncio.sleep(0.005)
+
+
+async def test_records_streams_to_memory_mappable_files(exchange, tmp_path):
+    exchange.mark_interval = 0.02
+    recorder = Recorder(SYMBOL, str(tmp_path), exchange.ws_url, flush_interval=0.05)
+    recorder.start()
+    await asyncio.wait_for(_subscribed(exchange), 5)
+    for i in range(3):
+        await exchange.publish(f'{STREAM}@aggTrade', {'e': 'aggTrade', 'E': 1000 + i, 'a': i, 's': SYMBOL, 'p': f'{1.0 + i / 10}',
+                                                     'q': '2.5', 'T': 999 + i, 'm': i == 1})
+    await exchange.publish(f'{STREAM}@depth@100ms', {'e': 'depthUpdate', 'E': 1005, 'U': 10, 'u': 12,
+                                                     'b': [['0.99', '5'], ['0.98', '0']], 'a': [['1.01', '7']]})
+    await asyncio.sleep(0.1)
+    await asyncio.to_thread(recorder.stop)
+
+    data = load_recording(recorder.path)
+    trades, depth = data['aggTrade'], data['depth']
+    assert trades['price'].tolist() == [1.0, 1.1, 1.2]
+    assert trades['buyer_maker'].tolist() == [0, 1, 0]
+    assert (trades['recv_ns'] > 0).all()
+    assert depth[['side', 'price', 'qty']].tolist() == [(0, 0.99, 5.0), (0, 0.98, 0.0), (1, 1.01, 7.0)]
+    assert (depth['final_id'] == 12).all()
+    assert len(data['markPrice']) > 0 and (data['markPrice']['mark'] == 1.0).all()
+    assert recorder.rows['aggTrade'] == 3
+
+
+async def test_partial_last_record_is_ignored(exchange, tmp_path):
+    recorder = Recorder(SYMBOL, str(tmp_path), exchange.ws_url, flush_interval=0.01)
+    recorder.start()
+    await asyncio.wait_for(_subscribed(exchange), 5)
+    await exchange.publish(f'{STREAM}@aggTrade', {'E': 1, 'a': 1, 'p': '2', 'q': '1', 'T': 1, 'm': False})
+    await asyncio.sleep(0.05)
+    await asyncio.to_thread(recorder.stop)
+    with open(os.path.join(recorder.path, 'aggTrade.bin'), 'ab') as f:
+        f.write(b'\x01\x02\x03')  # process died mid-write
+
+    trades = load_recording(recorder.path)['aggTrade']
+    assert trades['price'].tolist() == [2.0]
@@ -0,0 +1,42 @@
+import asyncio
+
+from src.symbol_rules import AsyncSymbolRulesCache
+from tests.conftest import SYMBOL
+from tests.mock_exchange import MockSymbol
+
+
+def _downloads(exchange) -> int:
+    return sum(1 for r in exchange.requests if r['endpoint'] == 'exchangeInfo')
+
+
+async def test_rules_are_refetched_only_after_ttl(exchange, client):
+    rules = AsyncSymbolRulesCache(client, ttl=0.2)
+    assert (await rules.get(SYMBOL)).min_qty == '1'
+    await rules.get(SYMBOL)
+    assert _downloads(exchange) == 1
+    await asyncio.sleep(0.25)
+    assert not rules.is_fresh(SYMBOL)
+    await rules.get(SYMBOL)
+    assert _downloads(exchange) == 2 and rules.is_fresh(SYMBOL)
+
+
+async def test_unknown_symbol_is_looked_up_once_per_miss_interval(exchange, client):
+    rules = AsyncSymbolRulesCache(client, miss_interval=0.2)
+    for _ in range(5):
+        assert await rules.get('NEWUSDT') is None
+    assert _downloads(exchange) == 1
+    # Listed a moment later: the next lookup after the interval picks it up
+    exchange.symbols['NEWUSDT'] = MockSymbol('NEWUSDT')
+    await asyncio.sleep(0.25)
+    assert await rules.get('NEWUSDT') is not None
+    assert _downloads(exchange) == 2
+
+
+async def test_warm_skips_a_recent_download(exchange, client):
+    rules = AsyncSymbolRulesCache(client)
+    assert await rules.warm() == 1
+    assert await rules.warm(max_age=0.2) == 0
+    assert _downloads(exchange) == 1
+    await asyncio.sleep(0.25)
+    assert await rules.warm(max_age=0.2) == 1
+    assert _downloads(exchange) == 2
@@ -0,0 +1,118 @@
+import asyncio
+import json
+from datetime import datetime, timezone
+import pytest
+import websockets
+from binance.exceptions import BinanceAPIException
+
+from src.activation import ActivationDetector
+from src.async_executor import AsyncFuturesExecutor
+from src.launch_scheduler import LaunchScheduler, ServerClock
+from tests.conftest import SYMBOL
+
+
+async def test_clock_sync_measures_server_offset(exchange, client):
+    exchange.clock_offset = 0.25
+    clock = ServerClock(client, samples=3)
+    await clock.sync()
+    assert abs(clock.offset - 0.25) < 0.02
+    assert abs(clock.server_now() - exchange.now()) < 0.02
+
+
+async def test_slow_hook_cannot_delay_launch(exchange, client):
+    clock = ServerClock(client, samples=1)
+    await clock.sync()
+    cancelled = asyncio.Event()
+
+    async def hung():
+        try:
+            await asyncio.sleep(10)  # e.g. exchangeInfo not answering
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    at = datetime.fromtimestamp(clock.server_now() + 1.5, timezone.utc)
+    report = await LaunchScheduler(clock).wait_until(at, SYMBOL, hooks=[(1.2, hung)])
+    assert cancelled.is_set()
+    assert abs(report.error_ms) < 20
+
+
+async def test_detector_fires_once_symbol_activates(exchange, client):
+    exchange.symbols[SYMBOL].activate_at = exchange.now() + 0.2
+    detector = ActivationDetector(launch_at=exchange.now(), now=exchange.now, burst_interval=0.01)
+    res = await detector.wait(lambda: client.futures_change_leverage(symbol=SYMBOL, leverage=5), 'set_leverage')
+    assert res['leverage'] == 5
+    assert detector.probes > 1
+    assert exchange.is_active(SYMBOL)
+
+
+async def test_detector_stops_on_permanent_errors(exchange, client, rules):
+    ex = AsyncFuturesExecutor(client, rules)
+    detector = ActivationDetector(launch_at=exchange.now(), now=exchange.now, burst_interval=0.01, timeout=1.0)
+    exchange.inject('order', -2019, 'Margin is insufficient.')
+    with pytest.raises(BinanceAPIException) as info:
+        await detector.wait(lambda: ex.open_futures_long(SYMBOL, 1.0, 10), 'entry')
+    assert info.value.code == -2019 and detector.probes == 1
+
+    # Below minNotional: nothing is sent, and it is not retried
+    assert await detector.wait(lambda: ex.open_futures_long(SYMBOL, 0.1, 10), 'entry') is None
+    assert detector.probes == 2
+    assert sum(r['endpoint'] == 'order' for r in exchange.requests) == 1
+
+
+async def test_armed_entry_retries_after_position_mode_change(exchange, client, rules):
+    ex = AsyncFuturesExecutor(client, rules)
+    armed = await ex.arm_futures_long(SYMBOL, 1.0, 10, ref_price=1.0)
+    assert armed is not None and not armed.hedge
+    exchange.hedge = True  # switched to hedge mode after arming: first send gets -4061
+
+    res = await ex.reconcile_fill(armed, await ex.send_armed(armed))
+    assert res['qty'] == 10.0
+    assert res['entry_price'] == 1.0
+    assert res['hedge'] is True
+    assert exchange.position(SYMBOL, 'LONG') == 10.0
+
+
+async def test_open_long_without_fill_in_ack(exchange, client, rules):
+    ex = AsyncFuturesExecutor(client, rules)
+    res = await ex.open_futures_long(SYMBOL, 1.0, 10)
+    assert res['qty'] == 10.0
+    assert exchange.position(SYMBOL) == 10.0
+
+
+async def test_protective_orders_fix_rejected_legs(exchange, client, rules):
+    ex = AsyncFuturesExecutor(client, rules)
+    exchange.inject('order', -1102, match={'type': 'TRAILING_STOP_MARKET'})
+    exchange.inject('order', -1106, match={'type': 'STOP_MARKET'})
+
+    placed = await ex.place_protective_orders(SYMBOL, 10.0, stop_price=0.99, callback_rate=1.0, activation_price=1.1)
+    assert placed['trailing'] is not None
+    assert placed['stop_loss'] is not None
+    trailing, stop = exchange.open_orders(SYMBOL)
+    assert 'activationPrice' not in trailing['params']
+    assert stop['params']['reduceOnly'] == 'false'
+    # One batch, then one batch with the two fixed legs
+    assert [r['endpoint'] for r in exchange.requests].count('batchOrders') == 2
+
+
+async def test_protective_orders_fall_back_to_single_requests(exchange, client, rules):
+    ex = AsyncFuturesExecutor(client, rules)
+    exchange.inject('batchOrders', -1000)
+
+    placed = await ex.place_protective_orders(SYMBOL, 10.0, stop_price=0.99, activation_price=1.1, hedge=False)
+    assert placed['trailing'] is not None and placed['stop_loss'] is not None
+    assert len(exchange.open_orders(SYMBOL)) == 2
+
+
+async def test_user_stream_reports_entry_and_close(exchange, client):
+    key = await client.futures_stream_get_listen_key()
+    async with websockets.connect(f'{exchange.ws_url}/ws/{key}') as ws:
+        await asyncio.sleep(0.05)
+        await client.futures_create_order(symbol=SYMBOL, side='BUY', type='MARKET', quantity='7')
+        opened = json.loads(await asyncio.wait_for(ws.recv(), 1))
+        await exchange.close_position(SYMBOL)
+        fill = json.loads(await asyncio.wait_for(ws.recv(), 1))
+        closed = json.loads(await asyncio.wait_for(ws.recv(), 1))
+    assert opened['a']['P'][0]['pa'] == '7.0'
+    assert fill['o']['o'] == 'STOP_MARKET' and fill['o']['X'] == 'FILLED'
+    assert closed['a']['P'][0]['pa'] == '0.0'
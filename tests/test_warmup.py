@@ -0,0 +1,46 @@
+import asyncio
+
+from src.account_state import AsyncAccountStateCache
+from src.launch_scheduler import ServerClock
+from src.warmup import Warmup
+from tests.conftest import SYMBOL
+
+
+def _warmup(client, rules, connections: int = 3, ping_interval: float = 0.0) -> Warmup:
+    return Warmup(client, rules, AsyncAccountStateCache(client), ServerClock(client, samples=1),
+                  connections=connections, ping_interval=ping_interval)
+
+
+async def test_warmup_opens_connections_primes_caches_and_sets_leverage(exchange, client, rules):
+    warmup = _warmup(client, rules)
+    report = await warmup.run(SYMBOL, leverage=7)
+
+    assert report.ok, report.format()
+    assert [s.name for s in report.steps][:2] == ['dns', 'connections']
+    assert rules.peek(SYMBOL) is not None
+    assert warmup.account.hedge is False
+    assert exchange.leverage[SYMBOL] == 7
+    pings = [r['peer'] for r in exchange.requests if r['endpoint'] == 'ping']
+    assert len(set(pings)) >= 3
+
+
+async def test_failed_leverage_is_reported_not_raised(exchange, client, rules):
+    exchange.inject('leverage', -1121)
+    report = await _warmup(client, rules).run(SYMBOL, leverage=7)
+    assert report.ok
+    assert report.step('leverage').status == 'deferred'
+    assert report.step('rules').ok
+    assert SYMBOL not in exchange.leverage
+
+
+async def test_keepalive_pings_until_stopped(exchange, client, rules):
+    warmup = _warmup(client, rules, connections=2, ping_interval=0.02)
+    await warmup.run(SYMBOL)
+    await asyncio.sleep(0.1)
+    stopped_at = exchange.now()
+    warmup.stop()
+    await asyncio.sleep(0.05)
+    pings = [r['received_at'] for r in exchange.requests if r['endpoint'] == 'ping']
+    assert len(pings) >= 6
+    # A round already on the wire may still land; nothing is sent after that
+    assert all(t - stopped_at < 0.01 for t in pings)